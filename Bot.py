@@ -19,11 +19,21 @@ __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
 from threading import Timer
+from collections import deque
 from GameAI import GameAI
 import Socket.HandleClient
 from Socket.HandleClient import HandleClient
+from Socket.MessageQueue import MessageQueue
+from Socket.RequestScheduler import RequestScheduler
+from Socket.ReconnectManager import ReconnectManager
 from dto.PlayerInfo import PlayerInfo
 from dto.ScoreBoard import ScoreBoard
+from Planning.PlannerWorker import PlannerWorker
+from Map.MapCache import MapCache
+from Telemetry.SamplingProfiler import SamplingProfiler
+from Telemetry.TickLog import TickRecorder
+from Strategy.StrategyParams import StrategyParams
+import os
 import time
 import datetime
 import re
@@ -42,19 +52,28 @@ class Bot():
     client = None
     gameAi = None
     timer1 = None
+    inbox = None # Server commands handed from the network thread to the timer thread
+    scheduler = None # Which requests (g, u, q, o) to send on each tick
+    reconnect = None # Connects (and reconnects) in the background with jittered backoff
+    profiler = None # Sampling profiler of the tick, toggled at runtime (SIGUSR1, Ctrl+Break on Windows)
+    recorder = None # Per-tick telemetry columns, one file per match
     
     running = True
     thread_interval = 0.1 # USE BETWEEN 0.1 and 1 (0.1 real setting, 1 debug settings and makes the bot slower)
+    decision_budget = 0.5 # Fraction of thread_interval GameAI may spend deciding (keeps the bot on time)
+    use_planner_worker = False # Precompute frontier/item/escape routes on a background thread
+    map_cache_dir = "map_cache" # Learned arenas are kept here across matches (None disables)
+    strategy_file = "strategy_params.json" # Tuned StrategyParams (python -m Simulation.Tuner); defaults if missing
+    profile_dir = "profiles" # Collapsed stacks (flame graph input) are written here when the profiler is switched off
+    telemetry_dir = "telemetry" # Per-tick telemetry of each match (python -m Telemetry.TickLog to summarize; None disables)
 
-    playerList = {} #new Dictionary<long, PlayerInfo>
     shotList = [] #new List<ShotInfo>
-    scoreList = [] #List<ScoreBoard>
     time = 0
 
     gameStatus = ""
-    sscoreList = ""
 
-    msg = []
+    msg = None # Notifications shown every 5 seconds (bounded: only the newest msg_limit are kept)
+    msg_limit = 50
     msgSeconds = 0
     gamestatus_interval = 0
     sayHello = 0
@@ -62,20 +81,46 @@ class Bot():
     # <summary>
     # Bot Constructor
     # </summary>
-    def __init__(self):
-
-        self.client = HandleClient()
-        self.gameAi = GameAI()
+    def __init__(self, client=None):
+
+        self.client = client or HandleClient() # Simulation.Soak passes an in-process server link
+        self.msg = deque(maxlen=self.msg_limit)
+        self.inbox = MessageQueue()
+        self.scheduler = RequestScheduler()
+        params = None
+        if self.strategy_file and os.path.exists(self.strategy_file):
+            params = StrategyParams.Load(self.strategy_file)
+            print(f"Using tuned strategy parameters from {self.strategy_file}")
+        self.gameAi = GameAI(params)
+
+        if self.map_cache_dir:
+            self.gameAi.map_cache = MapCache(self.map_cache_dir)
+
+        if self.use_planner_worker:
+            self.gameAi.planner = PlannerWorker(self.gameAi, self.thread_interval)
+            self.gameAi.planner.start()
+
+        if self.telemetry_dir:
+            self.recorder = TickRecorder(self.telemetry_dir)
+
+        # Idle until toggled: the sampler thread sleeps and ticks only re-point it at themselves
+        self.profiler = SamplingProfiler(self.gameAi, self.profile_dir)
+        self.profiler.start()
+        toggle = self.profiler.InstallSignal()
+        if toggle:
+            print(f"Profiler: send {toggle} to start/stop sampling")
 
         # duration is in seconds
         self.timer1 = Timer(self.thread_interval, self.timer1_Tick)
 
-        self.client.append_cmd_handler(self.ReceiveCommand)
+        # Commands are queued here and applied by timer1_Tick, never on the network thread
+        self.client.append_cmd_handler(self.inbox.Put)
         self.client.append_chg_handler(self.SocketStatusChange)
 
-        while(not self.client.connect(self.host, self.port)):
-            print("Connection failed... Trying to connect in 5 seconds...")
-            time.sleep(5)
+        # Never blocks: the timer starts right away and idles until connected
+        self.reconnect = ReconnectManager(self.client, self.host, self.port)
+        self.reconnect.start()
+        self.reconnect.Request()
 
         self.timer1.start()
 
@@ -142,35 +187,31 @@ class Bot():
                 ######################################################        
 
                 elif cmd[0] == "player":
-                    #lock (playerList)
+                    # Kept in GameAI's player index (updated in place, by id)
                     
                     if len(cmd) == 8:
-                        if int(cmd[1]) not in self.playerList:
-                            self.playerList.append(int(cmd[1]), 
-                                PlayerInfo(
-                                    int(cmd[1]),
-                                    cmd[2],
-                                    int(cmd[3]),
-                                    int(cmd[4]),
-                                    int(cmd[5]),
-                                    int(cmd[6]),
-                                    self.convertFromString(cmd[7])))
-                        else:
-                            self.playerList[int(cmd[1])] = PlayerInfo(
+                        self.gameAi.UpdatePlayer(
+                            PlayerInfo(
                                 int(cmd[1]),
                                 cmd[2],
                                 int(cmd[3]),
                                 int(cmd[4]),
                                 int(cmd[5]),
                                 int(cmd[6]),
-                                self.convertFromString(cmd[7]))
+                                self.convertFromString(cmd[7])))
                     
                 ######################################################        
 
                 elif cmd[0] == "g":
                     if len(cmd) == 3:
                         if self.gameStatus != cmd[1]:
-                            self.playerList.clear()
+                            self.gameAi.players.Clear()
+
+                            if self.gameStatus == "Game":
+                                self.gameAi.SaveMapKnowledge()
+                                self.FlushTelemetry()
+                            if cmd[1] == "Game":
+                                self.gameAi.StartMatch()
 
                         if self.gameStatus != cmd[1]:
                             print("New Game Status: " + cmd[1])
@@ -179,6 +220,7 @@ class Bot():
                         elif self.time > int(cmd[2]):
                             self.client.sendRequestUserStatus()
 
+                        self.scheduler.Answered("g", self.gameStatus != cmd[1])
                         self.gameStatus = cmd[1]
                         self.time = int(cmd[2])
                     
@@ -187,12 +229,13 @@ class Bot():
                 elif cmd[0] == "u":
                     if len(cmd) > 1:
                     
+                        scoreList = [] #List<ScoreBoard>
                         for i in range(1, len(cmd)):
                         
                             a = cmd[i].split('#')
 
                             if len(a) == 4:
-                                self.scoreList.append(
+                                scoreList.append(
                                     ScoreBoard(
                                     a[0],
                                     (a[1] == "connected"),
@@ -200,7 +243,7 @@ class Bot():
                                     int(a[3]), (0, 0, 0)))
                             
                             elif len(a) == 5:
-                                self.scoreList.append(
+                                scoreList.append(
                                     ScoreBoard(
                                     a[0],
                                     (a[1] == "connected"),
@@ -208,19 +251,14 @@ class Bot():
                                     int(a[3]), self.convertFromString(a[4])))
                         
 
-                        self.sscoreList = ""
-                        for sb in self.scoreList:
-                            self.sscoreList += sb.name + "\n"
-                            self.sscoreList += ("connected" if sb.connected else "offline") + "\n"
-                            self.sscoreList += str(sb.energy) + "\n"
-                            self.sscoreList += str(sb.score) + "\n"
-                            self.sscoreList += "---\n"
-                        
-                        # Pass scoreboard to GameAI for strategic decision making
+                        # Records are updated in place; the text is only formatted when shown
+                        before = list(self.gameAi.scores.order)
                         if self.gameStatus == "Game":
-                            self.gameAi.UpdateGameState(self.scoreList, self.time, self.gameStatus)
-                        
-                        self.scoreList.clear()
+                            # Pass scoreboard to GameAI for strategic decision making
+                            self.gameAi.UpdateGameState(scoreList, self.time, self.gameStatus)
+                        else:
+                            self.gameAi.scores.Load(scoreList, self.time)
+                        self.scheduler.Answered("u", self.gameAi.scores.order != before)
                     
                     
                 ######################################################        
@@ -283,6 +321,13 @@ class Bot():
                     
                 ######################################################        
 
+                elif cmd[0] == "disconnected":
+                    # Queued by SocketStatusChange so GameAI is only touched here.
+                    # Knowledge and game status are kept: the resync continues the match.
+                    self.gameAi.SaveMapKnowledge()
+
+                ######################################################        
+
             except Exception as ex:
                 print(ex)
 
@@ -325,24 +370,51 @@ class Bot():
         elif decision ==  "andar_re":
             self.client.sendBackward()
     
+    # <summary>
+    # Send status/observation/game/scoreboard requests by letter
+    # </summary>
+    def sendRequests(self, requests):
+        for request in requests:
+            if request == "q":
+                self.client.sendRequestUserStatus()
+            elif request == "o":
+                self.client.sendRequestObservation()
+            elif request == "g":
+                self.client.sendRequestGameStatus()
+            elif request == "u":
+                self.client.sendRequestScoreboard()
+
     # <summary>
     # Execute some decision
     # </summary>
     def DoDecision(self):
         
-        decision = self.gameAi.GetDecision()
+        start = time.perf_counter()
+        decision = self.gameAi.GetDecision(self.thread_interval * self.decision_budget)
+        if self.recorder:
+            self.recorder.Record(self.gameAi, decision, time.perf_counter() - start)
         print(f"Current Position: {self.gameAi.GetPlayerPosition()}")
         print(f"Decision: {decision}")
         self.sendDecision(decision)
-        self.client.sendRequestUserStatus()
-        self.client.sendRequestObservation()
+
+        # Only ask for what this action can have changed
+        requests = self.scheduler.AfterAction(decision, self.gameAi.InCombat())
+        if "q" not in requests:
+            self.gameAi.PredictTurn(decision)
+        self.sendRequests(requests)
 
 
     def timer1_Tick(self):
+
+        self.profiler.Watch() # Every tick runs on a new Timer thread
+
+        # Apply everything received since the last tick (superseded updates coalesced)
+        for cmd in self.inbox.Drain():
+            self.ReceiveCommand(cmd)
                 
         if self.client.connected:
-            if self.sayhello == 0:
-                self.sayhello = 1
+            if self.sayHello == 0:
+                self.sayHello = 1
                 self.client.sendName(self.name)
                 if hasattr(self, 'botcolor'):
                     self.client.sendRGB(self.botcolor[0],self.botcolor[1],self.botcolor[2]) 
@@ -354,9 +426,9 @@ class Bot():
         #if self.gamestatus_interval >= 1000:
         #    self.gamestatus_interval = 0
         #    self.client.sendRequestGameStatus()
-        self.client.sendRequestGameStatus()
+        self.sendRequests(self.scheduler.Tick(self.gameStatus, self.gameAi.MATCH_SECONDS - self.time))
         
-        if self.gameStatus == "Game":
+        if self.gameStatus == "Game" and self.client.connected:
             self.DoDecision()
 
         elif self.msgSeconds >= 5000: # 5 SECONDS
@@ -364,9 +436,7 @@ class Bot():
             print(self.gameStatus)
             print(self.GetTime())
             print("-----------------")
-            print(self.sscoreList)
-
-            self.client.sendRequestScoreboard()
+            print(self.gameAi.scores.Text())
         
 
         if self.msgSeconds  >= 5000: # 5 SECONDS
@@ -378,6 +448,9 @@ class Bot():
 
                 self.msg.clear()
 
+            print(f"Inbox: {self.inbox.Report()}")
+            print(f"Requests: {self.scheduler.Report()}")
+
             self.msgSeconds  = 0
         
         if self.running:
@@ -385,26 +458,49 @@ class Bot():
             self.timer1.start()
 
 
+    # <summary>
+    # Write the telemetry of the match that just ended
+    # </summary>
+    def FlushTelemetry(self):
+        if not self.recorder:
+            return
+        try:
+            path = self.recorder.Flush()
+            if path:
+                print(f"TELEMETRY: Saved match ticks to {path}")
+        except OSError as e:
+            print(f"TELEMETRY: Could not save match ticks: {e}")
+
+    # <summary>
+    # Stop ticking and disconnect for good (no reconnect)
+    # </summary>
+    def Stop(self):
+        self.running = False
+        self.timer1.cancel()
+        self.reconnect.Stop()
+        self.profiler.Stop()
+        if self.gameAi.planner:
+            self.gameAi.planner.Stop()
+        self.client.close()
+        self.FlushTelemetry()
+
     def SocketStatusChange(self):
     
         if self.client.connected:
 
             print("Connected")
-            if self.sayHello == 0:
-                self.sayhello = 1
-                self.client.sendName(self.name)
-                if hasattr(self, 'botcolor'):
-                    self.client.sendRGB(self.botcolor[0],self.botcolor[1],self.botcolor[2]) 
-            self.client.sendRequestGameStatus()
-            self.client.sendRequestUserStatus()
-            self.client.sendRequestObservation()
+            # Pipelined resync: all replies come back within one round trip
+            self.sayHello = 1
+            self.client.sendName(self.name)
+            if hasattr(self, 'botcolor'):
+                self.client.sendRGB(self.botcolor[0],self.botcolor[1],self.botcolor[2]) 
+            self.sendRequests(RequestScheduler.RESYNC)
 
         else:
             print("Disconnected")
-            if running:
-                self.sayhello = 0
+            self.inbox.Put(["disconnected"])
+            if self.running:
+                self.sayHello = 0
             
                 print("Connecting again...")
-                while(not self.client.connect(self.host, self.port)):
-                    print("Connection failed... Trying to connect in 5 seconds...")
-                    time.sleep(5)
+                self.reconnect.Request()
@@ -19,12 +19,35 @@ __email__ = "abaffa@inf.puc-rio.br"
 #############################################################
 
 
-import random
+import copy
 from Map.Position import Position
+from Map.CellStore import CellSet, CellMap
+from Map.SafetyMap import SafetyMap
+from Map.PlayerIndex import PlayerIndex
+from Map.PositionHistory import PositionHistory
 from enum import Enum
 from typing import List, Dict, Set, Tuple, Optional
 from collections import deque
-import heapq
+from Planning.Deadline import Deadline
+from Map.DistanceField import DistanceField
+from Map.LayerMasks import LayerMasks
+from Strategy.StrategyParams import StrategyParams
+from Strategy.ScoreTracker import ScoreTracker
+from Planning.PathSearch import PathSearch
+from Planning.HierarchicalPlanner import HierarchicalPlanner
+from Planning.RolloutPlanner import RolloutPlanner
+from Planning.EnergyPlanner import EnergyPlanner
+from Planning.DecisionCache import DecisionCache
+
+# Neighbour offsets are shared constants (no per-call allocation)
+OBSERVABLE_OFFSETS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+ALL_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+DIRECTION_OFFSETS = {"north": (0, -1), "east": (1, 0), "south": (0, 1), "west": (-1, 0)}
+
+DIRECTION_INDEX = {"north": 0, "east": 1, "south": 2, "west": 3}
+DIRECTIONS = tuple(DIRECTION_INDEX)  # clockwise
+PERCEPT_FLAGS = {"blocked": 1, "steps": 2, "breeze": 4, "flash": 8, "blueLight": 16,
+                 "redLight": 32, "weakLight": 64, "enemy": 128}
 
 # ============== FINITE STATE MACHINE ==============
 class AgentState(Enum):
@@ -37,15 +60,23 @@ class AgentState(Enum):
 
 class GameAI():
 
-    # Energy thresholds
-    CRITICAL_ENERGY = 20  # Emergency - must find powerup
-    LOW_ENERGY = 30        # Tactical - avoid combat, seek powerup
+    MATCH_SECONDS = 600  # 10min
+    CACHE_REPORT_EVERY = 200  # Decision cache lookups between hit-rate reports
+    ENEMY_RANGE = 10      # enemy#N and shots reach this many cells ahead
+    PLAYER_MAX_AGE = 1.0  # Seconds a `player` position is trusted for
+    ENEMY_TRACK_SECONDS = 10  # Game seconds an enemy#N sighting is kept for velocity estimates
+
+    # Sections of GetDecision, named in self.phase while they run (for the profiler)
+    DECISION_PHASES = ("anti_stuck", "refuel", "gold", "combat", "exploration", "fallback")
+
+    # Status transitions
+    DEAD_STATES = ("dead",)
+    MOVE_ACTIONS = ("andar", "andar_re")
     
     # Scoring and strategic state
     my_name = "LEIAM WORM (WILDBOW) PLS"  # Bot name from Bot.py
     my_score = 0
     my_rank = 0
-    enemy_scores = {}  # {name: score}
     total_players = 0
     game_time = 0  # seconds
     game_status = "Ready"  # Ready, Game, GameOver
@@ -76,38 +107,222 @@ class GameAI():
     last_action = ""
     last_pos = (0, 0)
     
-    def __init__(self):
-        self.map_state = {}
-        self.visited = set()
-        self.safe_cells = set()
-        self.hazards = set()
-        self.breeze_sources = set()
-        self.flash_sources = set()
+    # Knowledge stores shared structurally between the live state and snapshots
+    KNOWLEDGE_STORES = ("map_state", "visited", "safe_cells", "hazards", "breeze_sources",
+                        "flash_sources", "gold_locations", "powerup_locations", "safety")
+
+    def __init__(self, params: Optional[StrategyParams] = None):
+        self.params = params or StrategyParams()  # Tunable tactical constants
+        self.scores = ScoreTracker()  # Scoreboard records, rank and score rates
+        self.player = Position()
+        self.enemy_last_positions = {}
+        self.enemy_velocity = {}
+        self.players = PlayerIndex()  # Other players from `player` lines (grid buckets, rows, columns)
+        self.map_state = CellMap()
+        self.visited = CellSet()
+        self.safe_cells = CellSet()
+        self.hazards = CellSet()
+        self.breeze_sources = CellSet()
+        self.flash_sources = CellSet()
+        self.safety = SafetyMap()  # Memoized IsSafe verdicts, invalidated per neighbourhood
         self.current_observations = []
         self.under_attack = False
         self.shot_connected = False
+        self.decisions = 0             # GetDecision calls so far (the tick clock)
+        self.damage_tick = None        # self.decisions when damage was last reported
         self.enemy_nearby = False  # True when "steps" detected
         self.last_known_enemy_pos = None
         self.combat_state = None # None, "strafe_turning", "strafe_moving", "reacquiring"
         self.strafe_dir = None   # "left" or "right" relative to enemy
         self.original_dir = None # "north", etc.
-        self.gold_locations = set() # Memory for known gold
-        self.powerup_locations = set() # Memory for known powerups
+        self.gold_locations = CellSet() # Memory for known gold
+        self.powerup_locations = CellSet() # Memory for known powerups
+        self.position_history = PositionHistory(10)  # Anti-stuck: last positions (ring buffer)
+        self.fsm_state = AgentState.EXPLORING
+        self.phase = None  # DECISION_PHASES entry GetDecision is running
+
+        # Anytime planning: searches survive across ticks while the map is unchanged
+        self.map_version = 0           # Bumped whenever map knowledge changes
+        self.decision_budget = None    # Seconds per GetDecision (None = unbounded)
+        self.distance_field = None     # Map.DistanceField from the current position
+        self.layers = LayerMasks()     # Store masks for the distance fields, re-packed per written tile
+        self.path_search = None
+        self.hierarchy = HierarchicalPlanner()  # Cluster graph for routes beyond the distance field
+        self.planner = None            # Optional Planning.PlannerWorker
+        self.published = None          # Frozen snapshot of the last consistent state
+        self.map_cache = None          # Optional Map.MapCache (warm start across matches)
+        self.warm_start = None         # store name -> cells the cache added (until it is contradicted)
+        self.rollout_planner = RolloutPlanner()  # Monte Carlo choice of fight/retreat options
+        self.energy_planner = EnergyPlanner()    # Routes that keep a power-up within reach
+        self.decision_cache = DecisionCache()    # Memoized fallback moves by local situation
+        self.cell_codes = {}                     # cell -> 4-bit code, for the current map version
+        self.cell_codes_version = None
+
+        # Teleports learned from position jumps: source cell -> destination
+        # (None once the same source sent us to different places)
+        self.teleports = {}
+        self.last_pos = None           # Position of the previous status (None before the first)
         # Pre-mark 0,0 (or start) as safe once we get first status? 
         # Actually SetStatus calls SetPlayerPosition.
 
     def SetStatus(self, x: int, y: int, dir: str, state: str, score: int, energy: int):
         
-        self.SetPlayerPosition(x, y)
+        self.DetectTransition(x, y, state)
+
+        if state.lower() in self.DEAD_STATES:
+            # Never mark the cell we died on as visited/safe (every dead status, not just the first)
+            self.player = Position.At(x, y)
+        else:
+            self.SetPlayerPosition(x, y)
+            self.map_state[(x, y)] = "Safe"
         self.dir = dir.lower()
 
         self.state = state
         self.score = score
         self.energy = energy
+        self.last_pos = (x, y)
 
-        self.visited.add((x, y))
-        self.safe_cells.add((x, y))
-        self.map_state[(x, y)] = "Safe"
+        self.Publish()
+
+    # <summary>
+    # Detect death, respawn and teleport jumps between two status updates
+    # </summary>
+    def DetectTransition(self, x, y, state):
+        """
+        Returns "death", "respawn", "teleport" or None.
+        Map knowledge is only extended (pit, teleport edge); tactical state is
+        reset whenever the player did not simply walk to an adjacent cell.
+        """
+        if self.last_pos is None:
+            return None
+
+        prev = self.last_pos
+        moved = self.last_action in self.MOVE_ACTIONS
+        jump = abs(x - prev[0]) + abs(y - prev[1]) > 1
+        was_dead = self.state.lower() in self.DEAD_STATES
+        is_dead = state.lower() in self.DEAD_STATES
+
+        if is_dead and not was_dead:
+            # Walking into an unknown cell and dying there means a pit, unless
+            # we did not get anywhere and were shot on the last tick
+            shot = self.damage_tick is not None and self.decisions - self.damage_tick <= 1
+            pit = (x, y) if (x, y) != prev else (None if shot else self.StepTarget(prev))
+            if moved and pit and pit not in self.visited:
+                print(f"TRANSITION: Died entering {pit}. Marking pit.")
+                self.hazards.add(pit)
+                self.safe_cells.discard(pit)
+                self.map_state[pit] = "Pit"
+                self.safety.Invalidate(pit)
+                self.MapChanged()
+            else:
+                print("TRANSITION: Died.")
+            self.ResetTacticalState()
+            return "death"
+
+        if was_dead and not is_dead:
+            print(f"TRANSITION: Respawned at {(x, y)}.")
+            self.ResetTacticalState()
+            return "respawn"
+
+        if jump:
+            source = self.StepTarget(prev) if moved else None
+            if source and source != (x, y):
+                self.LearnTeleport(source, (x, y))
+            else:
+                print(f"TRANSITION: Position jumped from {prev} to {(x, y)}.")
+            self.ResetTacticalState()
+            return "teleport"
+
+        return None
+
+    # <summary>
+    # Cell the last move action was aimed at, from a given position
+    # </summary>
+    def StepTarget(self, pos):
+        dx, dy = DIRECTION_OFFSETS.get(self.dir, (0, 0))
+        if self.last_action == "andar_re":
+            dx, dy = -dx, -dy
+        if dx == 0 and dy == 0:
+            return None
+        return (pos[0] + dx, pos[1] + dy)
+
+    def LearnTeleport(self, source, dest):
+        known = self.teleports.get(source, dest)
+        if source in self.teleports and known != dest:
+            print(f"TRANSITION: Teleport at {source} is random. Not using it as a shortcut.")
+            self.teleports[source] = None
+        else:
+            print(f"TRANSITION: Teleport {source} -> {dest}.")
+            self.teleports[source] = dest
+        self.map_state[source] = "Teleport"
+        self.MapChanged()
+
+    # <summary>
+    # Forget short-lived tactical state, keeping all map knowledge
+    # </summary>
+    def ResetTacticalState(self):
+        self.position_history.clear()
+        self.combat_state = None
+        self.strafe_dir = None
+        self.original_dir = None
+        self.under_attack = False
+        self.shot_connected = False
+        self.enemy_nearby = False
+        self.last_known_enemy_pos = None
+        self.enemy_last_positions.clear()
+        self.enemy_velocity.clear()
+        self.current_observations = []
+        self.fsm_state = AgentState.EXPLORING
+        self.distance_field = None
+        self.path_search = None
+        self.last_action = ""
+
+    # <summary>
+    # Copy of the knowledge state: stores shared copy-on-write in O(1), layer masks copied per tile
+    # </summary>
+    def Snapshot(self, frozen=False):
+        """
+        Must be called by the thread that writes this state (or on a frozen
+        snapshot, from any thread). frozen=True gives a read-only view.
+        """
+        snap = copy.copy(self)
+        for name in self.KNOWLEDGE_STORES:
+            setattr(snap, name, getattr(self, name).Fork(frozen))
+        snap.teleports = dict(self.teleports)  # a handful of edges: copied, never shared with the writer
+        snap.layers = self.layers.Fork()
+        snap.distance_field = None
+        snap.path_search = None
+        snap.hierarchy = HierarchicalPlanner()  # rebuilt from the fork if it is ever asked
+        snap.planner = None
+        snap.published = None
+        return snap
+
+    # <summary>
+    # Publish a consistent read-only view for the planner thread
+    # </summary>
+    def Publish(self):
+        """
+        Only the thread that writes GameAI (the decision tick, which also
+        applies the server commands) may call this, since Snapshot() forks
+        the stores it is writing, IsSafe's safe_cells/safety updates
+        included. Without a planner nobody reads the snapshot and nothing
+        is copied.
+        """
+        if not self.planner:
+            return
+        self.published = self.Snapshot(frozen=True)
+        self.planner.Wake()
+
+    # <summary>
+    # Latest background plan, if it still matches the live state
+    # </summary>
+    def FreshPlan(self):
+        if not self.planner:
+            return None
+        plan = self.planner.plan
+        if plan is None or plan.Key() != (self.map_version, (self.player.x, self.player.y)):
+            return None
+        return plan
 
     # <summary>
     # Update game state from scoreboard
@@ -119,19 +334,14 @@ class GameAI():
         """
         self.game_time = game_time
         self.game_status = game_status
-        
-        self.enemy_scores = {}
-        for entry in scoreboard_data:
-            if entry.name == self.my_name:
-                self.my_score = entry.score
-            else:
-                self.enemy_scores[entry.name] = entry.score
-        
-        # Calculate rank
-        all_scores = [self.my_score] + list(self.enemy_scores.values())
-        all_scores_sorted = sorted(all_scores, reverse=True)
-        self.my_rank = all_scores_sorted.index(self.my_score) + 1 if self.my_score in all_scores_sorted else 0
-        self.total_players = len(all_scores)
+        self.scores.Load(scoreboard_data, game_time)
+
+        # Calculate rank (we count even if the scoreboard does not list us yet)
+        mine = self.scores.records.get(self.my_name)
+        if mine:
+            self.my_score = mine.score
+        self.my_rank = self.scores.RankOf(self.my_score)
+        self.total_players = len(self.scores) + (0 if mine else 1)
         
         print(f"SCOREBOARD: Rank {self.my_rank}/{self.total_players}, Score: {self.my_score}, Time: {game_time}s")
     
@@ -146,58 +356,79 @@ class GameAI():
         if self.game_status != "Game":
             return "BALANCED"
         
-        if not self.enemy_scores:
+        if self.total_players < 2:
             return "BALANCED"  # Sem info, joga normal
         
-        time_remaining = 600 - self.game_time  # 10min = 600s
+        time_remaining = self.MATCH_SECONDS - self.game_time
+        projection = self.ProjectStandings(time_remaining)
+
+        if projection:
+            # Com taxas de pontuação confiáveis, decide pela classificação final projetada
+            projected_rank, lead_secure = projection
+            if self.my_rank == 1 and lead_secure:
+                return "DEFENSIVE"  # Ninguém nos alcança nem se pararmos de pontuar
+            if projected_rank / self.total_players > self.params.aggressive_percentile:
+                return "AGGRESSIVE"  # No ritmo atual terminamos lá embaixo
+            return "BALANCED"
+
         rank_percentile = self.my_rank / self.total_players if self.total_players > 0 else 0.5
         
         # DEFENSIVE: Proteger lead quando ganhando perto do fim
-        if self.my_rank == 1 and time_remaining < 120:  # 1st place, < 2min
+        if self.my_rank == 1 and time_remaining < self.params.defensive_time:  # 1st place, < 2min
             return "DEFENSIVE"
         
         # AGGRESSIVE: Precisa arriscar quando perdendo
-        elif rank_percentile > 0.7:  # Bottom 30%
+        elif rank_percentile > self.params.aggressive_percentile:  # Bottom 30%
             return "AGGRESSIVE"
         
         # BALANCED: Meio da tabela ou início de jogo
         else:
             return "BALANCED"
 
+    # <summary>
+    # Final standing projected from the score rates (None until every rate is trusted)
+    # </summary>
+    def ProjectStandings(self, time_remaining):
+        """
+        Returns (projected rank, lead secure): our rank if everyone keeps
+        their current rate until the end, and whether every opponent's
+        projected final score stays below our current score.
+        """
+        rates = self.scores.rates
+        if self.my_name not in self.scores or not rates.Ready(self.my_name):
+            return None
+
+        mine = rates.Project(self.my_name, self.my_score, time_remaining)
+        rank, lead_secure = 1, True
+        for name, record in self.scores.records.items():
+            if name == self.my_name:
+                continue
+            if not rates.Ready(name):
+                return None
+            theirs = rates.Project(name, record.score, time_remaining)
+            rank += theirs > mine
+            lead_secure = lead_secure and theirs < self.my_score
+        return rank, lead_secure
+
 
 
     def GetCurrentObservableAdjacentPositions(self) -> List[Position]:
         return self.GetObservableAdjacentPositions(self.player)
         
     def GetObservableAdjacentPositions(self, pos):
-        ret = []
-        ret.append(Position(pos.x - 1, pos.y))
-        ret.append(Position(pos.x + 1, pos.y))
-        ret.append(Position(pos.x, pos.y - 1))
-        ret.append(Position(pos.x, pos.y + 1))
-        return ret
+        return [Position.At(pos.x + dx, pos.y + dy) for dx, dy in OBSERVABLE_OFFSETS]
 
 
 
     def GetAllAdjacentPositions(self):
-        ret = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0: continue
-                ret.append(Position(self.player.x + dx, self.player.y + dy))
-        return ret
+        x, y = self.player
+        return [Position.At(x + dx, y + dy) for dx, dy in ALL_OFFSETS]
 
     def NextPositionAhead(self, steps):
-        ret = None
-        if self.dir == "north":
-            ret = Position(self.player.x, self.player.y - steps)
-        elif self.dir == "east":
-            ret = Position(self.player.x + steps, self.player.y)
-        elif self.dir == "south":
-            ret = Position(self.player.x, self.player.y + steps)
-        elif self.dir == "west":
-            ret = Position(self.player.x - steps, self.player.y)
-        return ret
+        offset = DIRECTION_OFFSETS.get(self.dir)
+        if offset is None:
+            return None
+        return Position.At(self.player.x + offset[0] * steps, self.player.y + offset[1] * steps)
 
 
     def NextPosition(self) -> Position:
@@ -206,21 +437,32 @@ class GameAI():
 
 
     def GetPlayerPosition(self):
-        return Position(self.player.x, self.player.y)
+        return self.player  # immutable, safe to share
 
 
 
     def SetPlayerPosition(self, x: int, y: int):
-        self.player.x = x
-        self.player.y = y
+        self.player = Position.At(x, y)
+        if (x, y) not in self.visited:
+            self.MapChanged()
+            self.hierarchy.Touch((x, y))
+        if (x, y) not in self.visited or (x, y) not in self.safe_cells:
+            self.safety.Invalidate((x, y))
         self.visited.add((x, y))
         self.safe_cells.add((x, y))
+
+    # <summary>
+    # Invalidate searches that depend on the map knowledge
+    # </summary>
+    def MapChanged(self):
+        self.map_version += 1
     
 
 
     def GetObservations(self, o):
         if "damage" in o:
             self.under_attack = True
+            self.damage_tick = self.decisions
             print("EVENT: Taken Damage!")
             return
             
@@ -230,8 +472,12 @@ class GameAI():
             return
 
         self.current_observations = o
+        if self.IsDead():
+            return  # percepts of the cell we died on: nothing in them is safe
 
         curr_x, curr_y = self.player.x, self.player.y
+        if (curr_x, curr_y) not in self.safe_cells:
+            self.safety.Invalidate((curr_x, curr_y))
         self.safe_cells.add((curr_x, curr_y))
         self.map_state[(curr_x, curr_y)] = "Safe"
         
@@ -241,9 +487,15 @@ class GameAI():
             if s == "blocked":
                 blocked = True
             elif s == "breeze":
-                self.breeze_sources.add((curr_x, curr_y))
+                if (curr_x, curr_y) not in self.breeze_sources:
+                    self.breeze_sources.add((curr_x, curr_y))
+                    self.safety.Invalidate((curr_x, curr_y))
+                    self.MapChanged()
             elif s == "flash":
-                self.flash_sources.add((curr_x, curr_y))
+                if (curr_x, curr_y) not in self.flash_sources:
+                    self.flash_sources.add((curr_x, curr_y))
+                    self.safety.Invalidate((curr_x, curr_y))
+                    self.MapChanged()
             elif s == "blueLight":
                 self.gold_locations.add((curr_x, curr_y))
             elif s == "redLight":
@@ -258,19 +510,136 @@ class GameAI():
 
         if "redLight" not in o and (curr_x, curr_y) in self.powerup_locations:
              self.powerup_locations.discard((curr_x, curr_y))
+
+        self.ObserveForMapCache("breeze" in o, "flash" in o)
                 
         if blocked and self.last_action == "andar":
             wall_pos = self.NextPosition()
-            if wall_pos:
+            if wall_pos and (wall_pos.x, wall_pos.y) not in self.hazards:
+                self.MapChanged()
                 self.hazards.add((wall_pos.x, wall_pos.y))
                 self.map_state[(wall_pos.x, wall_pos.y)] = "Wall"
                 self.safe_cells.discard((wall_pos.x, wall_pos.y))
+                self.safety.Invalidate((wall_pos.x, wall_pos.y))
+            if wall_pos:
+                self.ObserveForMapCache(wall=(wall_pos.x, wall_pos.y))
+
+        self.Publish()
 
 
 
     def GetObservationsClean(self):
         self.current_observations = []
         self.enemy_nearby = False  # Reset flag
+        if not self.IsDead():
+            self.ObserveForMapCache(False, False)
+
+    def IsDead(self):
+        return self.state.lower() in self.DEAD_STATES
+
+    # <summary>
+    # Match percepts against cached arenas: warm-start on a hit, undo it on a contradiction
+    # </summary>
+    def ObserveForMapCache(self, breeze=False, flash=False, wall=None):
+        if not self.map_cache:
+            return
+        loaded = self.map_cache.matched
+        if wall is not None:
+            cached = self.map_cache.ObserveWall(wall)
+        else:
+            cached = self.map_cache.Observe((self.player.x, self.player.y), breeze, flash)
+        if loaded is not None and self.map_cache.matched is None:
+            self.DropWarmStart()
+        if cached:
+            self.WarmStart(cached)
+
+    def WarmStart(self, cached):
+        print(f"MAP CACHE: Arena recognised. Loading {len(cached.layers['visited'])} known cells.")
+        added = {name: set() for name in ("visited", "safe_cells", "hazards", "breeze_sources",
+                                          "flash_sources", "gold_locations", "powerup_locations")}
+
+        def Load(name, cell):
+            store = getattr(self, name)
+            if cell not in store:
+                store.add(cell)
+                added[name].add(cell)
+
+        for cell in cached.layers["visited"]:
+            Load("visited", cell)
+            Load("safe_cells", cell)
+            self.hierarchy.Touch(cell)  # only the loaded blocks are rebuilt, no full resync
+            self.map_state[cell] = "Safe"
+        for cell in cached.layers["hazards"]:
+            Load("hazards", cell)
+            self.safe_cells.discard(cell)
+            self.map_state[cell] = "Wall"
+        for name in ("breeze_sources", "flash_sources", "gold_locations", "powerup_locations"):
+            for cell in cached.layers[name]:
+                Load(name, cell)
+        self.warm_start = added
+        self.safety = SafetyMap()  # Bulk load: cheaper to start over than to invalidate each cell
+        self.MapChanged()
+        self.Publish()
+
+    # <summary>
+    # Forget what the cache loaded, keeping what this match observed itself
+    # </summary>
+    def DropWarmStart(self):
+        added, self.warm_start = self.warm_start, None
+        if not added:
+            return
+        observed, walls = self.map_cache.observed, self.map_cache.walls
+        print(f"MAP CACHE: Wrong arena. Forgetting {len(added['visited'])} loaded cells.")
+        for name, cells in added.items():
+            store = getattr(self, name)
+            for cell in cells:
+                if name in ("visited", "safe_cells", "gold_locations", "powerup_locations") and cell in observed:
+                    continue  # seen (and kept up to date) by this match
+                if name == "hazards" and cell in walls:
+                    continue
+                store.discard(cell)
+                if name in ("visited", "hazards") and cell not in observed and cell not in walls:
+                    self.map_state.pop(cell)
+        # Percepts the cache had already marked were not re-added: restore ours
+        for cell, (breeze, flash) in observed.items():
+            if breeze:
+                self.breeze_sources.add(cell)
+            if flash:
+                self.flash_sources.add(cell)
+        self.safety = SafetyMap()
+        self.hierarchy = HierarchicalPlanner()
+        self.distance_field = None
+        self.path_search = None
+        self.MapChanged()
+        self.Publish()
+
+    def SaveMapKnowledge(self):
+        if not self.map_cache:
+            return
+        try:
+            path = self.map_cache.Save(self)
+            if path:
+                print(f"MAP CACHE: Saved map knowledge to {path}")
+        except OSError as e:
+            print(f"MAP CACHE: Could not save map knowledge: {e}")
+
+    # <summary>
+    # Forget the previous arena when a new match starts (the cache re-learns it)
+    # </summary>
+    def StartMatch(self):
+        for name in self.KNOWLEDGE_STORES:
+            setattr(self, name, type(getattr(self, name))())
+        self.players.Clear()
+        self.ResetTacticalState()
+        self.teleports = {}
+        self.last_pos = None  # the first status of the new arena is not a jump
+        self.hierarchy = HierarchicalPlanner()
+        self.energy_planner.Reset()
+        self.warm_start = None
+        if self.map_cache:
+            self.map_cache.Reset()
+        self.MapChanged()
+        self.Publish()
     
     # <summary>
     # Track enemy position for prediction
@@ -300,6 +669,7 @@ class GameAI():
                 # Salvar última posição conhecida
                 enemy_id = f"enemy_{self.dir}_{distance}"  # ID aproximado
                 current_time = self.game_time
+                self.PruneEnemyTracking(current_time)
                 
                 if enemy_id in self.enemy_last_positions:
                     old_x, old_y, old_time = self.enemy_last_positions[enemy_id]
@@ -313,6 +683,16 @@ class GameAI():
                 
         except Exception as e:
             print(f"Error tracking enemy: {e}")
+
+    # <summary>
+    # Drop sightings too old to estimate a velocity from (or from an earlier match)
+    # </summary>
+    def PruneEnemyTracking(self, now):
+        stale = [enemy_id for enemy_id, (_, _, seen) in self.enemy_last_positions.items()
+                 if seen > now or now - seen > self.ENEMY_TRACK_SECONDS]
+        for enemy_id in stale:
+            del self.enemy_last_positions[enemy_id]
+            self.enemy_velocity.pop(enemy_id, None)
     
     # <summary>
     # Predict if should shoot based on enemy movement
@@ -339,103 +719,117 @@ class GameAI():
             lateral_speed = abs(dy)
         
         # Se movimento lateral é significativo, considerar não atirar
-        if lateral_speed > 0.5:  # Movendo rápido lateral
-            return enemy_dist <= 3  # Só atira se muito perto
+        if lateral_speed > self.params.lateral_speed:  # Movendo rápido lateral
+            return enemy_dist <= self.params.close_shot_distance  # Só atira se muito perto
         
         return True  # Atira normalmente
 
 
 
-    def GetDecision(self) -> str:
+    def GetDecision(self, budget: Optional[float] = None) -> str:
+        # ============== TICK BUDGET ==============
+        # Searches poll this deadline and hand back their best answer so far
+        # when it expires; the interrupted search resumes on the next tick.
+        deadline = Deadline(budget if budget is not None else self.decision_budget)
+        self.decisions += 1
+        self.energy_planner.Observe(self.energy)
+
+        # Single exit: DetectTransition reads last_action, whichever branch chose it
+        action = self.ChooseAction(deadline)
+        self.last_action = action
+        return action
+
+    # <summary>
+    # Action for this tick, by priority: anti-stuck, refuel, gold, combat, exploration
+    # </summary>
+    def ChooseAction(self, deadline: Deadline) -> str:
         # ============== ANTI-STUCK: Track position history ==============
+        self.phase = "anti_stuck"
         curr_pos = (self.player.x, self.player.y)
         self.position_history.append(curr_pos)
-        if len(self.position_history) > 10:
-            self.position_history.pop(0)
-        
-        # Check if stuck in straight line (same row OR column for 4+ moves)
-        if len(self.position_history) >= 4 and not self.gold_locations:
-            last_4 = self.position_history[-4:]
-            all_same_x = all(p[0] == last_4[0][0] for p in last_4)
-            all_same_y = all(p[1] == last_4[0][1] for p in last_4)
-            
-            if all_same_x or all_same_y:
+        
+        if not self.gold_locations:
+            # Check if stuck in straight line (same row OR column for 4+ moves)
+            if self.position_history.StraightLine(4):
                 print("ANTI-STUCK: Detected straight-line pattern! Forcing turn.")
                 self.position_history.clear()
                 return "virar_direita"
+
+            # A-B-A-B oscillation or going round a small loop: take the best
+            # fallback move (it penalises recent cells) before forgetting them
+            if self.position_history.Oscillating() or self.position_history.Cycling():
+                print("ANTI-STUCK: Detected oscillation/cycle! Breaking the loop.")
+                action = self.FallbackMove()
+                self.position_history.clear()
+                self.distance_field = None
+                return action
         
         # ============== FSM STATE TRANSITIONS ==============
         old_state = self.fsm_state
         
+        self.phase = "refuel"
         # PRIORITY -2: CRITICAL SURVIVAL (Energy Critical < 20)
         # ABSOLUTE PRIORITY: Must find powerup immediately, ignore everything
-        if self.energy < self.CRITICAL_ENERGY:
+        if self.energy < self.params.critical_energy:
             # Check current cell
             if "redLight" in self.current_observations:
                 print(f"CRITICAL: Energy at {self.energy}! Grabbing powerup NOW!")
-                self.last_action = "pegar_powerup"
                 return "pegar_powerup"
             
             # Search for known powerups with HIGHEST priority
-            if self.powerup_locations:
-                start = (self.player.x, self.player.y)
-                nearest_pup = min(self.powerup_locations, key=lambda p: abs(p[0]-start[0]) + abs(p[1]-start[1]))
+            nearest_pup = self.FindNearestItem(self.powerup_locations, deadline)
+            if nearest_pup:
                 print(f"CRITICAL: Energy at {self.energy}! Fleeing to PowerUp at {nearest_pup}")
-                next_step = self.GetNextStepTowards(nearest_pup)
+                next_step = self.GetNextStepTowards(nearest_pup, deadline)
                 if next_step:
-                    self.last_action = next_step
                     return next_step
             
             print(f"CRITICAL: Energy at {self.energy}! No powerups known. Exploring for survival.")
             # Will continue to exploration below to find powerups
         
         # PRIORITY -1: LOW ENERGY (Proactive refueling when < 100)
-        elif self.energy < 100:
+        elif self.energy < self.params.refuel_energy:
             # Check current cell
             if "redLight" in self.current_observations:
                  print(f"PRIORITY: Low Energy ({self.energy}) & PowerUp found. Refueling.")
-                 self.last_action = "pegar_powerup"
                  return "pegar_powerup"
                  
             # Check memory for powerups
-            if self.powerup_locations:
-                 start = (self.player.x, self.player.y)
-                 nearest_pup = min(self.powerup_locations, key=lambda p: abs(p[0]-start[0]) + abs(p[1]-start[1]))
+            nearest_pup = self.FindNearestItem(self.powerup_locations, deadline)
+            if nearest_pup:
                  print(f"PRIORITY: Low Energy ({self.energy}). Moving to known PowerUp at {nearest_pup}")
-                 next_step = self.GetNextStepTowards(nearest_pup)
+                 next_step = self.GetNextStepTowards(nearest_pup, deadline)
                  if next_step:
-                     self.last_action = next_step
                      return next_step
 
         # PRIORITY 0: GOLD
+        self.phase = "gold"
         if "blueLight" in self.current_observations:
             print("PRIORITY: Gold found (Current). Collecting.")
-            self.last_action = "pegar_ouro"
             return "pegar_ouro"
             
 
         if "weakLight" in self.current_observations:
              print("PRIORITY: Unknown item. Collecting.")
-             self.last_action = "pegar_ouro" 
              return "pegar_ouro"
 
 
         if self.gold_locations:
              start = (self.player.x, self.player.y)
-             nearest = min(self.gold_locations, key=lambda p: abs(p[0]-start[0]) + abs(p[1]-start[1]))
+             nearest = self.FindNearestItem(self.gold_locations, deadline)
              
              # If we are AT the gold location but don't see blueLight, it's gone!
              if nearest == start:
                  print(f"PRIORITY: Arrived at gold location {nearest} but no gold found. Removing from memory.")
                  self.gold_locations.discard(nearest)
-             else:
+             elif nearest:
                  print(f"PRIORITY: Moving to known gold at {nearest}")
-                 next_step = self.GetNextStepTowards(nearest)
+                 next_step = self.GetEnergySafeStep(nearest, deadline)
                  if next_step:
-                     self.last_action = next_step
                      return next_step
                  
         # PRIORITY 1: HUNTER / COMBAT
+        self.phase = "combat"
         enemy_visible = False
         enemy_dist = 999
         
@@ -467,17 +861,21 @@ class GameAI():
             # OR if DEFENSIVE mode (protecting lead)
             strategic_mode = self.GetStrategicMode()
             
-            if self.energy < self.LOW_ENERGY or strategic_mode == "DEFENSIVE":
+            if self.energy < self.params.low_energy or strategic_mode == "DEFENSIVE":
                 if strategic_mode == "DEFENSIVE":
                     print(f"STRATEGIC RETREAT: Protecting lead (Rank {self.my_rank}/{self.total_players}). Avoiding combat.")
                 else:
                     print(f"TACTICAL RETREAT: Energy low ({self.energy}) & enemy detected at {enemy_dist}! Fleeing.")
                 
-                import random
-                if random.choice([True, False]):
-                    return "virar_direita"
-                else:
-                    return "virar_esquerda"
+                plan = self.FreshPlan()
+                escape_step = plan.escape_step if plan else self.FindEscapeStep(deadline)
+
+                # Attack, strafe, back off, retreat or grab: best expected value over rollouts
+                # (not cached: the rollouts keep refining the same standoff tick after tick)
+                action, option = self.rollout_planner.Decide(self, enemy_dist, escape_step, deadline,
+                                                             defensive=strategic_mode == "DEFENSIVE")
+                print(f"RETREAT: Rollouts chose {option} ({action}).")
+                return action
 
             # Check Line of Fire up to enemy distance
             if self.HasLineOfFire(enemy_dist):
@@ -486,7 +884,6 @@ class GameAI():
                 
                 if should_shoot:
                     print(f"HUNTER: Enemy detected at dist {enemy_dist} & Clear Shot! Attacking.")
-                    self.last_action = "atacar"
                     return "atacar"
                 else:
                     print(f"HUNTER: Enemy at {enemy_dist} moving laterally. Repositioning for better shot.")
@@ -514,8 +911,14 @@ class GameAI():
             return "virar_esquerda"
             
         if self.under_attack:
-            print("HUNTER: Under attack! Spinning to find target.")
             self.under_attack = False # Reset flag after reacting
+            # The shooter shares our row or column: face it if we know where it is
+            line = self.EnemyInLine()
+            if line:
+                direction, distance, info = line
+                print(f"HUNTER: Under attack! {info.name} is {distance} cells {direction}. Facing it.")
+                return self.FaceDirection(direction)
+            print("HUNTER: Under attack! Spinning to find target.")
             return "virar_direita" # Spin to find
         
         # HUNTER: Active hunting when steps detected
@@ -528,9 +931,15 @@ class GameAI():
             else:
                 print("HUNTER: Steps detected! Enemy is close but not in sight. Scanning area.")
             
+            self.enemy_nearby = False  # Reset to avoid infinite spin
+            line = self.EnemyInLine()
+            if line:
+                direction, distance, info = line
+                print(f"HUNTER: {info.name} is {distance} cells {direction}. Facing it.")
+                return self.FaceDirection(direction)
+
             # Enemy is adjacent but not in front of us
             # Spin to find them
-            self.enemy_nearby = False  # Reset to avoid infinite spin
             return "virar_direita"
             
         if self.shot_connected:
@@ -538,18 +947,22 @@ class GameAI():
              self.shot_connected = False
         
         # EXPLORATION
-        
-        target = self.FindNearestFrontier()
-        
+        self.phase = "exploration"
+        if deadline.Expired():
+            print("BUDGET: Tick deadline reached before exploration. Falling back.")
+            return self.FallbackMove()
+
+        target = self.FindBestFrontier(deadline)
+
         if target:
 
-            next_step = self.GetNextStepTowards(target)
+            next_step = self.GetEnergySafeStep(target, deadline)
             if next_step:
-                self.last_action = next_step
                 return next_step
         
         # FALLBACK
-        return self.RandomSafeMove()
+        self.phase = "fallback"
+        return self.FallbackMove()
 
     def HasLineOfFire(self, max_dist=5):
         print(f"LOS CHECK: Checking {max_dist} steps ahead from {self.player} facing {self.dir}")
@@ -566,137 +979,298 @@ class GameAI():
                 
         return True
 
+    # <summary>
+    # Enemies around: observations change every tick even if we stand still
+    # </summary>
+    def InCombat(self):
+        return (self.enemy_nearby or self.under_attack or self.combat_state is not None
+                or any(o.startswith("enemy#") for o in self.current_observations))
+
+    # <summary>
+    # Apply a turn locally when no status is requested after it (turns always succeed)
+    # </summary>
+    def PredictTurn(self, action):
+        if action not in ("virar_direita", "virar_esquerda") or self.dir not in DIRECTION_INDEX:
+            return
+        step = 1 if action == "virar_direita" else -1
+        self.dir = DIRECTIONS[(DIRECTION_INDEX[self.dir] + step) % 4]
+
+    # <summary>
+    # Store a `player` line from the server (our own is ignored)
+    # </summary>
+    def UpdatePlayer(self, info):
+        if info.name != self.my_name:
+            self.players.Update(info)
+
+    # <summary>
+    # Closest recently seen enemy in our row or column with no known wall between
+    # </summary>
+    def EnemyInLine(self, max_range=ENEMY_RANGE):
+        x, y = self.player.x, self.player.y
+        for direction, distance, info in self.players.InLine((x, y), max_range, self.PLAYER_MAX_AGE):
+            dx, dy = DIRECTION_OFFSETS[direction]
+            if all(self.map_state.get((x + dx * i, y + dy * i)) != "Wall" for i in range(1, distance)):
+                return direction, distance, info
+        return None
+
+    # <summary>
+    # Shoot if already facing the direction, otherwise turn towards it
+    # </summary>
+    def FaceDirection(self, direction):
+        if direction == self.dir:
+            return "atacar"
+        dx, dy = DIRECTION_OFFSETS[direction]
+        return self.ActionTowards((self.player.x + dx, self.player.y + dy))
+
     def GetNeighbors(self, x, y):
         return [(x, y-1), (x+1, y), (x, y+1), (x-1, y)]
+
+    # <summary>
+    # (step, landing) pairs: stepping on a known teleport lands on its destination
+    # </summary>
+    def GetSuccessors(self, x, y):
+        for step in self.GetNeighbors(x, y):
+            dest = self.teleports.get(step)
+            yield step, (dest if dest else step)
         
+    # <summary>
+    # Memoized safety verdict (computed once, dropped when its neighbourhood changes)
+    # </summary>
     def IsSafe(self, x, y):
         if x < 0 or y < 0: return False
-        
+
+        verdict = self.safety.get((x, y))
+        if verdict is None:
+            verdict = self.ClassifySafety(x, y)
+            self.safety.Remember((x, y), verdict)
+        return verdict
+
+    # <summary>
+    # Safety rule: known safe, or next to a visited cell without breeze/flash
+    # </summary>
+    def ClassifySafety(self, x, y):
+        """Reads only the cell and its four neighbours (see SafetyMap.Invalidate)."""
         if (x, y) in self.safe_cells: return True
         if (x, y) in self.hazards: return False
-        
 
-        
-
-        neighbors = self.GetNeighbors(x, y)
-        for nx, ny in neighbors:
+        for nx, ny in self.GetNeighbors(x, y):
             if (nx, ny) in self.visited:
                 if (nx, ny) not in self.breeze_sources and (nx, ny) not in self.flash_sources:
-                    self.safe_cells.add((x, y))
                     return True
-        
+
         return False
 
-    def FindNearestFrontier(self):
+    # <summary>
+    # Distances and first steps from the player to every known cell
+    # </summary>
+    def GetDistanceField(self, deadline: Optional[Deadline] = None):
+        """
+        One wavefront pass serves the frontier, item, escape and routing
+        queries of the tick. Cached per (position, map_version); an expansion
+        cut short by the deadline is exact up to its last ring and resumes on
+        the next call.
+        """
         start = (self.player.x, self.player.y)
-        queue = deque([start])
-        visited_bfs = {start}
+        field = self.distance_field
+        if field is None or not field.Matches(self, start):
+            field = DistanceField(self, start, field)
+            self.distance_field = field
 
-        while queue:
-            curr = queue.popleft()
-            if self.IsSafe(curr[0], curr[1]) and curr not in self.visited:
-                return curr
+        if not field.done:
+            field.Run(self, deadline)
+        return field
 
-            
-            for nx, ny in self.GetNeighbors(curr[0], curr[1]):
-                if (nx, ny) not in visited_bfs:
-                    if (nx, ny) in self.visited:
-                        visited_bfs.add((nx, ny))
-                        queue.append((nx, ny))
-                    elif self.IsSafe(nx, ny):
-                        # Found a safe unvisited! This is our target.
-            # We don't add to queue because we stop here.
-                        return (nx, ny)
-        
-        return None
+    # <summary>
+    # First step of the shortest known route out of the current row and column
+    # </summary>
+    def FindEscapeStep(self, deadline: Optional[Deadline] = None):
+        field = self.GetDistanceField(deadline)
+        return field.FirstStep(field.NearestOffLine() or field.start)
+
+    # <summary>
+    # Frontier cell worth walking to: fewest ticks away, most to reveal on ties (Map.FrontierRegions)
+    # </summary>
+    def FindBestFrontier(self, deadline: Optional[Deadline] = None):
+        plan = self.FreshPlan()
+        if plan:
+            return plan.frontier
+
+        field = self.GetDistanceField(deadline)
+        target = field.BestFrontier(self.dir)
+        if target is None and not field.done:
+            print("BUDGET: Frontier search interrupted. Resuming next tick.")
+        return target
 
-    def GetNextStepTowards(self, target):
-        # A* pathfinding with Manhattan distance heuristic
+    # <summary>
+    # Closest known item by route length (Manhattan guess while the field is partial)
+    # </summary>
+    def FindNearestItem(self, cells, deadline: Optional[Deadline] = None):
+        if not cells:
+            return None
+        field = self.GetDistanceField(deadline)
+        nearest = field.Nearest(cells)
+        if nearest is None and not field.done:
+            start = field.start
+            nearest = min(cells, key=lambda p: abs(p[0]-start[0]) + abs(p[1]-start[1]))
+        return nearest
+
+    def GetNextStepTowards(self, target, deadline: Optional[Deadline] = None):
+        # First step from the distance field (cluster graph while the field is partial)
         start = (self.player.x, self.player.y)
         
         if start == target:
             return None
+
+        plan = self.FreshPlan()
+        if plan:
+            for planned_target, step in ((plan.frontier, plan.frontier_step),
+                                         (plan.gold, plan.gold_step),
+                                         (plan.powerup, plan.powerup_step)):
+                if planned_target == target and step:
+                    return self.ActionTowards(step)
+
+        field = self.GetDistanceField(deadline)
+        first_move = field.FirstStep(target)
+        if first_move:
+            return self.ActionTowards(first_move)
+        if field.done:
+            return None  # not reachable through known cells
+
+        # Target beyond the rings expanded so far: route on the cluster graph
+        # (None while the graph is still being rebuilt within the deadline)
+        first_move = self.hierarchy.FirstStep(self, start, target, deadline)
+        if first_move:
+            return self.ActionTowards(first_move)
+
+        # No route without teleports: anytime A* partial step
+        search = self.path_search
+        if search is None or not search.Matches(self, start, target):
+            search = PathSearch(self, start, target)
+            self.path_search = search
+
+        first_move = search.Run(self, deadline)
+        if first_move is None:
+            return None
+        if not search.done:
+            print(f"BUDGET: Route to {target} interrupted. Taking best partial step.")
+
+        return self.ActionTowards(first_move)
+
+    # <summary>
+    # Next step towards a target, refueling first when reaching it would strand us
+    # </summary>
+    def GetEnergySafeStep(self, target, deadline: Optional[Deadline] = None):
+        verdict, first_move = self.energy_planner.Route(self, target, self.params.critical_energy, deadline)
+        if verdict and first_move:
+            return self.ActionTowards(first_move)
+        if verdict is False:
+            powerup = self.FindNearestItem(self.powerup_locations, deadline)
+            if powerup and powerup != (self.player.x, self.player.y):
+                print(f"ENERGY: {target} would leave no power-up in reach "
+                      f"(drain {self.energy_planner.drain:.2f}/tick). Refueling at {powerup} first.")
+                next_step = self.GetNextStepTowards(powerup, deadline)
+                if next_step:
+                    return next_step
+        return self.GetNextStepTowards(target, deadline)
+
+    # <summary>
+    # Action that moves (or turns) the player towards an adjacent cell
+    # </summary>
+    def ActionTowards(self, first_move):
+        # Determine action based on first_move coordinate
+        tx, ty = first_move
+        sx, sy = self.player.x, self.player.y
         
-        # Manhattan distance heuristic
-        def heuristic(pos):
-            return abs(pos[0] - target[0]) + abs(pos[1] - target[1])
-        
-        # Priority queue: (f_score, counter, current_pos, path)
-        # f_score = g_score + h_score
-        # g_score = actual cost from start
-        # h_score = heuristic estimated cost to target
-        counter = 0  # Tie-breaker for equal f_scores
-        pq = [(heuristic(start), counter, start, [])]
-        visited_astar = {start}
-        g_scores = {start: 0}
-        
-        while pq:
-            f_score, _, curr, path = heapq.heappop(pq)
-            
-            # Found target
-            if curr == target:
-                if not path:
-                    return None
-                    
-                first_move = path[0]
-                
-                # Determine action based on first_move coordinate
-                tx, ty = first_move
-                sx, sy = start
-                
-                # Determine target direction
-                curr_dir = self.dir
-                target_dir = ""
-                
-                if ty < sy: target_dir = "north"
-                elif tx > sx: target_dir = "east"
-                elif ty > sy: target_dir = "south"
-                elif tx < sx: target_dir = "west"
-                
-                if curr_dir == target_dir:
-                    return "andar"
-                
-                # Turn logic (shortest turn)
-                dirs = ["north", "east", "south", "west"]
-                idx_curr = dirs.index(curr_dir)
-                idx_target = dirs.index(target_dir)
-                
-                diff = (idx_target - idx_curr) % 4
-                if diff == 1: return "virar_direita"
-                if diff == 3: return "virar_esquerda"
-                if diff == 2: return "virar_direita"  # 180 turn (arbitrary choice)
-            
-            # Expand neighbors
-            curr_g = g_scores[curr]
-            for nx, ny in self.GetNeighbors(curr[0], curr[1]):
-                # Can only traverse visited cells OR the target itself
-                if (nx, ny) not in self.visited and (nx, ny) != target:
-                    continue
-                    
-                new_g = curr_g + 1  # Cost to neighbor is always 1
-                
-                # If we found a better path to this neighbor, update it
-                if (nx, ny) not in g_scores or new_g < g_scores[(nx, ny)]:
-                    g_scores[(nx, ny)] = new_g
-                    f_score = new_g + heuristic((nx, ny))
-                    
-                    new_path = list(path)
-                    new_path.append((nx, ny))
-                    
-                    counter += 1
-                    heapq.heappush(pq, (f_score, counter, (nx, ny), new_path))
-                    visited_astar.add((nx, ny))
+        # Determine target direction
+        curr_dir = self.dir
+        target_dir = ""
         
-        return None
+        if ty < sy: target_dir = "north"
+        elif tx > sx: target_dir = "east"
+        elif ty > sy: target_dir = "south"
+        elif tx < sx: target_dir = "west"
+        
+        if curr_dir == target_dir:
+            return "andar"
+        
+        # Turn logic (shortest turn)
+        dirs = ["north", "east", "south", "west"]
+        idx_curr = dirs.index(curr_dir)
+        idx_target = dirs.index(target_dir)
+        
+        diff = (idx_target - idx_curr) % 4
+        if diff == 1: return "virar_direita"
+        if diff == 3: return "virar_esquerda"
+        return "virar_direita"  # 180 turn (arbitrary choice)
+
+    # <summary>
+    # Wall/hazard, visited, IsSafe and breeze-or-flash bits of a cell (per map version)
+    # </summary>
+    def CellCode(self, cell):
+        if self.cell_codes_version != self.map_version:
+            self.cell_codes = {}
+            self.cell_codes_version = self.map_version
+
+        code = self.cell_codes.get(cell)
+        if code is None:
+            code = ((cell in self.hazards or self.map_state.get(cell) == "Wall")
+                    | (cell in self.visited) << 1
+                    | self.IsSafe(cell[0], cell[1]) << 2
+                    | (cell in self.breeze_sources or cell in self.flash_sources) << 3)
+            self.cell_codes[cell] = code
+        return code
+
+    # <summary>
+    # Compact key of everything a local decision reads around the player
+    # </summary>
+    def SituationSignature(self):
+        """
+        One int: heading, the 3x3 known-cell pattern (CellCode of the eight
+        neighbours), which neighbours were visited recently, the energy band,
+        the percept set and the distance of a visible enemy.
+        """
+        x, y = self.player.x, self.player.y
+        key = DIRECTION_INDEX.get(self.dir, 0)
+        for dx, dy in ALL_OFFSETS:
+            key = key << 4 | self.CellCode((x + dx, y + dy))
+        for dx, dy in OBSERVABLE_OFFSETS:
+            key = key << 1 | self.position_history.IsRecent((x + dx, y + dy))
+
+        percepts, enemy_dist = self.PerceptFlags()
+        return ((key << 3 | min(self.energy // 20, 7)) << 8 | percepts) << 4 | min(enemy_dist, 15)
+
+    # <summary>
+    # Current percepts as PERCEPT_FLAGS bits, and the visible enemy's distance (0 = none)
+    # </summary>
+    def PerceptFlags(self):
+        percepts = enemy_dist = 0
+        for obs in self.current_observations:
+            name, _, arg = obs.partition("#")
+            percepts |= PERCEPT_FLAGS.get(name, 0)
+            if name == "enemy" and arg.isdigit():
+                enemy_dist = min(int(arg), 255)
+        return percepts, enemy_dist
+
+    # <summary>
+    # RandomSafeMove, memoized by situation signature (it reads nothing the signature leaves out)
+    # </summary>
+    def FallbackMove(self):
+        key = self.SituationSignature()
+        action = self.decision_cache.Get(key, self.map_version)
+        if action is None:
+            action = self.RandomSafeMove()
+            self.decision_cache.Put(key, action, self.map_version)
+        if self.decision_cache.Lookups() % self.CACHE_REPORT_EVERY == 0:
+            print(f"CACHE: Decisions {self.decision_cache.Report()}")
+        return action
 
     def RandomSafeMove(self):
-        # Anti vai-e-volta: pegar células recentes do histórico
-        recent_positions = set(self.position_history[-5:]) if len(self.position_history) > 0 else set()
+        # Anti vai-e-volta: células recentes vêm do histórico (últimos 5 ticks, O(1))
         
         fwd = self.NextPosition()
         
         # Prioridade 1: Andar pra frente se for seguro E inexplorado E não recente
-        if fwd and self.IsSafe(fwd.x, fwd.y) and (fwd.x, fwd.y) not in self.visited:
+        if fwd and self.CellCode((fwd.x, fwd.y)) & 0b110 == 0b100:  # safe, not visited
             print("FALLBACK: Moving forward to unexplored safe cell.")
             return "andar"
         
@@ -722,27 +1296,26 @@ class GameAI():
                 check_dir = dirs[new_idx]
             
             # Calcular posição resultante
-            if check_dir == "north": nx, ny = self.player.x, self.player.y - 1
-            elif check_dir == "east": nx, ny = self.player.x + 1, self.player.y
-            elif check_dir == "south": nx, ny = self.player.x, self.player.y + 1
-            else: nx, ny = self.player.x - 1, self.player.y
+            dx, dy = DIRECTION_OFFSETS[check_dir]
+            nx, ny = self.player.x + dx, self.player.y + dy
             
             # Pular se for parede/hazard
-            if (nx, ny) in self.hazards or self.map_state.get((nx, ny)) == "Wall":
+            code = self.CellCode((nx, ny))
+            if code & 1:
                 continue
             
             # Calcular score
             score = 0
-            if self.IsSafe(nx, ny) and (nx, ny) not in self.visited:
-                score = 10  # Melhor: seguro e inexplorado
-            elif self.IsSafe(nx, ny):
-                score = 5   # Bom: seguro mas visitado
-            elif (nx, ny) not in self.hazards:
-                score = 2   # OK: desconhecido
+            if code & 0b110 == 0b100:
+                score = self.params.unexplored_score  # Melhor: seguro e inexplorado
+            elif code & 0b100:
+                score = self.params.visited_score     # Bom: seguro mas visitado
+            else:
+                score = self.params.unknown_score     # OK: desconhecido
             
-            # PENALIDADE ANTI VAI-E-VOLTA: -8 se foi visitado recentemente
-            if (nx, ny) in recent_positions:
-                score -= 8
+            # PENALIDADE ANTI VAI-E-VOLTA: se foi visitado recentemente
+            if self.position_history.IsRecent((nx, ny)):
+                score -= self.params.recent_penalty
                 print(f"FALLBACK: Penalizing ({nx},{ny}) - visited recently!")
             
             if score > best_score:
@@ -0,0 +1,45 @@
+class BitGrid:
+    """
+    Packs a width x height grid into a single Python int.
+
+    Cell (x, y) is bit y * stride + x. Each row has one guard column and
+    the grid at least one guard row, always kept at zero, so shifting a mask
+    by 1 (east/west) or by stride (north/south) never leaks into the next
+    row. A shift followed by `& full` is a whole-grid neighbourhood step.
+    Masks are byte aligned so they convert to and from bytes.
+    """
+
+    def __init__(self, width=59, height=34):
+        self.width = width
+        self.height = height
+        self.stride = width + 1
+        self.plane_bytes = (self.stride * (height + 1) + 7) // 8
+
+        row = (1 << width) - 1
+        full = 0
+        for y in range(height):
+            full |= row << (y * self.stride)
+        self.full = full
+
+    def Contains(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def Bit(self, x, y):
+        return 1 << (y * self.stride + x)
+
+    def Mask(self, cells):
+        bits = bytearray(self.plane_bytes)
+        stride, width, height = self.stride, self.width, self.height
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                i = y * stride + x
+                bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, "little")
+
+    def Cell(self, index):
+        y, x = divmod(index, self.stride)
+        return (x, y)
+
+    def Neighbours(self, mask):
+        stride = self.stride
+        return ((mask << 1) | (mask >> 1) | (mask << stride) | (mask >> stride)) & self.full
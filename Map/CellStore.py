@@ -0,0 +1,196 @@
+from itertools import count
+
+TILE_SHIFT = 3  # 8x8 cells per tile
+_STAMPS = count(1)  # one per tile write, unique across every store and fork
+
+
+class _TiledStore:
+    """
+    Persistent cell container with copy-on-write structural sharing.
+
+    Cells are grouped in 8x8 tiles. Fork() returns a new store that shares
+    every tile with this one in O(1); afterwards each side copies the root
+    table and a tile only the first time it writes to them. Tiles are tagged
+    with the token of the store allowed to mutate them in place, so a fork
+    invalidates write access on both sides simply by handing out new tokens.
+
+    Every write also gives the tile a new stamp, unique across all stores,
+    so a reader that remembers the stamps it saw (Map.LayerMasks) can tell
+    which tiles changed since without comparing cells.
+
+    Only the owning thread may write. Frozen forks are read-only snapshots
+    and are safe to read from other threads while the owner keeps writing.
+    """
+
+    __slots__ = ("_root", "_root_owned", "_token", "_len", "_frozen")
+
+    def __init__(self):
+        self._root = {}          # tile key -> (owner token, tile, stamp)
+        self._root_owned = True
+        self._token = object()
+        self._len = 0
+        self._frozen = False
+
+    @staticmethod
+    def _Key(cell):
+        return (cell[0] >> TILE_SHIFT, cell[1] >> TILE_SHIFT)
+
+    def _Lookup(self, cell):
+        entry = self._root.get((cell[0] >> TILE_SHIFT, cell[1] >> TILE_SHIFT))
+        return entry[1] if entry is not None else None
+
+    def _WritableTile(self, cell):
+        if self._frozen:
+            raise TypeError("cannot modify a frozen snapshot")
+        if not self._root_owned:
+            self._root = dict(self._root)
+            self._root_owned = True
+
+        key = self._Key(cell)
+        entry = self._root.get(key)
+        if entry is not None and entry[0] is self._token:
+            tile = entry[1]
+        else:
+            tile = self._CopyTile(entry[1]) if entry is not None else self._NewTile()
+        self._root[key] = (self._token, tile, next(_STAMPS))
+        return tile
+
+    def Fork(self, frozen=False):
+        child = object.__new__(type(self))
+        child._root = self._root
+        child._root_owned = False
+        child._token = object()
+        child._len = self._len
+        child._frozen = frozen
+        if not self._frozen:
+            # Our tiles are now shared too: the next write must copy them
+            self._root_owned = False
+            self._token = object()
+        return child
+
+    def copy(self):
+        return self.Fork()
+
+    def clear(self):
+        if self._frozen:
+            raise TypeError("cannot modify a frozen snapshot")
+        self._root = {}
+        self._root_owned = True
+        self._len = 0
+
+    def Tiles(self):
+        """(tile key, stamp, tile) for every tile; the stamp changes on each write."""
+        for key, (_, tile, stamp) in self._root.items():
+            yield key, stamp, tile
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+
+class CellSet(_TiledStore):
+    """Set of (x, y) cells with O(1) Fork()."""
+
+    __slots__ = ()
+
+    def __init__(self, cells=()):
+        super().__init__()
+        for cell in cells:
+            self.add(cell)
+
+    def _NewTile(self):
+        return set()
+
+    def _CopyTile(self, tile):
+        return set(tile)
+
+    def __contains__(self, cell):
+        tile = self._Lookup(cell)
+        return tile is not None and cell in tile
+
+    def __iter__(self):
+        for _, tile, _ in self._root.values():
+            yield from tile
+
+    def add(self, cell):
+        if cell in self:
+            return
+        self._WritableTile(cell).add(cell)
+        self._len += 1
+
+    def discard(self, cell):
+        if cell not in self:
+            return
+        self._WritableTile(cell).discard(cell)
+        self._len -= 1
+
+    def update(self, cells):
+        for cell in cells:
+            self.add(cell)
+
+    def __repr__(self):
+        return f"CellSet({set(self)!r})"
+
+
+class CellMap(_TiledStore):
+    """Dict from (x, y) cells to values with O(1) Fork()."""
+
+    __slots__ = ()
+
+    def __init__(self, items=()):
+        super().__init__()
+        for cell, value in dict(items).items():
+            self[cell] = value
+
+    def _NewTile(self):
+        return {}
+
+    def _CopyTile(self, tile):
+        return dict(tile)
+
+    def __contains__(self, cell):
+        tile = self._Lookup(cell)
+        return tile is not None and cell in tile
+
+    def __getitem__(self, cell):
+        tile = self._Lookup(cell)
+        if tile is None:
+            raise KeyError(cell)
+        return tile[cell]
+
+    def get(self, cell, default=None):
+        tile = self._Lookup(cell)
+        if tile is None:
+            return default
+        return tile.get(cell, default)
+
+    def __setitem__(self, cell, value):
+        tile = self._Lookup(cell)
+        if tile is not None and tile.get(cell, _MISSING) == value:
+            return
+        tile = self._WritableTile(cell)
+        if cell not in tile:
+            self._len += 1
+        tile[cell] = value
+
+    def pop(self, cell, default=None):
+        if cell not in self:
+            return default
+        self._len -= 1
+        return self._WritableTile(cell).pop(cell)
+
+    def __iter__(self):
+        for _, tile, _ in self._root.values():
+            yield from tile
+
+    def items(self):
+        for _, tile, _ in self._root.values():
+            yield from tile.items()
+
+    def __repr__(self):
+        return f"CellMap({dict(self.items())!r})"
+
+
+_MISSING = object()
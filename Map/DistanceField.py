@@ -0,0 +1,182 @@
+from Map.FrontierRegions import FrontierRegions
+from Map.LayerMasks import MIN_HEIGHT, MIN_WIDTH, Grid
+
+
+class DistanceField:
+    """
+    Distance and first step from one start cell to every reachable cell.
+
+    Built by wavefront expansion over BitGrid masks: each ring (the cells at
+    distance k) is one int, grown from the previous ring with four shifts and
+    a mask. Only visited cells are expanded; cells next to them (frontier,
+    known items) are reached but not crossed, like the BFS/A* searches did,
+    and a known teleport lands on its destination. One origin mask per
+    neighbour of the start records which first step reaches each cell, so a
+    single pass answers the frontier, item, escape and routing queries.
+
+    A field is bound to (map_version, start). Its layers come from the
+    knowledge stores through ai.layers (Map.LayerMasks), which only re-packs
+    the tiles written since the last field; until they are synced nothing is
+    reached. Both the sync and the expansion are cut short by the deadline:
+    the expansion is exact up to the last ring, and both resume on the next
+    Run.
+    """
+
+    def __init__(self, ai, start, previous=None):
+        self.version = ai.map_version
+        self.start = start
+        self.rings = []
+        self.reached = 0
+        self.edge = 0
+        self.steps = []    # first step (adjacent cell) per origin
+        self.origins = []  # cells reached through steps[i]
+        self.done = False
+
+        if previous is not None and previous.version == self.version and previous.loaded:
+            # Same map knowledge: only the start moved, reuse the layer masks
+            self.grid = previous.grid
+            self.passable = previous.passable
+            self.frontier = previous.frontier
+            self.unknown = previous.unknown
+            self.candidates = previous.candidates
+            self.teleports = previous.teleports
+            self.regions = previous.regions
+            self.loaded = True
+            self._Begin(ai)
+        else:
+            # Empty layers until Run() has synced the masks of this version
+            self.grid = Grid(MIN_WIDTH, MIN_HEIGHT)
+            self.passable = self.frontier = self.unknown = self.candidates = 0
+            self.teleports = []
+            self.regions = None
+            self.loaded = False
+
+    def Matches(self, ai, start):
+        return self.version == ai.map_version and self.start == start
+
+    def _LoadLayers(self, ai):
+        g = self.grid = ai.layers.grid
+        visited, hazards, safe_cells, breeze, flash = ai.layers.Masks()
+        warned = breeze | flash
+        calm = visited & ~warned
+        # Same rule as GameAI.IsSafe, for every cell at once
+        safe = safe_cells | (g.Neighbours(calm) & ~hazards)
+
+        self.passable = visited & ~hazards
+        self.frontier = safe & ~visited
+        self.unknown = g.full & ~(visited | hazards | safe)
+        # Unknown cells that may hold the pit or teleport behind a breeze or flash
+        self.candidates = g.Neighbours(warned) & self.unknown
+        self.teleports = [(g.Bit(*source), g.Bit(*dest)) for source, dest in ai.teleports.items()
+                          if dest and g.Contains(*source) and g.Contains(*dest)]
+        self.regions = None  # FrontierRegions, built on first use
+        self.loaded = True
+
+    def _Begin(self, ai):
+        g = self.grid
+        if not g.Contains(*self.start):
+            self.done = True
+            return
+
+        start = g.Bit(*self.start)
+        self.rings = [start]
+        self.reached = start
+
+        # Neighbour order of GetNeighbors, so ties break like the searches
+        parts = []
+        for step in ai.GetNeighbors(*self.start):
+            if g.Contains(*step):
+                self.steps.append(step)
+                self.origins.append(0)
+                parts.append(g.Bit(*step))
+        self._Advance(parts)
+
+    # <summary>
+    # Claim the next ring origin by origin; teleports land on their destination
+    # </summary>
+    def _Advance(self, parts):
+        ring = 0
+        for i, part in enumerate(parts):
+            part &= ~(self.reached | ring)
+            for source, dest in self.teleports:
+                if part & source:
+                    part &= ~source
+                    self.reached |= source
+                    if not (self.reached | ring | part) & dest:
+                        part |= dest
+            self.origins[i] |= part
+            ring |= part
+
+        self.reached |= ring
+        if ring:
+            self.rings.append(ring)
+        self.edge = ring & self.passable
+
+    def Run(self, ai, deadline=None):
+        if not self.loaded:
+            if not ai.layers.Sync(ai, deadline):
+                return False  # tiles packed so far are kept, resume next tick
+            self._LoadLayers(ai)
+            self._Begin(ai)
+
+        neighbours = self.grid.Neighbours
+        while self.edge:
+            edge = self.edge
+            self._Advance([neighbours(edge & origin) for origin in self.origins])
+            if self.edge and deadline is not None and deadline.Expired():
+                return False  # exact up to the last ring, resume next tick
+
+        self.done = True
+        return True
+
+    def Distance(self, cell):
+        if not self.grid.Contains(*cell):
+            return None
+        bit = self.grid.Bit(*cell)
+        for distance, ring in enumerate(self.rings):
+            if ring & bit:
+                return distance
+        return None
+
+    def Reached(self, cell):
+        """True if the expansion got to the cell (a teleport source has no distance but is reached)."""
+        return self.grid.Contains(*cell) and bool(self.reached & self.grid.Bit(*cell))
+
+    def FirstStep(self, cell):
+        if cell == self.start or not self.grid.Contains(*cell):
+            return None
+        bit = self.grid.Bit(*cell)
+        for step, origin in zip(self.steps, self.origins):
+            if origin & bit:
+                return step
+        return None
+
+    def Nearest(self, targets):
+        """Closest reached cell of a mask (or of an iterable of cells), or None."""
+        if not isinstance(targets, int):
+            targets = self.grid.Mask(targets)
+        for ring in self.rings:
+            hit = ring & targets
+            if hit:
+                return self.grid.Cell((hit & -hit).bit_length() - 1)
+        return None
+
+    def NearestFrontier(self):
+        return self.Nearest(self.frontier)
+
+    # <summary>
+    # Frontier cell fewest ticks away from a heading, most to reveal on ties (see FrontierRegions)
+    # </summary>
+    def BestFrontier(self, heading=None):
+        if self.regions is None:
+            self.regions = FrontierRegions(self)
+        return self.regions.Best(self, heading)
+
+    # <summary>
+    # Closest walkable cell outside the start's row and column (out of the line of fire)
+    # </summary>
+    def NearestOffLine(self):
+        g = self.grid
+        x, y = self.start
+        line = g.Mask([(x, row) for row in range(g.height)]) | g.Mask([(col, y) for col in range(g.width)])
+        return self.Nearest(self.passable & ~line)
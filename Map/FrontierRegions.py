@@ -0,0 +1,99 @@
+DIRECTIONS = ("north", "east", "south", "west")
+OFFSETS = {"north": (0, -1), "east": (1, 0), "south": (0, 1), "west": (-1, 0)}
+
+
+class FrontierRegions:
+    """
+    Frontier cells grouped into connected regions, each valued by what
+    visiting it can teach.
+
+    Bound to one map version and shared by every DistanceField of that
+    version, so a region is flood-filled (BitGrid shifts through the
+    frontier mask) and valued once per map change, however many ticks read
+    it. Its gain is a popcount of one mask operation each:
+    - the region's own cells plus the unknown cells around it, which become
+      known (and safe, when the cell is calm) once it is walked;
+    - the unknown cells around it that may hold the pit or teleport behind
+      a breeze or flash not yet resolved, weighted by CONSTRAINT_WEIGHT.
+
+    Best() walks the rings of a distance field from the current position
+    and ranks the regions it reaches by path cost in ticks (ring distance
+    plus the turns needed to face the first step), then by gain. Gain only
+    breaks ties: in simulated matches, letting it outweigh distance left
+    pockets behind that cost more to come back to than they saved. Regions
+    are only built as the rings reach them, and the walk stops once no
+    further ring can beat the best cost.
+    """
+
+    CONSTRAINT_WEIGHT = 2.0
+
+    def __init__(self, field):
+        self.version = field.version
+        self.grid = field.grid
+        self.frontier = field.frontier
+        self.unknown = field.unknown
+        self.candidates = field.candidates
+        self.regions = []  # (mask, gain), in the order they were reached
+
+    def __len__(self):
+        return len(self.regions)
+
+    def Matches(self, field):
+        return self.version == field.version
+
+    # <summary>
+    # Region holding a frontier bit, with its gain (built on first use)
+    # </summary>
+    def Region(self, bit):
+        for region, gain in self.regions:
+            if region & bit:
+                return region, gain
+
+        g, frontier = self.grid, self.frontier
+        region = bit
+        while True:
+            grown = (region | g.Neighbours(region)) & frontier
+            if grown == region:
+                break
+            region = grown
+
+        around = g.Neighbours(region) & ~region
+        reveal = (around & self.unknown).bit_count()
+        constraints = (around & self.candidates).bit_count()
+        gain = region.bit_count() + reveal + self.CONSTRAINT_WEIGHT * constraints
+        self.regions.append((region, gain))
+        return region, gain
+
+    @staticmethod
+    def Turns(field, cell, heading):
+        """Turns before the first step towards a cell: 0 ahead, 1 to a side, 2 behind."""
+        step = field.FirstStep(cell)
+        if step is None or heading not in OFFSETS:
+            return 0
+        offset = (step[0] - field.start[0], step[1] - field.start[1])
+        if offset not in OFFSETS.values():
+            return 0  # first step through a teleport
+        want = next(d for d, o in OFFSETS.items() if o == offset)
+        diff = (DIRECTIONS.index(want) - DIRECTIONS.index(heading)) % 4
+        return min(diff, 4 - diff)
+
+    # <summary>
+    # Nearest cell of the best region reached by the field, or None
+    # </summary>
+    def Best(self, field, heading=None):
+        best, best_key = None, None
+        seen = 0
+        for distance, ring in enumerate(field.rings):
+            if best_key is not None and distance > best_key[0]:
+                break  # turns only add cost, nothing further can win
+            hits = ring & self.frontier & ~seen
+            while hits:
+                bit = hits & -hits
+                region, gain = self.Region(bit)
+                seen |= region
+                hits &= ~region
+                cell = self.grid.Cell(bit.bit_length() - 1)
+                key = (distance + self.Turns(field, cell, heading), -gain)
+                if best_key is None or key < best_key:
+                    best, best_key = cell, key
+        return best
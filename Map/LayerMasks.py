@@ -0,0 +1,120 @@
+from functools import lru_cache
+
+from Map.BitGrid import BitGrid
+from Map.CellStore import TILE_SHIFT
+
+# Arena size from the assignment; the grid grows if the knowledge goes past it
+MIN_WIDTH = 59
+MIN_HEIGHT = 34
+GROWTH = 1.5  # a grid that has to grow grows by at least this much (each growth re-packs everything)
+
+
+@lru_cache(maxsize=8)
+def Grid(width, height):
+    return BitGrid(width, height)
+
+
+class LayerMasks:
+    """
+    BitGrid masks of the knowledge stores, kept in step with them tile by tile.
+
+    The stores are grids of 8x8 tiles whose stamp changes on every write
+    (Map.CellStore), so Sync() only re-packs the tiles whose stamp differs
+    from the one it packed last: a tick that visits one cell re-packs one
+    tile instead of every known cell. The bits are kept in bytearrays laid
+    out like BitGrid.Mask and read as ints by Masks().
+
+    A full re-pack (first use, or the grid growing past the known cells)
+    polls the tick Deadline and resumes on the next Sync, like the cluster
+    graph does; the tiles packed so far are kept. Stamps are unique across
+    stores, so a new match's empty stores or a snapshot's forks are told
+    apart from what was packed without any reset.
+    """
+
+    STORES = ("visited", "hazards", "safe_cells", "breeze_sources", "flash_sources")
+    CHECK_EVERY = 16  # tiles (up to 64 cells each) packed between deadline polls
+
+    def __init__(self):
+        self.grid = None
+        self.bits = []    # per store: bytearray of the grid's bits
+        self.packed = []  # per store: tile key -> (stamp, cells packed from it)
+        self.synced = False
+
+    # <summary>
+    # Copy for a snapshot (the planner thread syncs its own copy)
+    # </summary>
+    def Fork(self):
+        child = LayerMasks()
+        child.grid = self.grid
+        child.bits = [bytearray(bits) for bits in self.bits]
+        child.packed = [dict(packed) for packed in self.packed]
+        return child
+
+    # <summary>
+    # Grid that holds every visited cell with a ring around it
+    # </summary>
+    def _Size(self, visited):
+        tiles = [key for key, _, _ in visited.Tiles()]
+        last_x = max((key[0] for key in tiles), default=0)
+        last_y = max((key[1] for key in tiles), default=0)
+        width = max(MIN_WIDTH, ((last_x + 1) << TILE_SHIFT) + 1)
+        height = max(MIN_HEIGHT, ((last_y + 1) << TILE_SHIFT) + 1)
+        g = self.grid
+        if g is not None and width <= g.width and height <= g.height:
+            return g
+        if g is not None:
+            width = max(width, int(g.width * GROWTH)) if width > g.width else g.width
+            height = max(height, int(g.height * GROWTH)) if height > g.height else g.height
+        return Grid(width, height)
+
+    def _Pack(self, bits, cells, on):
+        g = self.grid
+        stride, width, height = g.stride, g.width, g.height
+        for x, y in cells:
+            if 0 <= x < width and 0 <= y < height:
+                i = y * stride + x
+                if on:
+                    bits[i >> 3] |= 1 << (i & 7)
+                else:
+                    bits[i >> 3] &= 0xFF ^ (1 << (i & 7))
+
+    # <summary>
+    # Re-pack the tiles written since the last Sync; False if the deadline cut it short
+    # </summary>
+    def Sync(self, ai, deadline=None):
+        stores = [getattr(ai, name) for name in self.STORES]
+        g = self._Size(stores[0])
+        if g is not self.grid:
+            self.grid = g
+            self.bits = [bytearray(g.plane_bytes) for _ in stores]
+            self.packed = [{} for _ in stores]
+
+        self.synced = False
+        done = 0
+        for store, bits, packed in zip(stores, self.bits, self.packed):
+            seen = 0
+            for key, stamp, tile in store.Tiles():
+                seen += 1
+                old = packed.get(key)
+                if old is not None and old[0] == stamp:
+                    continue
+                if old is not None:
+                    self._Pack(bits, old[1], False)
+                cells = tuple(tile)
+                self._Pack(bits, cells, True)
+                packed[key] = (stamp, cells)
+                done += 1
+                if deadline is not None and done % self.CHECK_EVERY == 0 and deadline.Expired():
+                    return False  # packed tiles are kept, resume next tick
+            if seen < len(packed):
+                # Tiles the store no longer has (a new match, a dropped warm start)
+                current = {key for key, _, _ in store.Tiles()}
+                for key in [key for key in packed if key not in current]:
+                    self._Pack(bits, packed.pop(key)[1], False)
+
+        self.synced = True
+        return True
+
+    def Masks(self):
+        """One int mask per store, in STORES order (only meaningful once synced)."""
+        return [int.from_bytes(bits, "little") for bits in self.bits]
@@ -0,0 +1,237 @@
+import hashlib
+import os
+import struct
+
+MAGIC = b"T3MC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBHH")  # magic, format version, width, height
+
+# GameAI knowledge stores kept on disk, one bit plane each (in this order)
+LAYERS = ("visited", "hazards", "breeze_sources", "flash_sources", "gold_locations", "powerup_locations")
+
+
+class CachedMap:
+    """Map knowledge of one arena, stored as bit planes over a width x height grid."""
+
+    def __init__(self, width, height, layers, path=None):
+        self.width = width
+        self.height = height
+        self.layers = layers  # layer name -> frozenset of cells
+        self.path = path
+
+    @staticmethod
+    def FromKnowledge(ai):
+        layers = {name: frozenset(c for c in getattr(ai, name) if c[0] >= 0 and c[1] >= 0) for name in LAYERS}
+        cells = [c for cells in layers.values() for c in cells]
+        width = max((c[0] for c in cells), default=-1) + 1
+        height = max((c[1] for c in cells), default=-1) + 1
+        return CachedMap(width, height, layers)
+
+    def Merge(self, other):
+        layers = {name: self.layers[name] | other.layers[name] for name in LAYERS}
+        # Items come and go: keep only the ones seen in the most recent match
+        for name in ("gold_locations", "powerup_locations"):
+            layers[name] = other.layers[name] or self.layers[name]
+        return CachedMap(max(self.width, other.width), max(self.height, other.height), layers, self.path)
+
+    # <summary>
+    # Arena identity: hash of the static layers (walls, breeze and flash)
+    # </summary>
+    def Fingerprint(self):
+        h = hashlib.sha1(HEADER.pack(MAGIC, FORMAT_VERSION, self.width, self.height))
+        for name in ("hazards", "breeze_sources", "flash_sources"):
+            h.update(self._Pack(self.layers[name]))
+        return h.hexdigest()[:16]
+
+    # <summary>
+    # True/False if the cached map confirms/contradicts a percept, None if it says nothing
+    # </summary>
+    def Agrees(self, cell, breeze, flash):
+        """
+        Only a breeze or flash seen in both maps confirms: most cells of any
+        arena are calm, so calm cells agreeing says nothing about identity.
+        """
+        if cell in self.layers["hazards"]:
+            return False
+        if cell not in self.layers["visited"]:
+            return None
+        if (cell in self.layers["breeze_sources"]) != breeze or (cell in self.layers["flash_sources"]) != flash:
+            return False
+        return True if breeze or flash else None
+
+    # <summary>
+    # Same for a wall bumped into
+    # </summary>
+    def AgreesWall(self, cell):
+        if cell in self.layers["hazards"]:
+            return True
+        if cell in self.layers["visited"]:
+            return False
+        return None
+
+    def _Pack(self, cells):
+        bits = bytearray((self.width * self.height + 7) // 8)
+        for x, y in cells:
+            i = y * self.width + x
+            bits[i >> 3] |= 1 << (i & 7)
+        return bytes(bits)
+
+    def _Unpack(self, data):
+        cells = []
+        for byte_index, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                i = (byte_index << 3) + low.bit_length() - 1
+                cells.append((i % self.width, i // self.width))
+                byte ^= low
+        return frozenset(cells)
+
+    def ToBytes(self):
+        out = [HEADER.pack(MAGIC, FORMAT_VERSION, self.width, self.height)]
+        for name in LAYERS:
+            out.append(self._Pack(self.layers[name]))
+        return b"".join(out)
+
+    @staticmethod
+    def FromBytes(data, path=None):
+        magic, version, width, height = HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a map cache file")
+
+        cached = CachedMap(width, height, {}, path)
+        plane = (width * height + 7) // 8
+        offset = HEADER.size
+        for name in LAYERS:
+            cached.layers[name] = cached._Unpack(data[offset:offset + plane])
+            offset += plane
+        return cached
+
+
+class MapCache:
+    """
+    On-disk cache of arena knowledge shared across matches and reconnects.
+
+    Every match starts unmatched. Observations are compared with each
+    cached arena; the arena that never contradicted them and was confirmed
+    by the most distinguishing cells (a breeze, a flash or a wall in both
+    maps), at least MIN_MATCH, is returned so GameAI can warm-start from
+    it. The checks go on after that: the first contradiction clears
+    `matched` (GameAI then drops the loaded knowledge) and the arena is not
+    considered again this match. Save() merges what was learned back into
+    the matched file, or into an arena that already holds everything seen
+    (a match cut short before it was confirmed), or writes a new one.
+    """
+
+    MIN_MATCH = 3  # distinguishing cells
+    MIN_CELLS = 6  # visited cells worth saving
+
+    def __init__(self, directory="map_cache"):
+        self.directory = directory
+        self.maps = None  # loaded lazily
+        self.Reset()
+
+    def Reset(self):
+        self.matched = None
+        self.observed = {}      # cell -> (breeze, flash) seen this match
+        self.walls = set()      # walls bumped into this match
+        self.candidates = None  # CachedMap -> number of confirming cells
+
+    def Load(self):
+        self.maps = []
+        if not os.path.isdir(self.directory):
+            return self.maps
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".map"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    self.maps.append(CachedMap.FromBytes(f.read(), path))
+            except (OSError, ValueError, struct.error) as e:
+                print(f"MAP CACHE: Ignoring {path}: {e}")
+        return self.maps
+
+    # <summary>
+    # Feed the percepts of a newly visited cell; returns the matched arena once
+    # </summary>
+    def Observe(self, cell, breeze, flash):
+        if cell in self.observed:
+            return None
+        self.observed[cell] = (breeze, flash)
+        return self._Evidence(lambda cached: cached.Agrees(cell, breeze, flash))
+
+    # <summary>
+    # Feed a wall bumped into; returns the matched arena once
+    # </summary>
+    def ObserveWall(self, cell):
+        if cell in self.walls:
+            return None
+        self.walls.add(cell)
+        return self._Evidence(lambda cached: cached.AgreesWall(cell))
+
+    def _Evidence(self, agrees):
+        if self.candidates is None:
+            self.candidates = {m: 0 for m in (self.maps if self.maps is not None else self.Load())}
+
+        for cached in list(self.candidates):
+            verdict = agrees(cached)
+            if verdict is False:
+                del self.candidates[cached]
+                if cached is self.matched:
+                    print(f"MAP CACHE: Percepts contradict {cached.path}. Dropping it.")
+                    self.matched = None
+            elif verdict:
+                self.candidates[cached] += 1
+
+        if self.matched is None and self.candidates:
+            cached, confirmed = max(self.candidates.items(), key=self._Rank)
+            if confirmed >= self.MIN_MATCH:
+                self.matched = cached
+                return cached
+        return None
+
+    # <summary>
+    # Most confirmed first, then the one that knows the most cells
+    # </summary>
+    @staticmethod
+    def _Rank(item):
+        cached, confirmed = item
+        return confirmed, len(cached.layers["visited"])
+
+    # <summary>
+    # Candidate that already holds every cell and wall seen this match, None if there is none
+    # </summary>
+    def _Covering(self):
+        if not self.candidates or not (self.observed or self.walls):
+            return None
+        covering = [(cached, confirmed) for cached, confirmed in self.candidates.items()
+                    if all(cell in cached.layers["visited"] for cell in self.observed)
+                    and self.walls <= cached.layers["hazards"]]
+        return max(covering, key=self._Rank, default=(None, 0))[0]
+
+    def Save(self, ai):
+        current = CachedMap.FromKnowledge(ai)
+        if len(current.layers["visited"]) < self.MIN_CELLS:
+            return None
+        # Not confirmed yet is not unknown: a known arena is merged into, not copied
+        base = self.matched if self.matched is not None else self._Covering()
+        if base is not None:
+            current = base.Merge(current)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, current.Fingerprint() + ".map")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(current.ToBytes())
+        os.replace(tmp, path)
+
+        # More walls learned means a new fingerprint: drop the superseded file
+        old_path = current.path
+        if old_path and old_path != path and os.path.exists(old_path):
+            os.remove(old_path)
+
+        current.path = path
+        if self.maps is not None:
+            self.maps = [m for m in self.maps if m.path not in (path, old_path)] + [current]
+        self.matched = current
+        return path
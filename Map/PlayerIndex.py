@@ -0,0 +1,113 @@
+import time
+
+
+class PlayerIndex:
+    """
+    Last known position of every other player, indexed for spatial queries.
+
+    Records (dto.PlayerInfo, stamp) are replaced in place as `player` lines
+    arrive; each id is also filed in a BUCKET x BUCKET grid bucket and in
+    its row and column. Near() only visits the buckets overlapping the
+    query square and InLine() reads one row and one column, so both cost
+    the same however many players there are elsewhere on the map. Stamps
+    come from time.monotonic(); queries can skip records older than
+    max_age seconds.
+    """
+
+    BUCKET = 4
+
+    def __init__(self):
+        self.players = {}  # id -> (PlayerInfo, stamp)
+        self.buckets = {}  # (bx, by) -> set of ids
+        self.rows = {}     # y -> set of ids
+        self.cols = {}     # x -> set of ids
+
+    def __len__(self):
+        return len(self.players)
+
+    def __contains__(self, player_id):
+        return player_id in self.players
+
+    def Get(self, player_id):
+        entry = self.players.get(player_id)
+        return entry[0] if entry else None
+
+    def _Bucket(self, x, y):
+        return (x // self.BUCKET, y // self.BUCKET)
+
+    def _File(self, info):
+        self.buckets.setdefault(self._Bucket(info.x, info.y), set()).add(info.id)
+        self.rows.setdefault(info.y, set()).add(info.id)
+        self.cols.setdefault(info.x, set()).add(info.id)
+
+    def _Unfile(self, info):
+        for table, key in ((self.buckets, self._Bucket(info.x, info.y)), (self.rows, info.y), (self.cols, info.x)):
+            ids = table[key]
+            ids.discard(info.id)
+            if not ids:
+                del table[key]
+
+    def Update(self, info, stamp=None):
+        old = self.players.get(info.id)
+        if old and (old[0].x, old[0].y) != (info.x, info.y):
+            self._Unfile(old[0])
+            old = None
+        if not old:
+            self._File(info)
+        self.players[info.id] = (info, time.monotonic() if stamp is None else stamp)
+
+    def Remove(self, player_id):
+        entry = self.players.pop(player_id, None)
+        if entry:
+            self._Unfile(entry[0])
+
+    def Clear(self):
+        self.players.clear()
+        self.buckets.clear()
+        self.rows.clear()
+        self.cols.clear()
+
+    def _Fresh(self, ids, max_age):
+        limit = None if max_age is None else time.monotonic() - max_age
+        for player_id in ids:
+            info, stamp = self.players[player_id]
+            if limit is None or stamp >= limit:
+                yield info
+
+    # <summary>
+    # Every player seen in the last max_age seconds
+    # </summary>
+    def Fresh(self, max_age=None):
+        return list(self._Fresh(self.players, max_age))
+
+    # <summary>
+    # Players within `radius` cells (Manhattan) of a cell
+    # </summary>
+    def Near(self, cell, radius, max_age=None):
+        x, y = cell
+        (bx0, by0), (bx1, by1) = self._Bucket(x - radius, y - radius), self._Bucket(x + radius, y + radius)
+        found = []
+        for bx in range(bx0, bx1 + 1):
+            for by in range(by0, by1 + 1):
+                ids = self.buckets.get((bx, by))
+                if ids:
+                    found.extend(p for p in self._Fresh(ids, max_age)
+                                 if abs(p.x - x) + abs(p.y - y) <= radius)
+        return found
+
+    # <summary>
+    # Players sharing the cell's row or column, as (direction, distance, PlayerInfo)
+    # </summary>
+    def InLine(self, cell, max_range=None, max_age=None):
+        x, y = cell
+        found = []
+        for p in self._Fresh(self.rows.get(y, ()), max_age):
+            if p.x != x:
+                found.append(("east" if p.x > x else "west", abs(p.x - x), p))
+        for p in self._Fresh(self.cols.get(x, ()), max_age):
+            if p.y != y:
+                found.append(("south" if p.y > y else "north", abs(p.y - y), p))
+        if max_range is not None:
+            found = [f for f in found if f[1] <= max_range]
+        found.sort(key=lambda f: f[1])
+        return found
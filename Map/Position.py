@@ -1,16 +1,16 @@
+from functools import lru_cache
+from typing import NamedTuple
 
-class Position:
-    def __init__(self, x=0, y=0):
-        self.x = x
-        self.y = y
+
+class Position(NamedTuple):
+    x: int = 0
+    y: int = 0
 
     def __str__(self):
         return f"({self.x}, {self.y})"
-        
-    def __eq__(self, other):
-        if isinstance(other, Position):
-            return self.x == other.x and self.y == other.y
-        return False
 
-    def __hash__(self):
-        return hash((self.x, self.y))
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def At(x, y):
+        # Interned positions: grid cells are reused every tick, so share them
+        return Position(x, y)
@@ -0,0 +1,95 @@
+from collections import deque
+
+
+class PositionHistory:
+    """
+    Ring buffer of the player position at each tick, with rolling loop signals.
+
+    Every append updates the counters below in O(1):
+    - same_x_run / same_y_run: length of the current run of ticks sharing a
+      column / row (the straight-line check);
+    - oscillations: consecutive A-B-A moves between two cells;
+    - cycling: cells entered three or more times inside the window.
+    """
+
+    CYCLE_ENTRIES = 3
+
+    def __init__(self, size=10, recent=5):
+        self.size = size
+        self.recent = recent
+        self.clear()
+
+    def clear(self):
+        self.buffer = deque(maxlen=self.size)
+        self.entered = deque(maxlen=self.size)  # True where the tick entered a new cell
+        self.recent_counts = {}                 # position -> ticks among the last `recent`
+        self.entries = {}                       # position -> entries inside the window
+        self.cycling = 0                        # cells with >= CYCLE_ENTRIES entries
+        self.last_cells = deque(maxlen=2)       # last two distinct cells
+        self.same_x_run = 0
+        self.same_y_run = 0
+        self.oscillations = 0
+
+    def append(self, pos):
+        buffer = self.buffer
+        if len(buffer) >= self.recent:
+            self._Decrement(self.recent_counts, buffer[-self.recent])
+        if len(buffer) == self.size and self.entered[0]:
+            self._RemoveEntry(buffer[0])
+
+        prev = buffer[-1] if buffer else None
+        self.same_x_run = self.same_x_run + 1 if prev is not None and prev[0] == pos[0] else 1
+        self.same_y_run = self.same_y_run + 1 if prev is not None and prev[1] == pos[1] else 1
+
+        entered = pos != prev
+        if entered:
+            if len(self.last_cells) == 2 and self.last_cells[0] == pos:
+                self.oscillations += 1
+            else:
+                self.oscillations = 0
+            self.last_cells.append(pos)
+            self._AddEntry(pos)
+
+        buffer.append(pos)
+        self.entered.append(entered)
+        self.recent_counts[pos] = self.recent_counts.get(pos, 0) + 1
+
+    def _AddEntry(self, pos):
+        count = self.entries.get(pos, 0) + 1
+        self.entries[pos] = count
+        if count == self.CYCLE_ENTRIES:
+            self.cycling += 1
+
+    def _RemoveEntry(self, pos):
+        count = self.entries[pos]
+        if count == self.CYCLE_ENTRIES:
+            self.cycling -= 1
+        self._Decrement(self.entries, pos)
+
+    @staticmethod
+    def _Decrement(counts, pos):
+        if counts[pos] == 1:
+            del counts[pos]
+        else:
+            counts[pos] -= 1
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __iter__(self):
+        return iter(self.buffer)
+
+    def __getitem__(self, index):
+        return self.buffer[index]
+
+    def IsRecent(self, pos):
+        return pos in self.recent_counts
+
+    def StraightLine(self, length=4):
+        return self.same_x_run >= length or self.same_y_run >= length
+
+    def Oscillating(self, swings=2):
+        return self.oscillations >= swings
+
+    def Cycling(self):
+        return self.cycling > 0
@@ -0,0 +1,27 @@
+from Map.CellStore import CellMap
+
+NEIGHBOUR_OFFSETS = ((0, 0), (0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class SafetyMap(CellMap):
+    """
+    Memoized safety verdicts (cell -> bool), kept with the knowledge stores.
+
+    A cell's verdict only reads the cell itself and its four neighbours
+    (see GameAI.ClassifySafety), so when one of them gains a percept only
+    that neighbourhood is dropped with Invalidate(); every other verdict
+    stays valid across ticks. Forks share verdicts copy-on-write like the
+    other stores. A frozen fork still answers from what it has but does not
+    remember new verdicts.
+    """
+
+    __slots__ = ()
+
+    def Remember(self, cell, verdict):
+        if not self._frozen:
+            self[cell] = verdict
+
+    def Invalidate(self, cell):
+        x, y = cell
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            self.pop((x + dx, y + dy))
@@ -0,0 +1,23 @@
+import time
+
+
+class Deadline:
+    """Wall-clock budget for one decision tick (None = unbounded)."""
+
+    # Searches poll the clock once every CHECK_EVERY node expansions
+    CHECK_EVERY = 64
+
+    def __init__(self, budget=None):
+        self.start = time.perf_counter()
+        self.expires = None if budget is None else self.start + budget
+
+    def Expired(self):
+        return self.expires is not None and time.perf_counter() >= self.expires
+
+    def Remaining(self):
+        if self.expires is None:
+            return float("inf")
+        return max(0.0, self.expires - time.perf_counter())
+
+    def Elapsed(self):
+        return time.perf_counter() - self.start
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+
+class DecisionCache:
+    """
+    Bounded LRU of tactical decisions keyed by a situation signature.
+
+    Only deterministic decisions belong here. GameAI caches its fallback
+    move (RandomSafeMove), whose inputs (heading, the cells around the
+    player, which of them were visited recently) are all packed into the
+    signature (see GameAI.SituationSignature), so equal keys mean equal
+    answers. Choices that also read enemy velocity, routes or the absolute
+    position, or that are sampled (the rollout planner), are not cached: a
+    hit would reuse an answer to a different question, or freeze one sample.
+
+    Entries are also tied to the map version they were computed on: the
+    first lookup after a bump drops the whole cache. Hit/miss/eviction
+    counters are kept for the periodic report.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _Sync(self, version):
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+                self.entries.clear()
+            self.version = version
+
+    def Get(self, key, version):
+        self._Sync(version)
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def Put(self, key, value, version):
+        self._Sync(version)
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def Lookups(self):
+        return self.hits + self.misses
+
+    def HitRate(self):
+        lookups = self.Lookups()
+        return self.hits / lookups if lookups else 0.0
+
+    def Report(self):
+        return (f"{self.hits}/{self.Lookups()} hits ({self.HitRate():.0%}), {len(self.entries)} entries, "
+                f"{self.evictions} evictions, {self.invalidations} invalidations")
@@ -0,0 +1,158 @@
+from collections import deque
+
+from Map.DistanceField import DistanceField
+from Planning.Deadline import Deadline
+
+NEIGHBOUR_OFFSETS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class EnergyPlanner:
+    """
+    Routes that never leave the bot stranded without a power-up in reach.
+
+    Walking costs score, not energy: energy goes to enemy fire. Observe()
+    keeps the energy lost per decision tick as an EWMA (`drain`), and a step
+    on a cell in the line of fire of a recently seen enemy costs
+    EXPOSURE_COST more. Route() is a resource-constrained breadth-first
+    search over (cell, energy) labels through visited cells and known
+    teleports (GameAI.GetSuccessors, like the distance field):
+    - stepping on a known power-up (once per route) adds POWERUP_MIN, the
+      smallest power-up, after one more tick of drain to grab it;
+    - a label is pruned when its energy drops under the reserve on arrival
+      (before any recharge), or when the cell was already reached in no more steps with at least as much energy
+      (so a cell is only re-expanded after a recharge);
+    - the first label to reach the target with enough energy left to walk on
+      to the nearest power-up gives the route. TailCost() reads that walk off
+      a distance field from the target and prices it at the drain only: the
+      exposed cells are where enemies stand now, not when the tail is walked.
+    With no drain (under MIN_DRAIN) and no exposed cells energy is no
+    constraint and nothing is searched. The tail field and the reachability
+    check (the live distance field) share the layer masks of the map version
+    and resume under the tick deadline like every other distance field.
+    """
+
+    UNREACHABLE = "unreachable"  # Route() verdict: no known route at all, whatever the energy
+
+    DECAY = 0.05          # EWMA weight of one tick
+    MAX_ENERGY = 100
+    POWERUP_MIN = 10      # smallest power-up of the assignment
+    PICKUP_TICKS = 1
+    EXPOSURE_COST = 5.0   # expected damage of a step in an enemy's line (half a shot)
+    MAX_LABELS = 20000
+    MIN_DRAIN = 0.01      # per tick; the EWMA never decays to exactly 0
+
+    def __init__(self):
+        self.drain = 0.0         # energy lost per tick
+        self.last_energy = None
+        self.expanded = 0        # labels expanded by the last Route()
+        self.tail = None         # DistanceField from the last target (for TailCost)
+
+    def Observe(self, energy):
+        if self.last_energy is not None:
+            lost = max(0, self.last_energy - energy)
+            self.drain += self.DECAY * (lost - self.drain)
+        self.last_energy = energy
+
+    def Reset(self):
+        self.drain = 0.0
+        self.last_energy = None
+        self.tail = None
+
+    def Drain(self):
+        return self.drain if self.drain >= self.MIN_DRAIN else 0.0
+
+    # <summary>
+    # Cells in the line of fire of recently seen enemies (stopping at known walls)
+    # </summary>
+    def Exposed(self, ai):
+        cells = set()
+        for info in ai.players.Fresh(ai.PLAYER_MAX_AGE):
+            for dx, dy in NEIGHBOUR_OFFSETS:
+                x, y = info.x, info.y
+                for _ in range(ai.ENEMY_RANGE):
+                    x, y = x + dx, y + dy
+                    if (x, y) in ai.hazards:
+                        break
+                    cells.add((x, y))
+        return cells
+
+    def _Passable(self, ai, cell, target):
+        return cell == target or (cell in ai.visited and cell not in ai.hazards)
+
+    # <summary>
+    # (first step, landing) of each move out of a cell; a known teleport lands on its destination
+    # </summary>
+    def _Moves(self, ai, cell, target):
+        for step, landing in ai.GetSuccessors(*cell):
+            if self._Passable(ai, landing, target):
+                yield step, landing
+
+    # <summary>
+    # Energy from the target to the nearest known power-up (0 when none is known, None while the field runs)
+    # </summary>
+    def TailCost(self, ai, target, deadline=None):
+        powerups = ai.powerup_locations
+        if not powerups:
+            return 0.0
+        field = self.tail
+        if field is None or not field.Matches(ai, target):
+            field = self.tail = DistanceField(ai, target, ai.distance_field)
+        if not field.done and not field.Run(ai, deadline):
+            return None
+        nearest = field.Nearest(powerups)
+        if nearest is None:
+            return float("inf")
+        return self.Drain() * (field.Distance(nearest) + self.PICKUP_TICKS)
+
+    # <summary>
+    # (verdict, first cell) of the shortest route to target that keeps a power-up in reach
+    # </summary>
+    def Route(self, ai, target, reserve, deadline=None):
+        """
+        verdict True: first cell of the route (None when already there);
+        False: every route strands the bot; UNREACHABLE: no known route at
+        all; None: energy is no constraint right now, or the search was cut
+        short. On anything but False the caller routes as usual.
+        """
+        self.expanded = 0
+        exposed = self.Exposed(ai)
+        drain = self.Drain()
+        if drain <= 0 and not exposed:
+            return None, None
+
+        tail = self.TailCost(ai, target, deadline)
+        if tail is None:
+            return None, None
+        need = reserve + tail
+        start = (ai.player.x, ai.player.y)
+        powerups = ai.powerup_locations
+        best = {start: ai.energy}
+        queue = deque([(start, ai.energy, None, frozenset())])
+        while queue:
+            cell, energy, first, used = queue.popleft()
+            if cell == target and energy >= need:
+                return True, first
+
+            self.expanded += 1
+            if self.expanded > self.MAX_LABELS or \
+                    (deadline is not None and self.expanded % Deadline.CHECK_EVERY == 0 and deadline.Expired()):
+                return None, None
+
+            for step, nxt in self._Moves(ai, cell, target):
+                left = energy - drain - (self.EXPOSURE_COST if nxt in exposed else 0.0)
+                if left < reserve:
+                    continue
+                taken = used
+                if nxt in powerups and nxt not in used:
+                    left = min(self.MAX_ENERGY, left - drain * self.PICKUP_TICKS + self.POWERUP_MIN)
+                    taken = used | {nxt}
+                if left <= best.get(nxt, float("-inf")):
+                    continue
+                best[nxt] = left
+                queue.append((nxt, left, first or step, taken))
+        field = ai.GetDistanceField(deadline)
+        if not field.done:
+            return None, None
+        if not field.Reached(target):
+            return self.UNREACHABLE, None
+        return False, None
@@ -0,0 +1,213 @@
+import heapq
+from collections import deque
+
+NEIGHBOUR_OFFSETS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class HierarchicalPlanner:
+    """
+    HPA*-style first-step router over the visited cells.
+
+    The map is cut in CLUSTER x CLUSTER blocks. Along each border between
+    two blocks, every run of visited cell pairs facing each other is one
+    entrance (its middle pair). The abstract graph has the entrance cells
+    as nodes, an edge of cost 1 across each entrance and, inside a block,
+    edges with the BFS distance between its entrances. A query adds the
+    start and the target to their blocks with one local BFS each, runs A*
+    on the small abstract graph and returns the first concrete step.
+
+    Only visited cells are passable (the target itself may be unknown, as
+    in PathSearch); teleport shortcuts are left to the distance field.
+    Touch() marks the block of a newly visited cell, and Sync() rebuilds
+    just the dirty blocks and the neighbours whose entrances changed. A
+    visited store that was replaced or grew behind our back triggers a
+    full rebuild. Sync() works block by block and stops when the deadline
+    expires (after at least one block); the rest is resumed by the next
+    call, and FirstStep() answers None until the graph is complete.
+    """
+
+    CLUSTER = 8
+
+    def __init__(self):
+        self.store = None     # visited store the graph was built from
+        self.known = 0        # cells of `store` accounted for
+        self.dirty = set()    # blocks whose borders the next Sync rebuilds
+        self.stale = set()    # blocks whose intra edges the next Sync rebuilds
+        self.cells = {}       # block -> set of visited cells in it
+        self.borders = {}     # (block, "E" | "S") -> list of entrance (a, b) pairs
+        self.links = {}       # entrance cell -> set of cells across the border
+        self.intra = {}       # block -> {entrance: {entrance: cost}}
+        self.expanded = 0     # nodes expanded by the last query (abstract + local)
+
+    def Block(self, cell):
+        return (cell[0] // self.CLUSTER, cell[1] // self.CLUSTER)
+
+    # <summary>
+    # A cell was added to the visited store
+    # </summary>
+    def Touch(self, cell):
+        block = self.Block(cell)
+        cells = self.cells.setdefault(block, set())
+        if cell not in cells:
+            cells.add(cell)
+            self.known += 1
+            self.dirty.add(block)
+
+    # <summary>
+    # Bring the graph up to date; False if the deadline cut it short
+    # </summary>
+    def Sync(self, ai, deadline=None):
+        if self.store is not ai.visited or self.known != len(ai.visited):
+            self.store = ai.visited
+            self.known = 0
+            self.cells, self.borders, self.links, self.intra = {}, {}, {}, {}
+            self.stale = set()
+            for cell in ai.visited:
+                self.Touch(cell)
+
+        while self.dirty:
+            block = self.dirty.pop()
+            self.stale.add(block)
+            bx, by = block
+            for key, other in (((block, "E"), (bx + 1, by)), (((bx - 1, by), "E"), (bx - 1, by)),
+                               ((block, "S"), (bx, by + 1)), (((bx, by - 1), "S"), (bx, by - 1))):
+                if self._BuildBorder(key):
+                    self.stale.add(other)
+            if deadline is not None and deadline.Expired():
+                return False
+        while self.stale:
+            self._BuildIntra(self.stale.pop())
+            if self.stale and deadline is not None and deadline.Expired():
+                return False
+        return True
+
+    # <summary>
+    # Recompute the entrances of one border; True if they changed
+    # </summary>
+    def _BuildBorder(self, key):
+        (bx, by), side = key
+        n = self.CLUSTER
+        first, second = self.cells.get((bx, by), ()), self.cells.get((bx + 1, by) if side == "E" else (bx, by + 1), ())
+        if side == "E":
+            x = bx * n + n - 1
+            facing = [((x, by * n + i), (x + 1, by * n + i)) for i in range(n)]
+        else:
+            y = by * n + n - 1
+            facing = [((bx * n + i, y), (bx * n + i, y + 1)) for i in range(n)]
+
+        pairs, run = [], []
+        for a, b in facing + [(None, None)]:
+            if a in first and b in second:
+                run.append((a, b))
+            elif run:
+                pairs.append(run[len(run) // 2])
+                run = []
+
+        old = self.borders.get(key, [])
+        if pairs == old:
+            return False
+        for a, b in old:
+            self.links[a].discard(b)
+            self.links[b].discard(a)
+        for a, b in pairs:
+            self.links.setdefault(a, set()).add(b)
+            self.links.setdefault(b, set()).add(a)
+        self.borders[key] = pairs
+        return True
+
+    def _BuildIntra(self, block):
+        entrances = [c for c in self.cells.get(block, ()) if self.links.get(c)]
+        self.intra[block] = {e: self._LocalBfs(block, e, entrances)[0] for e in entrances}
+
+    # <summary>
+    # BFS inside one block: distance and first step to each goal cell
+    # </summary>
+    def _LocalBfs(self, block, start, goals):
+        cells = self.cells.get(block, ())
+        goals = set(goals)
+        dist = {start: 0}
+        first = {start: None}
+        found = {}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            self.expanded += 1
+            if cell in goals and cell != start:
+                found[cell] = dist[cell]
+            for n in self.Around(cell):
+                if n in dist or n not in cells:
+                    continue
+                dist[n] = dist[cell] + 1
+                first[n] = n if cell == start else first[cell]
+                queue.append(n)
+        return found, first
+
+    # <summary>
+    # First step of a route from start to target (None if there is none)
+    # </summary>
+    def FirstStep(self, ai, start, target, deadline=None):
+        synced = self.Sync(ai, deadline)
+        self.expanded = 0
+        if not synced or start == target:
+            return None
+
+        # An unknown target is entered from one of its visited neighbours
+        if target in ai.visited:
+            sources = {target: 0}
+        else:
+            sources = {n: 1 for n in self.Around(target) if n in ai.visited}
+        if start in sources:
+            return target if sources[start] else None
+
+        # Start into its block: its entrances and, if in reach, the target
+        start_block = self.Block(start)
+        goals = list(self.intra.get(start_block, ())) + [c for c in sources if self.Block(c) == start_block]
+        from_start, first = self._LocalBfs(start_block, start, goals)
+
+        # Target side: entrance -> remaining cost to the target
+        to_target = {}
+        for source, offset in sources.items():
+            block = self.Block(source)
+            entrances = self.intra.get(block, {})
+            found = self._LocalBfs(block, source, entrances)[0]
+            if source in entrances:
+                found[source] = 0
+            for e, d in found.items():
+                if d + offset < to_target.get(e, d + offset + 1):
+                    to_target[e] = d + offset
+
+        # A* over entrances, each node remembering the first concrete step
+        def h(cell):
+            return abs(cell[0] - target[0]) + abs(cell[1] - target[1])
+
+        best, step, heap = {}, {}, []
+
+        def Push(node, g, first_step):
+            if g < best.get(node, g + 1):
+                best[node], step[node] = g, first_step
+                heapq.heappush(heap, (g + h(node), g, node))
+
+        for c, d in from_start.items():
+            Push(c, d, first[c])
+            if c in sources:
+                Push(target, d + sources[c], first[c])
+        for n in self.links.get(start, ()):
+            Push(n, 1, n)
+
+        while heap:
+            _, g, node = heapq.heappop(heap)
+            if g > best[node]:
+                continue
+            self.expanded += 1
+            if node == target:
+                return step[node]
+            for n, cost in self.intra.get(self.Block(node), {}).get(node, {}).items():
+                Push(n, g + cost, step[node])
+            for n in self.links.get(node, ()):
+                Push(n, g + 1, step[node])
+            if node in to_target:
+                Push(target, g + to_target[node], step[node])
+        return None
+
+    def Around(self, cell):
+        return [(cell[0] + dx, cell[1] + dy) for dx, dy in NEIGHBOUR_OFFSETS]
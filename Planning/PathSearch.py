@@ -0,0 +1,77 @@
+import heapq
+
+from Planning.Deadline import Deadline
+
+
+class PathSearch:
+    """
+    Resumable A* (Manhattan heuristic) that only returns the first step.
+
+    Instead of copying the whole path into every heap entry, each node keeps
+    the first step taken from the start to reach it. When the deadline hits
+    before the target is reached, the first step towards the expanded node
+    closest to the target is returned (anytime answer) and the open list is
+    kept so the search can continue on the next tick from the same start.
+    """
+
+    def __init__(self, ai, start, target):
+        self.version = ai.map_version
+        self.start = start
+        self.target = target
+        self.counter = 0
+        h = self.Heuristic(start)
+        self.open = [(h, 0, start, 0)]
+        self.g_scores = {start: 0}
+        self.first_step = {start: None}
+        self.best = start
+        self.best_h = h
+        self.done = False
+        self.result = None
+
+    def Heuristic(self, pos):
+        return abs(pos[0] - self.target[0]) + abs(pos[1] - self.target[1])
+
+    def Matches(self, ai, start, target):
+        return self.version == ai.map_version and self.start == start and self.target == target
+
+    def Run(self, ai, deadline=None):
+        if self.done:
+            return self.result
+
+        expansions = 0
+        while self.open:
+            expansions += 1
+            if deadline is not None and expansions % Deadline.CHECK_EVERY == 0 and deadline.Expired():
+                return self.first_step[self.best]  # best answer so far
+
+            _, _, curr, g = heapq.heappop(self.open)
+            if g > self.g_scores[curr]:
+                continue  # stale entry
+
+            if curr == self.target:
+                return self._Finish(self.first_step[curr])
+
+            h = self.Heuristic(curr)
+            if h < self.best_h:
+                self.best, self.best_h = curr, h
+
+            new_g = g + 1  # Cost to neighbor is always 1
+            for step, nxt in ai.GetSuccessors(curr[0], curr[1]):
+                # Can only traverse visited cells OR the target itself
+                # (a known teleport lands on its visited destination)
+                if nxt not in ai.visited and nxt != self.target:
+                    continue
+
+                if nxt not in self.g_scores or new_g < self.g_scores[nxt]:
+                    self.g_scores[nxt] = new_g
+                    self.first_step[nxt] = step if curr == self.start else self.first_step[curr]
+                    self.counter += 1
+                    heapq.heappush(self.open, (new_g + self.Heuristic(nxt), self.counter, nxt, new_g))
+
+        return self._Finish(None)
+
+    def _Finish(self, result):
+        self.done = True
+        self.result = result
+        self.open = []
+        return result
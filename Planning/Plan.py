@@ -0,0 +1,48 @@
+class Plan:
+    """
+    Routes precomputed from one GameAI snapshot.
+
+    Steps are adjacent cells (not actions) so the tick can turn them into an
+    action with the heading it has at decision time. A plan is only used while
+    the live map version and player position still match the snapshot.
+    """
+
+    def __init__(self, version, start):
+        self.version = version
+        self.start = start
+        self.frontier = None
+        self.frontier_step = None
+        self.gold = None
+        self.gold_step = None
+        self.powerup = None
+        self.powerup_step = None
+        self.escape_step = None
+
+    def Key(self):
+        return (self.version, self.start)
+
+    @staticmethod
+    def Build(snap):
+        start = (snap.player.x, snap.player.y)
+        plan = Plan(snap.map_version, start)
+
+        # One distance field answers every query below
+        field = snap.GetDistanceField()
+
+        plan.frontier = field.BestFrontier(snap.dir)
+        plan.frontier_step = Plan.FirstStep(field, plan.frontier)
+
+        plan.gold = snap.FindNearestItem(snap.gold_locations)
+        plan.gold_step = Plan.FirstStep(field, plan.gold)
+
+        plan.powerup = snap.FindNearestItem(snap.powerup_locations)
+        plan.powerup_step = Plan.FirstStep(field, plan.powerup)
+
+        plan.escape_step = snap.FindEscapeStep()
+        return plan
+
+    @staticmethod
+    def FirstStep(field, target):
+        if target is None:
+            return None
+        return field.FirstStep(target)
@@ -0,0 +1,43 @@
+import threading
+
+from Planning.Plan import Plan
+
+
+class PlannerWorker(threading.Thread):
+    """
+    Background thread that keeps a Plan for the latest published GameAI state.
+
+    The decision tick never waits for it: GameAI.FreshPlan() returns the last
+    published plan only if it still matches the live state, otherwise the tick
+    falls back to its own (budgeted) searches.
+    """
+
+    def __init__(self, ai, interval=0.1):
+        super().__init__(daemon=True)
+        self.ai = ai
+        self.interval = interval
+        self.plan = None  # replaced atomically, never mutated after publish
+        self.running = True
+        self.wakeup = threading.Event()
+
+    def Wake(self):
+        self.wakeup.set()
+
+    def Stop(self):
+        self.running = False
+        self.wakeup.set()
+
+    def run(self):
+        while self.running:
+            self.wakeup.clear()
+            published = self.ai.published  # consistent, read-only, O(1) to take
+
+            if published is not None and (self.plan is None or
+                    self.plan.Key() != (published.map_version, (published.player.x, published.player.y))):
+                try:
+                    # Private copy-on-write fork: searches may cache into it
+                    self.plan = Plan.Build(published.Snapshot())
+                except Exception as e:
+                    print(f"Planner error: {e}")
+
+            self.wakeup.wait(self.interval)
@@ -0,0 +1,251 @@
+import random
+
+DIRECTIONS = ("north", "east", "south", "west")
+OFFSETS = {"north": (0, -1), "east": (1, 0), "south": (0, 1), "west": (-1, 0)}
+
+
+class RolloutPlanner:
+    """
+    Short-horizon Monte Carlo planner for fights.
+
+    Each option (attack, strafe, back off, retreat, grab the item underfoot)
+    is a small policy played for HORIZON ticks in a cheap model: our position
+    and heading on the known map, the enemy placed from its enemy#N sighting
+    and drifting with its tracked velocity, shooting when it has us in line
+    and otherwise closing in. The option with the best mean value (damage
+    dealt minus damage taken, items, death penalty) wins.
+
+    Statistics are kept per (situation, option) where the situation is the
+    map version, our cell, heading, energy bucket and the enemy offset, so a
+    standoff that repeats over several ticks keeps adding rollouts to the
+    same tree instead of starting over. Rollouts run until the tick deadline
+    (at least MIN_ROLLOUTS and at most MAX_ROLLOUTS per option).
+    """
+
+    HORIZON = 8
+    MIN_ROLLOUTS = 4
+    MAX_ROLLOUTS = 64
+    MAX_ENTRIES = 4096
+
+    SHOT_RANGE = 10
+    DAMAGE = 10
+    ENEMY_FIRE = 0.5      # chance an enemy with us in line shoots this tick
+    ENEMY_CHASE = 0.6     # chance an enemy out of line steps towards us
+    DEATH_PENALTY = 200   # in energy points
+    TAKEN_WEIGHT = 1.5    # damage taken hurts more than damage dealt helps
+    DEFENSIVE_WEIGHT = 3.0
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.stats = {}    # (situation, option) -> [rollouts, total value]
+        self.rollouts = 0  # rollouts played so far (all situations)
+
+    # <summary>
+    # Best option for the current fight and its first action
+    # </summary>
+    def Decide(self, ai, enemy_dist, escape_step=None, deadline=None, defensive=False):
+        dx, dy = OFFSETS.get(ai.dir, (0, 0))
+        start = (ai.player.x, ai.player.y)
+        enemy = (start[0] + dx * enemy_dist, start[1] + dy * enemy_dist)
+        velocity = ai.enemy_velocity.get(f"enemy_{ai.dir}_{enemy_dist}", (0, 0))
+
+        model = _Model(ai, start, enemy, velocity, escape_step, defensive, self)
+        situation = (ai.map_version, start, ai.dir, ai.energy // 10, (enemy[0] - start[0], enemy[1] - start[1]))
+        options = model.Options()
+
+        if len(self.stats) > self.MAX_ENTRIES:
+            self.stats.clear()
+        entries = [self.stats.setdefault((situation, option), [0, 0.0]) for option in options]
+
+        # Round robin so every option gets the same share of the budget
+        while True:
+            pending = [(o, e) for o, e in zip(options, entries) if e[0] < self.MAX_ROLLOUTS]
+            if not pending:
+                break
+            if deadline is not None and deadline.Expired() and all(e[0] >= self.MIN_ROLLOUTS for e in entries):
+                break
+            for option, entry in pending:
+                entry[0] += 1
+                entry[1] += model.Rollout(option)
+                self.rollouts += 1
+
+        best = max(zip(options, entries), key=lambda item: item[1][1] / item[1][0])[0]
+        return model.FirstAction(best), best
+
+
+class _Model:
+    """Fight state for one decision and the option policies played on it."""
+
+    def __init__(self, ai, start, enemy, velocity, escape_step, defensive, planner):
+        self.ai = ai
+        self.start = start
+        self.dir = ai.dir
+        self.energy = ai.energy
+        self.enemy = enemy
+        self.velocity = velocity
+        self.escape_step = escape_step
+        self.planner = planner
+        self.rng = planner.rng
+        self.taken_weight = planner.DEFENSIVE_WEIGHT if defensive else planner.TAKEN_WEIGHT
+
+        self.item = None
+        if "redLight" in ai.current_observations:
+            self.item = ("pegar_powerup", "energy")
+        elif "blueLight" in ai.current_observations:
+            self.item = ("pegar_ouro", "score")
+
+    def Options(self):
+        options = ["attack", "strafe_right", "strafe_left", "back_off", "retreat"]
+        if self.item:
+            options.append("grab")
+        return options
+
+    def FirstAction(self, option):
+        return self.Policy(option, 0, self.start[0], self.start[1], self.dir, self.enemy)
+
+    # <summary>
+    # Walls and hazards block us; cells never seen are only entered if known safe
+    # </summary>
+    def Passable(self, cell):
+        ai = self.ai
+        if cell in ai.hazards or ai.map_state.get(cell) == "Wall":
+            return False
+        return cell in ai.visited or ai.IsSafe(cell[0], cell[1])
+
+    def InLine(self, x, y, d, target):
+        """True if target is straight ahead within shot range with no known wall between."""
+        dx, dy = OFFSETS[d]
+        for _ in range(self.planner.SHOT_RANGE):
+            x, y = x + dx, y + dy
+            if (x, y) == target:
+                return True
+            if (x, y) in self.ai.hazards or self.ai.map_state.get((x, y)) == "Wall":
+                return False
+        return False
+
+    def Aligned(self, x, y, enemy):
+        """Direction from us to the enemy if it shares our row or column, else None."""
+        ex, ey = enemy
+        if ex == x and ey != y:
+            return "north" if ey < y else "south"
+        if ey == y and ex != x:
+            return "west" if ex < x else "east"
+        return None
+
+    def Toward(self, x, y, d, cell):
+        want = self.Aligned(x, y, cell)
+        if want == d:
+            return "andar"
+        if want == DIRECTIONS[(DIRECTIONS.index(d) + 2) % 4]:
+            return "andar_re"
+        return "virar_direita" if want == DIRECTIONS[(DIRECTIONS.index(d) + 1) % 4] else "virar_esquerda"
+
+    def Attack(self, x, y, d, enemy):
+        side = self.Aligned(x, y, enemy)
+        if side is None or side == d:
+            return "atacar"
+        return self.Toward(x, y, d, (x + OFFSETS[side][0], y + OFFSETS[side][1]))
+
+    def Retreat(self, t, x, y, d, enemy):
+        if t == 0 and self.escape_step:
+            return self.Toward(x, y, d, self.escape_step)
+
+        # Prefer leaving the enemy's row/column, then getting further away
+        best, best_key = None, None
+        for dx, dy in OFFSETS.values():
+            cell = (x + dx, y + dy)
+            if cell == enemy or not self.Passable(cell):
+                continue
+            key = (self.Aligned(cell[0], cell[1], enemy) is None,
+                   abs(cell[0] - enemy[0]) + abs(cell[1] - enemy[1]),
+                   self.Toward(x, y, d, cell) in ("andar", "andar_re"))
+            if best_key is None or key > best_key:
+                best, best_key = cell, key
+        if best is None:
+            return "virar_direita"
+        return self.Toward(x, y, d, best)
+
+    def Policy(self, option, t, x, y, d, enemy):
+        if option == "attack":
+            return self.Attack(x, y, d, enemy)
+        if option in ("strafe_right", "strafe_left"):
+            turn, back = ("virar_direita", "virar_esquerda") if option == "strafe_right" else ("virar_esquerda", "virar_direita")
+            if t < 3:
+                return (turn, "andar", back)[t]
+            return self.Attack(x, y, d, enemy)
+        if option == "back_off":
+            dx, dy = OFFSETS[d]
+            if self.Passable((x - dx, y - dy)):
+                return "andar_re"
+            return self.Retreat(t, x, y, d, enemy)
+        if option == "grab":
+            if t == 0:
+                return self.item[0]
+            return self.Retreat(t, x, y, d, enemy)
+        return self.Retreat(t, x, y, d, enemy)
+
+    def Rollout(self, option):
+        planner, rng = self.planner, self.rng
+        x, y = self.start
+        d = self.dir
+        enemy = self.enemy
+        energy = self.energy
+        dealt = taken = gained = 0
+
+        for t in range(planner.HORIZON):
+            action = self.Policy(option, t, x, y, d, enemy)
+
+            # Our move
+            if action == "atacar":
+                if self.InLine(x, y, d, enemy):
+                    dealt += planner.DAMAGE
+            elif action in ("andar", "andar_re"):
+                dx, dy = OFFSETS[d]
+                if action == "andar_re":
+                    dx, dy = -dx, -dy
+                cell = (x + dx, y + dy)
+                if cell != enemy and self.Passable(cell):
+                    x, y = cell
+            elif action == "virar_direita":
+                d = DIRECTIONS[(DIRECTIONS.index(d) + 1) % 4]
+            elif action == "virar_esquerda":
+                d = DIRECTIONS[(DIRECTIONS.index(d) - 1) % 4]
+            elif self.item and action == self.item[0] and (x, y) == self.start and t == 0:
+                if self.item[1] == "energy":
+                    energy += 20
+                else:
+                    gained += 50  # gold is worth points, not survival
+
+            # Enemy move: shoot if it has us in line, else close in or drift
+            if self.Aligned(enemy[0], enemy[1], (x, y)) and \
+                    abs(enemy[0] - x) + abs(enemy[1] - y) <= planner.SHOT_RANGE and \
+                    self.InLine(enemy[0], enemy[1], self.Aligned(enemy[0], enemy[1], (x, y)), (x, y)):
+                if rng.random() < planner.ENEMY_FIRE:
+                    taken += planner.DAMAGE
+                    if energy - taken <= 0:
+                        return dealt - taken * self.taken_weight + gained - planner.DEATH_PENALTY
+            else:
+                enemy = self.EnemyStep(enemy, x, y)
+
+        return dealt - taken * self.taken_weight + gained
+
+    def EnemyStep(self, enemy, x, y):
+        ex, ey = enemy
+        if self.rng.random() < self.planner.ENEMY_CHASE:
+            # One step along the longer axis towards us
+            if abs(x - ex) >= abs(y - ey):
+                step = (ex + (1 if x > ex else -1), ey)
+            else:
+                step = (ex, ey + (1 if y > ey else -1))
+        else:
+            vx, vy = self.velocity
+            if abs(vx) >= abs(vy) and vx:
+                step = (ex + (1 if vx > 0 else -1), ey)
+            elif vy:
+                step = (ex, ey + (1 if vy > 0 else -1))
+            else:
+                dx, dy = self.rng.choice(list(OFFSETS.values()))
+                step = (ex + dx, ey + dy)
+        if step == (x, y) or step in self.ai.hazards or self.ai.map_state.get(step) == "Wall":
+            return enemy
+        return step
@@ -0,0 +1,52 @@
+import random
+
+# Item values from the assignment (the server may use others)
+GOLD_VALUES = (1000, 500)        # coin, ring
+POWERUP_VALUES = (10, 20, 50)
+
+
+class Arena:
+    """
+    Static layout of a simulated labyrinth.
+
+    The border is wall; inside there are obstacles, pits, teleports and item
+    spots (gold and power-ups, each with its value). Generate() builds a
+    random arena that only depends on the seed, so matches are reproducible.
+    """
+
+    def __init__(self, width, height, walls, pits, teleports, gold, powerups):
+        self.width = width
+        self.height = height
+        self.walls = walls          # set of cells
+        self.pits = pits            # set of cells
+        self.teleports = teleports  # set of cells (land anywhere free)
+        self.gold = gold            # cell -> score value
+        self.powerups = powerups    # cell -> energy value
+        self.free = [(x, y) for x in range(width) for y in range(height)
+                     if (x, y) not in walls and (x, y) not in pits and (x, y) not in teleports]
+
+    @staticmethod
+    def Generate(seed, width=59, height=34, obstacles=0.08, pits=0.015, teleports=0.005, gold=12, powerups=8):
+        rng = random.Random(seed)
+        walls = {(x, y) for x in range(width) for y in range(height)
+                 if x in (0, width - 1) or y in (0, height - 1)}
+        inner = [(x, y) for x in range(1, width - 1) for y in range(1, height - 1)]
+        rng.shuffle(inner)
+
+        n_walls = int(len(inner) * obstacles)
+        n_pits = int(len(inner) * pits)
+        n_teleports = max(1, int(len(inner) * teleports))
+        cells = iter(inner)
+        walls.update(next(cells) for _ in range(n_walls))
+        pit_cells = {next(cells) for _ in range(n_pits)}
+        teleport_cells = {next(cells) for _ in range(n_teleports)}
+        gold_cells = {next(cells): rng.choice(GOLD_VALUES) for _ in range(gold)}
+        powerup_cells = {next(cells): rng.choice(POWERUP_VALUES) for _ in range(powerups)}
+        return Arena(width, height, walls, pit_cells, teleport_cells, gold_cells, powerup_cells)
+
+    def Blocked(self, cell):
+        return cell in self.walls or not (0 <= cell[0] < self.width and 0 <= cell[1] < self.height)
+
+    def Adjacent(self, cell, cells):
+        x, y = cell
+        return any(n in cells for n in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)))
@@ -0,0 +1,227 @@
+import contextlib
+import os
+import random
+
+from GameAI import GameAI
+from dto.ScoreBoard import ScoreBoard
+
+DIRECTIONS = ("north", "east", "south", "west")
+OFFSETS = {"north": (0, -1), "east": (1, 0), "south": (0, 1), "west": (-1, 0)}
+
+
+class SimPlayer:
+    """
+    Server-side state of one simulated player and the GameAI driving it.
+    Players joined without a GameAI (ai=None) are driven from outside the
+    match; their hits and damage are queued in `events` instead.
+    """
+
+    def __init__(self, name, ai, cell, direction):
+        self.name = name
+        self.ai = ai
+        self.x, self.y = cell
+        self.dir = direction
+        self.energy = 100
+        self.score = 0
+        self.state = "game"
+        self.blocked = False
+        self.dead_reported = False
+        self.events = []  # ("h", target) / ("d", shooter) for players without a GameAI
+
+    def Cell(self):
+        return (self.x, self.y)
+
+
+class Match:
+    """
+    Headless match between GameAI instances on an Arena.
+
+    Each tick every player gets its status and observations (the same calls
+    Bot makes from the server replies), decides, and the action is applied
+    with the rules of the assignment: walls block, pits kill, teleports send
+    to a random free cell, shots do SHOT_DAMAGE up to SHOT_RANGE cells ahead
+    and dead players respawn. Items respawn ITEM_RESPAWN ticks after pickup.
+    Everything random comes from the seed, so a match is reproducible.
+    """
+
+    SHOT_DAMAGE = 10
+    SHOT_RANGE = 10
+    ENEMY_RANGE = 10
+    STEPS_RANGE = 2
+    ITEM_RESPAWN = 150
+    SCOREBOARD_EVERY = 10  # ticks between scoreboard updates
+
+    def __init__(self, arena, params_list, seed=0, ticks=1500, quiet=True):
+        self.arena = arena
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.ticks = ticks
+        self.quiet = quiet
+        self.tick = 0
+        self.gold = dict(arena.gold)
+        self.powerups = dict(arena.powerups)
+        self.respawns = []  # (tick, items dict, cell, value), in tick order
+
+        self.players = []
+        for i, params in enumerate(params_list):
+            ai = GameAI(params)
+            ai.my_name = f"sim{i}"
+            self.players.append(SimPlayer(ai.my_name, ai, self.RandomFreeCell(), self.rng.choice(DIRECTIONS)))
+
+    def RandomFreeCell(self):
+        return self.rng.choice(self.arena.free)
+
+    def Join(self, name):
+        """Add a player driven from outside (Apply() its actions between steps)."""
+        player = SimPlayer(name, None, self.RandomFreeCell(), self.rng.choice(DIRECTIONS))
+        self.players.append(player)
+        return player
+
+    def Run(self):
+        """Play the whole match and return the final score of each player."""
+        # GameAI logs every decision; keep simulations silent unless asked
+        with open(os.devnull, "w") as devnull, \
+                (contextlib.redirect_stdout(devnull) if self.quiet else contextlib.nullcontext()):
+            # GameAI falls back to the random module in a few places
+            state = random.getstate()
+            random.seed(self.seed)
+            try:
+                for _ in range(self.ticks):
+                    self.Step()
+            finally:
+                random.setstate(state)
+        return [p.score for p in self.players]
+
+    def Step(self):
+        if self.tick % self.SCOREBOARD_EVERY == 0:
+            self.SendScoreboard()
+
+        for p in self.players:
+            if p.state == "dead" and p.dead_reported:
+                # Back to the game somewhere else, knowledge kept by GameAI
+                p.x, p.y = self.RandomFreeCell()
+                p.energy = 100
+                p.state = "game"
+
+            if p.ai is None:
+                p.dead_reported = True
+                continue
+            p.ai.SetStatus(p.x, p.y, p.dir, p.state, p.score, p.energy)
+            if p.state == "dead":
+                p.dead_reported = True  # one status tick as dead, like the server
+                continue
+            observations = self.Observations(p)
+            if observations:
+                p.ai.GetObservations(observations)
+            else:
+                p.ai.GetObservationsClean()
+
+            self.Apply(p, p.ai.GetDecision())
+
+        self.RespawnItems()
+        self.tick += 1
+
+    def SendScoreboard(self):
+        game_time = self.tick * GameAI.MATCH_SECONDS // self.ticks
+        board = [ScoreBoard(p.name, True, p.energy, p.score, (0, 0, 0)) for p in self.players]
+        for p in self.players:
+            if p.ai:
+                p.ai.UpdateGameState(board, game_time, "Game")
+
+    def Observations(self, p):
+        arena, cell = self.arena, p.Cell()
+        o = []
+        if p.blocked:
+            o.append("blocked")
+            p.blocked = False
+        if any(q is not p and q.state != "dead" and abs(q.x - p.x) + abs(q.y - p.y) <= self.STEPS_RANGE
+               for q in self.players):
+            o.append("steps")
+        if arena.Adjacent(cell, arena.pits):
+            o.append("breeze")
+        if arena.Adjacent(cell, arena.teleports):
+            o.append("flash")
+        if cell in self.gold:
+            o.append("blueLight")
+        if cell in self.powerups:
+            o.append("redLight")
+
+        target, distance = self.FirstInSight(p, self.ENEMY_RANGE)
+        if target:
+            o.append(f"enemy#{distance}")
+        return o
+
+    def FirstInSight(self, p, max_range):
+        dx, dy = OFFSETS[p.dir]
+        x, y = p.x, p.y
+        for distance in range(1, max_range + 1):
+            x, y = x + dx, y + dy
+            if self.arena.Blocked((x, y)):
+                break
+            for q in self.players:
+                if q is not p and q.state != "dead" and (q.x, q.y) == (x, y):
+                    return q, distance
+        return None, None
+
+    def Apply(self, p, action):
+        if action == "virar_direita":
+            p.dir = DIRECTIONS[(DIRECTIONS.index(p.dir) + 1) % 4]
+        elif action == "virar_esquerda":
+            p.dir = DIRECTIONS[(DIRECTIONS.index(p.dir) - 1) % 4]
+        elif action in ("andar", "andar_re"):
+            self.Move(p, -1 if action == "andar_re" else 1)
+        elif action == "atacar":
+            self.Shoot(p)
+        elif action in ("pegar_ouro", "pegar_anel", "pegar_powerup"):
+            self.PickUp(p)
+
+    def Move(self, p, sign):
+        dx, dy = OFFSETS[p.dir]
+        cell = (p.x + dx * sign, p.y + dy * sign)
+        if self.arena.Blocked(cell):
+            p.blocked = True
+            return
+        if cell in self.arena.pits:
+            p.x, p.y = cell
+            self.Kill(p)
+        elif cell in self.arena.teleports:
+            p.x, p.y = self.RandomFreeCell()
+        else:
+            p.x, p.y = cell
+
+    def Shoot(self, p):
+        target, _ = self.FirstInSight(p, self.SHOT_RANGE)
+        if target is None:
+            return
+        target.energy -= self.SHOT_DAMAGE
+        if p.ai:
+            p.ai.GetObservations(["hit"])
+        else:
+            p.events.append(("h", target.name))
+        if target.ai:
+            target.ai.GetObservations(["damage"])
+        else:
+            target.events.append(("d", p.name))
+        if target.energy <= 0:
+            target.energy = 0
+            self.Kill(target)
+
+    def Kill(self, p):
+        p.state = "dead"
+        p.dead_reported = False
+
+    def PickUp(self, p):
+        cell = p.Cell()
+        if cell in self.gold:
+            value = self.gold.pop(cell)
+            p.score += value
+            self.respawns.append((self.tick + self.ITEM_RESPAWN, self.gold, cell, value))
+        elif cell in self.powerups:
+            value = self.powerups.pop(cell)
+            p.energy = min(100, p.energy + value)
+            self.respawns.append((self.tick + self.ITEM_RESPAWN, self.powerups, cell, value))
+
+    def RespawnItems(self):
+        while self.respawns and self.respawns[0][0] <= self.tick:
+            _, items, cell, value = self.respawns.pop(0)
+            items[cell] = value
@@ -0,0 +1,299 @@
+import argparse
+import collections
+import contextlib
+import gc
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from statistics import median
+from typing import Dict, NamedTuple, Optional
+
+from Bot import Bot
+from GameAI import GameAI
+from Map.Position import Position
+from Simulation.Arena import Arena
+from Simulation.Match import Match
+from Socket.HandleClient import HandleClient
+from Strategy.StrategyParams import StrategyParams
+
+# Protocol letters Bot sends for each action
+ACTIONS = {"w": "andar", "s": "andar_re", "a": "virar_esquerda", "d": "virar_direita",
+           "t": "pegar_ouro", "e": "atacar"}
+
+
+class SimLink(HandleClient):
+    """HandleClient whose other end is a SimServer in this process (no socket)."""
+
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+
+    def connect(self, host, port):
+        self.connected = True
+        self._notify_status_change()
+        return True
+
+    def close(self):
+        self.connected = False
+        self._notify_status_change()
+
+    def _send(self, msg):
+        if self.connected:
+            self.server.pending.append(msg)
+
+    def Deliver(self, line):
+        if self.connected:
+            self._process_command(line)
+
+
+class SimServer(threading.Thread):
+    """
+    Plays back-to-back simulated matches for one Bot over a SimLink.
+
+    Every `interval` seconds it applies the actions and answers the requests
+    the bot sent since the last step (replies go through the same parser as
+    server lines), then advances the match: the other players are GameAIs
+    inside the Match, the bot is a joined outside player. Between matches
+    the status is "GameOver" for PAUSE steps, then a new arena starts.
+    """
+
+    PAUSE = 50           # steps between matches
+    NOTIFY_EVERY = 5     # steps between chat notifications (they pile up in Bot.msg)
+
+    def __init__(self, players=4, ticks=300, interval=0.002, seed=0, name="soak"):
+        super().__init__(daemon=True)
+        self.players = players
+        self.ticks = ticks
+        self.interval = interval
+        self.seed = seed
+        self.name = name
+        self.link = SimLink(self)
+        self.pending = collections.deque()  # lines from the bot, appended by its threads
+        self.stopped = threading.Event()
+        self.steps = 0
+        self.finished = 0  # matches played to the end
+        self.NewMatch()
+
+    def NewMatch(self):
+        seed = self.seed + self.finished
+        self.match = Match(Arena.Generate(seed), [StrategyParams()] * (self.players - 1), seed=seed, ticks=self.ticks)
+        self.me = self.match.Join(self.name)
+        self.status = "Game"
+        self.pause = 0
+
+    def Stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.Step()
+            self.stopped.wait(self.interval)
+
+    def Step(self):
+        for _ in range(len(self.pending)):
+            self.Handle(self.pending.popleft())
+
+        if self.status == "Game":
+            self.match.Step()
+            for kind, who in self.me.events:
+                self.link.Deliver(f"{kind};{who}")
+            self.me.events.clear()
+            if self.match.tick >= self.ticks:
+                self.finished += 1
+                self.status = "GameOver"
+                self.pause = self.PAUSE
+        else:
+            self.pause -= 1
+            if self.pause <= 0:
+                self.NewMatch()
+
+        if self.steps % self.NOTIFY_EVERY == 0:
+            self.link.Deliver(f"notification;step {self.steps}")
+        self.steps += 1
+
+    def Handle(self, line):
+        me, match = self.me, self.match
+        if line in ACTIONS:
+            if self.status == "Game" and me.state != "dead":
+                match.Apply(me, ACTIONS[line])
+        elif line == "q":
+            self.link.Deliver(f"s;{me.x};{me.y};{me.dir};{me.state};{me.score};{me.energy}")
+        elif line == "o":
+            self.link.Deliver("o;" + ",".join(match.Observations(me)))
+        elif line == "g":
+            self.link.Deliver(f"g;{self.status};{match.tick * GameAI.MATCH_SECONDS // self.ticks}")
+        elif line == "u":
+            self.link.Deliver("u;" + ";".join(f"{p.name}#connected#{p.energy}#{p.score}" for p in match.players))
+
+
+class SoakBot(Bot):
+    """Bot on a SimLink: no map cache, tuned parameters or telemetry on disk, fast ticks."""
+
+    map_cache_dir = None
+    strategy_file = None
+    telemetry_dir = None
+
+    def __init__(self, client, interval):
+        self.thread_interval = interval
+        super().__init__(client)
+
+
+class SoakSample(NamedTuple):
+    match: int
+    seconds: float
+    traced: int            # bytes allocated by Python (tracemalloc)
+    rss: Optional[int]     # resident set size in bytes (None without /proc)
+    threads: int
+    objects: Dict[str, int]  # live objects per type name
+
+
+def ResidentBytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class Soak:
+    """
+    Long-run check of a Bot process over many simulated matches.
+
+    One Bot (with its real timer, inbox, scheduler, reconnect and profiler
+    threads) plays back-to-back matches against a SimServer. After every
+    match it records traced and resident memory, the thread count and the
+    live objects per type. The first `warmup` matches fill caches and
+    knowledge and are not judged. The rest is cut in thirds: memory fails
+    when the median of each third is above the previous one and the last is
+    more than `memory_growth` above the first (capped caches fill and clear
+    in steps, a leak raises every third); threads fail when the last third
+    never gets back down to where the first one was.
+    """
+
+    FRAMES = 1  # tracemalloc traceback depth (deeper ones slow the bot down several times)
+    # Capped intern tables: they fill up slowly over many arenas and would read
+    # as growth, so they are emptied before every sample
+    BOUNDED_CACHES = (Position.At,)
+    THREAD_READS = 5
+
+    def __init__(self, matches=30, ticks=300, players=4, interval=0.002, warmup=5, memory_growth=0.10, seed=0):
+        self.matches = matches
+        self.ticks = ticks
+        self.players = players
+        self.interval = interval
+        self.warmup = warmup
+        self.memory_growth = memory_growth
+        self.seed = seed
+        self.samples = []
+        self.growth = []  # tracemalloc statistics that grew most after the warm-up
+
+    def Run(self, log=None):
+        echo = sys.stdout
+        log = log or (lambda line: print(line, file=echo))
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start(self.FRAMES)
+        start = time.perf_counter()
+        baseline = None
+
+        server = SimServer(self.players, self.ticks, self.interval, self.seed)
+        # Bot and GameAI log every tick; keep the soak silent
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            bot = SoakBot(server.link, self.interval)
+            server.start()
+            try:
+                for match in range(self.matches):
+                    while server.finished <= match:
+                        time.sleep(0.01)
+                    sample = self.Sample(match, time.perf_counter() - start)
+                    self.samples.append(sample)
+                    log(f"SOAK: match {match + 1}/{self.matches} traced {sample.traced / 1e6:.1f} MB, "
+                        f"rss {(sample.rss or 0) / 1e6:.1f} MB, {sample.threads} threads")
+                    if match + 1 == self.warmup:
+                        baseline = tracemalloc.take_snapshot()
+            finally:
+                bot.Stop()
+                server.Stop()
+                server.join()
+
+        if baseline is not None:
+            stats = tracemalloc.take_snapshot().compare_to(baseline, "lineno")
+            stats = [stat for stat in stats if stat.traceback[0].filename != __file__]
+            self.growth = [stat for stat in stats[:10] if stat.size_diff > 0]
+        if not tracing:
+            tracemalloc.stop()
+        return self.Check()
+
+    def Sample(self, match, seconds):
+        for cache in self.BOUNDED_CACHES:
+            cache.cache_clear()
+        gc.collect()
+        objects = collections.Counter(type(o).__name__ for o in gc.get_objects())
+        # The samples kept here are not the bot's memory
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        # Each tick starts its Timer thread before the last one ends: count the quietest moment
+        threads = threading.active_count()
+        for _ in range(self.THREAD_READS - 1):
+            time.sleep(self.interval)
+            threads = min(threads, threading.active_count())
+        return SoakSample(match, seconds, traced, ResidentBytes(), threads, dict(objects))
+
+    def Check(self):
+        """Problems found in the samples after the warm-up (empty: no growth)."""
+        steady = self.samples[self.warmup:]
+        if len(steady) < 3:
+            return []
+        problems = []
+        third = len(steady) // 3
+        first, middle, last = steady[:third], steady[third:-third], steady[-third:]
+        for field, label in (("traced", "traced memory"), ("rss", "resident memory")):
+            if getattr(steady[0], field) is None:
+                continue
+            a, b, c = (median(getattr(s, field) for s in part) for part in (first, middle, last))
+            growth = c / a - 1
+            if a < b < c and growth > self.memory_growth:
+                problems.append(f"{label} grew {growth:.0%} over {len(steady)} matches")
+
+        if min(s.threads for s in last) > max(s.threads for s in first):
+            problems.append(f"threads grew from {max(s.threads for s in first)} to {min(s.threads for s in last)}")
+        return problems
+
+    def ObjectGrowth(self, top=5):
+        """Types whose live count grew most after the warm-up."""
+        steady = self.samples[self.warmup:]
+        if len(steady) < 2:
+            return []
+        before, after = steady[0].objects, steady[-1].objects
+        diff = [(name, count - before.get(name, 0)) for name, count in after.items()]
+        return sorted((d for d in diff if d[1] > 0), key=lambda d: -d[1])[:top]
+
+
+def Main():
+    parser = argparse.ArgumentParser(description="Soak test: one Bot through many simulated matches.")
+    parser.add_argument("--matches", type=int, default=30)
+    parser.add_argument("--ticks", type=int, default=300, help="server steps per match")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--interval", type=float, default=0.002, help="seconds per bot tick and server step")
+    parser.add_argument("--warmup", type=int, default=5, help="matches not judged for growth")
+    parser.add_argument("--memory-growth", type=float, default=0.10, help="allowed relative growth from the first to the last third")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    soak = Soak(args.matches, args.ticks, args.players, args.interval, args.warmup, args.memory_growth, args.seed)
+    problems = soak.Run()
+    for stat in soak.growth:
+        print(f"SOAK: +{stat.size_diff / 1e3:.1f} kB {stat.traceback}")
+    for name, count in soak.ObjectGrowth():
+        print(f"SOAK: +{count} {name}")
+    for problem in problems:
+        print(f"SOAK: FAIL {problem}")
+    if not problems:
+        print("SOAK: OK, no growth")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    Main()
@@ -0,0 +1,120 @@
+import argparse
+import random
+import time
+from multiprocessing import Pool
+from statistics import mean
+
+from Simulation.Arena import Arena
+from Simulation.Match import Match
+from Strategy.StrategyParams import StrategyParams
+
+# Tuned StrategyParams fields and their (low, high) range
+SEARCH_SPACE = {
+    "critical_energy": (5, 50),
+    "low_energy": (10, 70),
+    "refuel_energy": (40, 100),
+    "lateral_speed": (0.1, 1.5),
+    "close_shot_distance": (1, 6),
+    "unexplored_score": (4, 20),
+    "visited_score": (0, 10),
+    "unknown_score": (-5, 5),
+    "recent_penalty": (0, 20),
+    "defensive_time": (0, 300),
+    "aggressive_percentile": (0.3, 1.0),
+}
+
+
+def Sample(rng):
+    values = {}
+    for name, (low, high) in SEARCH_SPACE.items():
+        if isinstance(StrategyParams._field_defaults[name], int):
+            values[name] = rng.randint(low, high)
+        else:
+            values[name] = round(rng.uniform(low, high), 3)
+    return StrategyParams(**values)
+
+
+def PlayMatch(job):
+    """Score of the candidate (player 0) against default opponents on one seeded arena."""
+    params, seed, players, ticks = job
+    arena = Arena.Generate(seed)
+    lineup = [params] + [StrategyParams()] * (players - 1)
+    scores = Match(arena, lineup, seed=seed, ticks=ticks).Run()
+    return scores[0]
+
+
+class Tuner:
+    """
+    Successive halving over random StrategyParams.
+
+    Every round plays each surviving configuration on the same seeded arenas
+    (so they are compared on equal terms), keeps the best 1/eta and gives the
+    survivors eta times more matches. Bad configurations are dropped after a
+    few cheap matches; only the promising ones pay for long evaluations.
+    Matches run in parallel on a process pool and results are reused across
+    rounds, a configuration never replays a seed.
+    """
+
+    def __init__(self, configs=27, eta=3, min_matches=2, players=4, ticks=1500, processes=None, seed=0):
+        self.configs = configs
+        self.eta = eta
+        self.min_matches = min_matches
+        self.players = players
+        self.ticks = ticks
+        self.processes = processes
+        self.seed = seed
+        self.scores = {}  # params -> list of scores, one per seed
+
+    def Run(self, log=print):
+        rng = random.Random(self.seed)
+        # The current defaults always compete, so tuning never ends worse off
+        candidates = [StrategyParams()] + [Sample(rng) for _ in range(self.configs - 1)]
+        matches = self.min_matches
+
+        with Pool(self.processes) as pool:
+            while True:
+                self.Evaluate(pool, candidates, matches)
+                candidates.sort(key=self.Fitness, reverse=True)
+                log(f"TUNER: {len(candidates)} configs x {matches} matches, best {self.Fitness(candidates[0]):.1f}")
+                if len(candidates) <= self.eta:
+                    break  # the next cut would leave the winner alone
+                candidates = candidates[:max(1, len(candidates) // self.eta)]
+                matches *= self.eta
+
+        return candidates[0]
+
+    def Evaluate(self, pool, candidates, matches):
+        jobs, owners = [], []
+        for params in candidates:
+            played = self.scores.setdefault(params, [])
+            for i in range(len(played), matches):
+                jobs.append((params, self.seed * 100003 + i, self.players, self.ticks))
+                owners.append(params)
+        for params, score in zip(owners, pool.map(PlayMatch, jobs)):
+            self.scores[params].append(score)
+
+    def Fitness(self, params):
+        return mean(self.scores[params])
+
+
+def Main():
+    parser = argparse.ArgumentParser(description="Tune GameAI strategy parameters in simulated matches.")
+    parser.add_argument("--configs", type=int, default=81, help="random configurations in the first round")
+    parser.add_argument("--eta", type=int, default=3, help="keep 1/eta of the configurations per round")
+    parser.add_argument("--min-matches", type=int, default=2, help="matches per configuration in the first round")
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--ticks", type=int, default=1500, help="ticks per simulated match")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="strategy_params.json")
+    args = parser.parse_args()
+
+    tuner = Tuner(args.configs, args.eta, args.min_matches, args.players, args.ticks, args.processes, args.seed)
+    start = time.time()
+    best = tuner.Run()
+    best.Save(args.out)
+    print(f"TUNER: Best {best} (mean score {tuner.Fitness(best):.1f}) saved to {args.out} in {time.time() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    Main()
@@ -27,7 +27,7 @@ class HandleClient:
             
             # Start receive thread
             self._stop_event.clear()
-            self.receive_thread = threading.Thread(target=self._receive_loop)
+            self.receive_thread = threading.Thread(target=self._receive_loop, args=(self.sock,))
             self.receive_thread.daemon = True
             self.receive_thread.start()
             return True
@@ -53,11 +53,11 @@ class HandleClient:
             except Exception as e:
                 print(f"Error in status handler: {e}")
 
-    def _receive_loop(self):
+    def _receive_loop(self, sock):
         buffer = ""
         while not self._stop_event.is_set() and self.connected:
             try:
-                data = self.sock.recv(4096)
+                data = sock.recv(4096)
                 if not data:
                     break
                 
@@ -74,8 +74,10 @@ class HandleClient:
                 # print(f"Receive error: {e}")
                 break
         
-        self.connected = False
-        self._notify_status_change()
+        # A reconnect may already have replaced this socket: leave the new one alone
+        if self.sock is sock:
+            self.connected = False
+            self._notify_status_change()
 
     def _process_command(self, line):
         # Protocol: parameters separated by semicolon? 
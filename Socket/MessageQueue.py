@@ -0,0 +1,85 @@
+from collections import deque
+
+
+class MessageQueue:
+    """
+    Bounded single-producer / single-consumer handoff of server commands.
+
+    The network thread Put()s parsed commands and the decision thread
+    Drain()s them all at the start of its tick, so GameAI is only ever
+    touched by one thread. deque.append and deque.popleft are atomic, no
+    lock is needed; when the consumer falls CAPACITY commands behind the
+    oldest ones are discarded (and counted).
+
+    A drained batch is coalesced before it is applied:
+    - "g" (game status) and "u" (scoreboard) are full snapshots: only the
+      newest of each is kept, and only the newest "player" line per id.
+    - "s" (status) and "o" (observations) must stay paired, since an
+      observation belongs to the position reported before it. A run of the
+      same kind with no message of the other kind in between only keeps its
+      newest entry.
+    """
+
+    CAPACITY = 1024
+    SNAPSHOTS = ("g", "u")
+    PAIRED = ("s", "o")
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.items = deque(maxlen=capacity)
+        self.received = 0   # written by the producer only
+        self.dropped = 0    # written by the producer only
+        self.coalesced = 0  # written by the consumer only
+
+    def __len__(self):
+        return len(self.items)
+
+    # <summary>
+    # Producer side (network thread)
+    # </summary>
+    def Put(self, cmd):
+        if len(self.items) >= self.capacity:
+            self.dropped += 1  # append below discards the oldest
+        self.items.append(cmd)
+        self.received += 1
+
+    # <summary>
+    # Consumer side (decision thread): everything queued so far, coalesced
+    # </summary>
+    def Drain(self):
+        batch = []
+        pop = self.items.popleft
+        for _ in range(len(self.items)):
+            batch.append(pop())
+        kept = self.Coalesce(batch)
+        self.coalesced += len(batch) - len(kept)
+        return kept
+
+    @classmethod
+    def Coalesce(cls, batch):
+        kept = []
+        seen = set()
+        newer_paired = None  # kind of the next "s"/"o" after the current one
+        for cmd in reversed(batch):
+            kind = cmd[0] if cmd else ""
+            if kind in cls.PAIRED:
+                if kind == newer_paired:
+                    continue
+                newer_paired = kind
+            else:
+                if kind in cls.SNAPSHOTS:
+                    key = kind
+                elif kind == "player" and len(cmd) > 1:
+                    key = (kind, cmd[1])
+                else:
+                    key = None
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+            kept.append(cmd)
+        kept.reverse()
+        return kept
+
+    def Report(self):
+        return f"{self.received} received, {self.coalesced} coalesced, {self.dropped} dropped"
@@ -0,0 +1,55 @@
+import random
+import threading
+
+
+class ReconnectManager(threading.Thread):
+    """
+    Keeps a HandleClient connected from its own thread.
+
+    Request() only sets an event, so it is safe to call from the receive
+    thread's status callback or the timer thread without blocking them.
+    The manager then retries connect() with exponential backoff and full
+    jitter: attempt n waits uniform(0, min(MAX_DELAY, BASE_DELAY * 2**n))
+    seconds, i.e. tens of milliseconds for a short blip and at most a few
+    seconds while the server is down, without every bot retrying in lockstep.
+    HandleClient.connect() notifies the status handlers itself on success.
+    """
+
+    BASE_DELAY = 0.05  # seconds
+    MAX_DELAY = 5.0
+
+    def __init__(self, client, host, port, seed=None, log=print):
+        super().__init__(daemon=True)
+        self.client = client
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.log = log
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+        self.attempts = 0     # failed attempts since the last success
+        self.connections = 0  # successful connects
+
+    def Request(self):
+        self.wake.set()
+
+    def Stop(self):
+        self.stopped.set()
+        self.wake.set()
+
+    def Delay(self, attempt):
+        return self.rng.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** attempt))
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            while not self.stopped.is_set() and not self.client.connected:
+                if self.client.connect(self.host, self.port):
+                    self.attempts = 0
+                    self.connections += 1
+                    break
+                delay = self.Delay(self.attempts)
+                self.attempts += 1
+                self.log(f"Connection failed... Trying again in {delay * 1000:.0f} ms (attempt {self.attempts})")
+                self.stopped.wait(delay)
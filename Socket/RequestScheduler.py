@@ -0,0 +1,121 @@
+class Poller:
+    """Adaptive period (in ticks) of one polled request: backs off while answers repeat."""
+
+    def __init__(self, min_ticks, max_ticks):
+        self.min_ticks = min_ticks
+        self.max_ticks = max_ticks
+        self.interval = min_ticks
+        self.due = 0
+
+    def Due(self, tick):
+        return tick >= self.due
+
+    def Sent(self, tick):
+        self.due = tick + self.interval
+
+    def Answered(self, changed):
+        self.interval = self.min_ticks if changed else min(self.max_ticks, self.interval * 2)
+
+    def SetRange(self, min_ticks, max_ticks, tick):
+        self.min_ticks, self.max_ticks = min_ticks, max_ticks
+        self.interval = min_ticks
+        self.due = min(self.due, tick + min_ticks)
+
+
+class RequestScheduler:
+    """
+    Decides which requests Bot sends on each tick.
+
+    Polled state ("g" game status, "u" scoreboard) uses a Poller per
+    request. Its period range comes from the match phase in PHASE_RATES and
+    doubles while the answers repeat; a change snaps it back to the fastest
+    rate. After an action, only the state that action can invalidate
+    (INVALIDATES) is requested:
+    - a turn changes the heading, which GameAI.PredictTurn applies locally,
+      and what is ahead, so only "o" is needed;
+    - a shot changes energy and score, so only "q" is needed.
+    "o" is requested every tick while enemies are around, since they move
+    on their own. "q" is requested at least every STATUS_REFRESH ticks, to
+    pick up damage and correct any drift.
+    """
+
+    STATUS_REFRESH = 5  # ticks
+    END_GAME = 60       # seconds left in which the scoreboard is polled at the fast rate
+
+    # phase -> request -> (fastest, slowest) period in ticks
+    PHASE_RATES = {
+        "Game": {"g": (10, 10), "u": (20, 80)},
+        "Ready": {"g": (1, 8), "u": (50, 50)},
+        "GameOver": {"g": (5, 20), "u": (50, 50)},
+    }
+    END_GAME_RATES = {"g": (5, 5), "u": (10, 20)}
+
+    RESYNC = ("g", "q", "o", "u")  # everything, sent back to back after (re)connecting
+
+    INVALIDATES = {
+        "andar": "qo", "andar_re": "qo",
+        "virar_direita": "o", "virar_esquerda": "o",
+        "atacar": "q",
+        "pegar_ouro": "qo", "pegar_anel": "qo", "pegar_powerup": "qo",
+    }
+
+    def __init__(self):
+        self.tick = 0
+        self.phase = None
+        self.end_game = False
+        self.pollers = {"g": Poller(1, 1), "u": Poller(50, 50)}
+        self.last_status = -self.STATUS_REFRESH
+        self.sent = {}  # request -> count
+
+    def _Rates(self, phase, end_game):
+        if end_game:
+            return self.END_GAME_RATES
+        return self.PHASE_RATES.get(phase, self.PHASE_RATES["Ready"])
+
+    # <summary>
+    # Polled requests due this tick
+    # </summary>
+    def Tick(self, phase, seconds_left=None):
+        end_game = phase == "Game" and seconds_left is not None and seconds_left <= self.END_GAME
+        if (phase, end_game) != (self.phase, self.end_game):
+            self.phase, self.end_game = phase, end_game
+            for request, (low, high) in self._Rates(phase, end_game).items():
+                self.pollers[request].SetRange(low, high, self.tick)
+
+        due = []
+        for request, poller in self.pollers.items():
+            if poller.Due(self.tick):
+                poller.Sent(self.tick)
+                due.append(request)
+        self.tick += 1
+        return self._Count(due)
+
+    # <summary>
+    # Requests needed after sending an action
+    # </summary>
+    def AfterAction(self, action, combat=False):
+        needed = set(self.INVALIDATES.get(action, "qo"))
+        if combat:
+            needed.add("o")
+        if self.tick - self.last_status >= self.STATUS_REFRESH:
+            needed.add("q")
+        if "q" in needed:
+            self.last_status = self.tick
+        return self._Count([r for r in "qo" if r in needed])
+
+    # <summary>
+    # Feed back whether a polled answer differed from the previous one
+    # </summary>
+    def Answered(self, request, changed):
+        self.pollers[request].Answered(changed)
+
+    def _Count(self, requests):
+        for request in requests:
+            self.sent[request] = self.sent.get(request, 0) + 1
+        return requests
+
+    def Report(self):
+        total = sum(self.sent.values())
+        per_tick = total / self.tick if self.tick else 0.0
+        counts = ", ".join(f"{r}={n}" for r, n in sorted(self.sent.items()))
+        return f"{total} requests in {self.tick} ticks ({per_tick:.2f}/tick: {counts})"
@@ -0,0 +1,67 @@
+import math
+
+
+class RateEstimate:
+    """Running score-rate estimate of one player."""
+
+    __slots__ = ("first_time", "time", "score", "rate", "samples")
+
+    def __init__(self, game_time, score):
+        self.first_time = game_time
+        self.time = game_time
+        self.score = score
+        self.rate = 0.0
+        self.samples = 1
+
+
+class ScoreRateModel:
+    """
+    Online estimate of each player's score rate (points per second).
+
+    Every scoreboard sample updates an exponentially weighted moving
+    average of the rate in O(1): the weight of the new interval grows with
+    its length (1 - exp(-dt / TAU)), so irregular scoreboard periods are
+    handled and old behaviour fades after a few TAU seconds. Project()
+    extrapolates a player's score to the end of the match; estimates are
+    only trusted after WARMUP seconds of samples.
+    """
+
+    TAU = 60.0    # seconds
+    WARMUP = 30   # seconds of samples before a rate is trusted
+
+    def __init__(self):
+        self.estimates = {}  # name -> RateEstimate
+
+    def Observe(self, name, game_time, score):
+        est = self.estimates.get(name)
+        if est is None or game_time < est.time:
+            # New player, or the clock went back (a new match)
+            self.estimates[name] = RateEstimate(game_time, score)
+            return
+        dt = game_time - est.time
+        if dt <= 0:
+            est.score = score
+            return
+
+        instant = (score - est.score) / dt
+        if est.samples == 1:
+            est.rate = instant
+        else:
+            est.rate += (1.0 - math.exp(-dt / self.TAU)) * (instant - est.rate)
+        est.time, est.score = game_time, score
+        est.samples += 1
+
+    def Forget(self, name):
+        self.estimates.pop(name, None)
+
+    def Rate(self, name):
+        est = self.estimates.get(name)
+        return est.rate if est else 0.0
+
+    def Ready(self, name):
+        est = self.estimates.get(name)
+        return est is not None and est.time - est.first_time >= self.WARMUP
+
+    def Project(self, name, score, seconds):
+        """Expected score after `seconds` more of play at the estimated rate."""
+        return score + self.Rate(name) * max(0, seconds)
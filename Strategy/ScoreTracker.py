@@ -0,0 +1,104 @@
+from bisect import bisect_left, insort
+
+from Strategy.ScoreRateModel import ScoreRateModel
+
+
+class PlayerRecord:
+    """Latest scoreboard line of one player."""
+
+    __slots__ = ("name", "connected", "energy", "score", "color")
+
+    def __init__(self, name):
+        self.name = name
+        self.connected = False
+        self.energy = 0
+        self.score = 0
+        self.color = (0, 0, 0)
+
+    def Key(self):
+        return (-self.score, self.name)
+
+
+class ScoreTracker:
+    """
+    Incremental scoreboard.
+
+    Each player has one PlayerRecord updated in place; `order` keeps the
+    (-score, name) keys sorted, so a rank is one bisect and only players
+    whose score changed are moved. Every timed sample feeds the O(1) rate
+    estimator in `rates`, which is all the strategy reads of the past. The
+    text shown by Bot is formatted on demand and cached until the next
+    change.
+    """
+
+    def __init__(self):
+        self.records = {}  # name -> PlayerRecord
+        self.order = []    # sorted PlayerRecord.Key() of every player
+        self.text = None   # cached Text(), None when stale
+        self.rates = ScoreRateModel()
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name):
+        return name in self.records
+
+    # <summary>
+    # Apply a full scoreboard (iterable of dto.ScoreBoard); players not in it are dropped
+    # </summary>
+    def Load(self, entries, game_time=None):
+        seen = set()
+        for entry in entries:
+            self.Update(entry.name, entry.connected, entry.energy, entry.score, entry.color, game_time)
+            seen.add(entry.name)
+        for name in [n for n in self.records if n not in seen]:
+            self.Remove(name)
+
+    def Update(self, name, connected, energy, score, color=(0, 0, 0), game_time=None):
+        record = self.records.get(name)
+        if record is None:
+            record = self.records[name] = PlayerRecord(name)
+            record.score = score
+            insort(self.order, record.Key())
+            self.text = None
+        elif record.score != score:
+            del self.order[bisect_left(self.order, record.Key())]
+            record.score = score
+            insort(self.order, record.Key())
+            self.text = None
+
+        if (record.connected, record.energy, record.color) != (connected, energy, color):
+            record.connected, record.energy, record.color = connected, energy, color
+            self.text = None
+
+        if game_time is not None:
+            self.rates.Observe(name, game_time, score)
+        return record
+
+    def Remove(self, name):
+        record = self.records.pop(name, None)
+        if record is not None:
+            del self.order[bisect_left(self.order, record.Key())]
+            self.rates.Forget(name)
+            self.text = None
+
+    def Clear(self):
+        self.records.clear()
+        self.order.clear()
+        self.rates = ScoreRateModel()
+        self.text = None
+
+    # <summary>
+    # 1 + number of players with a strictly higher score (ties share a rank)
+    # </summary>
+    def RankOf(self, score):
+        return bisect_left(self.order, (-score, "")) + 1
+
+    def Text(self):
+        if self.text is None:
+            lines = []
+            for _, name in self.order:
+                r = self.records[name]
+                lines += [r.name, "connected" if r.connected else "offline", str(r.energy), str(r.score), "---"]
+            self.text = "\n".join(lines) + "\n" if lines else ""
+        return self.text
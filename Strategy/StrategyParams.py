@@ -0,0 +1,36 @@
+import json
+from typing import NamedTuple
+
+
+class StrategyParams(NamedTuple):
+    """Tactical constants of GameAI (defaults are the hand-tuned values)."""
+
+    # Energy thresholds
+    critical_energy: int = 20     # Emergency - must find powerup
+    low_energy: int = 30          # Tactical - avoid combat, seek powerup
+    refuel_energy: int = 100      # Proactive refuel below this
+
+    # Shooting at a moving enemy
+    lateral_speed: float = 0.5    # Lateral speed above which the shot is risky
+    close_shot_distance: int = 3  # ...but still taken this close
+
+    # RandomSafeMove scores
+    unexplored_score: int = 10    # Safe and unexplored
+    visited_score: int = 5        # Safe but visited
+    unknown_score: int = 2        # Unknown
+    recent_penalty: int = 8       # Visited in the last ticks (anti back-and-forth)
+
+    # Strategic mode cutoffs
+    defensive_time: int = 120             # Seconds left to start protecting the lead
+    aggressive_percentile: float = 0.7    # Rank percentile above which we take risks
+
+    def Save(self, path):
+        with open(path, "w") as f:
+            json.dump(self._asdict(), f, indent=2)
+
+    @staticmethod
+    def Load(path):
+        with open(path) as f:
+            values = json.load(f)
+        # Unknown keys (older/newer files) are ignored, missing ones keep the default
+        return StrategyParams(**{k: v for k, v in values.items() if k in StrategyParams._fields})
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import signal
+import threading
+
+
+class SamplingProfiler(threading.Thread):
+    """
+    Statistical profiler of the decision tick, switched on and off while the
+    bot runs (Toggle(), or the signal hooked by InstallSignal()).
+
+    While enabled, this thread reads the stack of the watched thread from
+    sys._current_frames() every `interval` seconds and counts it. Bot's Timer
+    runs each tick on a new thread, so Watch() is called at the start of every
+    tick. Stacks inside GameAI.GetDecision are prefixed with the decision
+    phase it is running (GameAI.phase), the rest with "tick". Dump() writes
+    the counts as collapsed stacks ("phase;outer;...;inner samples" per line),
+    the input of flamegraph.pl and speedscope.
+
+    While disabled the thread sleeps on an Event: the tick only pays for
+    Watch() and GetDecision for a few attribute stores.
+    """
+
+    INTERVAL = 0.005  # seconds between samples
+    MAX_DEPTH = 64
+    DECISION = "GetDecision"
+    SIGNALS = ("SIGUSR1", "SIGBREAK")  # POSIX, Windows (Ctrl+Break)
+
+    def __init__(self, ai, out_dir=".", interval=INTERVAL, log=print):
+        super().__init__(daemon=True)
+        self.ai = ai
+        self.out_dir = out_dir
+        self.interval = interval
+        self.log = log
+        self.target = None  # thread ident being sampled
+        self.enabled = threading.Event()
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+        self.counts = {}    # collapsed stack -> samples
+        self.samples = 0
+        self.labels = {}    # code object -> "file:function"
+
+    def Watch(self, ident=None):
+        self.target = threading.get_ident() if ident is None else ident
+
+    # <summary>
+    # Switching
+    # </summary>
+    def Enable(self):
+        with self.lock:
+            self.counts = {}
+            self.samples = 0
+        self.enabled.set()
+        self.log(f"PROFILER: Sampling every {self.interval * 1000:.0f} ms.")
+
+    def Disable(self):
+        self.enabled.clear()
+        path = self.Dump()
+        self.log(f"PROFILER: {self.samples} samples ({self.PhaseReport()}) written to {path}")
+        return path
+
+    def Toggle(self):
+        if self.enabled.is_set():
+            return self.Disable()
+        self.Enable()
+
+    def Stop(self):
+        self.stopped.set()
+        self.enabled.set()
+
+    # <summary>
+    # Hooks Toggle() to the first available signal; must run on the main thread
+    # </summary>
+    def InstallSignal(self):
+        for name in self.SIGNALS:
+            signum = getattr(signal, name, None)
+            if signum is not None:
+                try:
+                    signal.signal(signum, lambda signum, frame: self.Toggle())
+                except ValueError:
+                    return None  # not the main thread
+                return name
+        return None
+
+    # <summary>
+    # Sampling
+    # </summary>
+    def run(self):
+        while not self.stopped.is_set():
+            self.enabled.wait()
+            while self.enabled.is_set() and not self.stopped.is_set():
+                frame = sys._current_frames().get(self.target)
+                if frame is not None:
+                    self.Sample(frame)
+                frame = None
+                time.sleep(self.interval)
+
+    def Sample(self, frame):
+        stack = []
+        phase = "tick"
+        while frame is not None and len(stack) < self.MAX_DEPTH:
+            code = frame.f_code
+            label = self.labels.get(code)
+            if label is None:
+                label = self.labels[code] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+            if code.co_name == self.DECISION:
+                phase = getattr(self.ai, "phase", None) or "decision"
+            stack.append(label)
+            frame = frame.f_back
+        stack.append(phase)
+        stack.reverse()
+        key = ";".join(stack)
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    # <summary>
+    # Output
+    # </summary>
+    def Collapsed(self):
+        with self.lock:
+            counts = sorted(self.counts.items())
+        return [f"{stack} {n}" for stack, n in counts]
+
+    def PhaseTotals(self):
+        totals = {}
+        with self.lock:
+            for stack, n in self.counts.items():
+                phase = stack.split(";", 1)[0]
+                totals[phase] = totals.get(phase, 0) + n
+        return totals
+
+    def PhaseReport(self):
+        totals = self.PhaseTotals()
+        total = sum(totals.values()) or 1
+        return ", ".join(f"{phase} {n * 100 / total:.0f}%"
+                         for phase, n in sorted(totals.items(), key=lambda item: -item[1]))
+
+    def Dump(self, path=None):
+        if path is None:
+            os.makedirs(self.out_dir, exist_ok=True)
+            path = os.path.join(self.out_dir, time.strftime("profile-%Y%m%d-%H%M%S.folded"))
+        with open(path, "w") as f:
+            for line in self.Collapsed():
+                f.write(line + "\n")
+        return path
@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+from array import array
+
+MAGIC = b"T3TL"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBIH")  # magic, format version, columns, rows, labels JSON size
+COLUMN = struct.Struct("<15sc")    # column name, array typecode
+ALIGN = 8                          # column data starts on this boundary (for memoryview.cast)
+
+# One value per decision tick, in file order (name, array typecode)
+COLUMNS = (
+    ("t", "f"),         # seconds since the first tick of the match
+    ("x", "h"),
+    ("y", "h"),
+    ("dir", "B"),       # index into the "dir" labels
+    ("energy", "h"),
+    ("score", "i"),
+    ("percepts", "H"),  # GameAI.PERCEPT_FLAGS bits
+    ("enemy", "B"),     # distance of a visible enemy (0 = none)
+    ("action", "B"),    # index into the "action" labels
+    ("phase", "B"),     # index into the "phase" labels
+    ("latency", "f"),   # seconds spent in GetDecision
+)
+LABELS = {
+    "dir": ("north", "east", "south", "west"),
+    "action": ("", "andar", "andar_re", "virar_direita", "virar_esquerda", "atacar",
+               "pegar_ouro", "pegar_anel", "pegar_powerup"),
+    "phase": ("", "anti_stuck", "refuel", "gold", "combat", "exploration", "fallback"),
+}
+
+
+def _Padding(offset):
+    return -offset % ALIGN
+
+
+class TickRecorder:
+    """
+    Per-tick telemetry of the decision loop kept in typed column buffers.
+
+    Record() appends one value to each array.array column (no string
+    formatting on the tick); Flush() writes the match to one TickLog file
+    and starts over. Labels (headings, actions, phases) are stored as small
+    integer codes, the tables travel in the file header.
+    """
+
+    def __init__(self, directory="telemetry"):
+        self.directory = directory
+        self.codes = {name: {label: i for i, label in enumerate(labels)} for name, labels in LABELS.items()}
+        self.Clear()
+
+    def __len__(self):
+        return len(self.columns["t"])
+
+    def Clear(self):
+        self.columns = {name: array(code) for name, code in COLUMNS}
+        self.start = None
+
+    def Record(self, ai, action, latency):
+        now = time.perf_counter()
+        if self.start is None:
+            self.start = now
+        percepts, enemy = ai.PerceptFlags()
+        c = self.columns
+        c["t"].append(now - self.start)
+        c["x"].append(ai.player.x)
+        c["y"].append(ai.player.y)
+        c["dir"].append(self.codes["dir"].get(ai.dir, 0))
+        c["energy"].append(ai.energy)
+        c["score"].append(ai.score)
+        c["percepts"].append(percepts)
+        c["enemy"].append(enemy)
+        c["action"].append(self.codes["action"].get(action, 0))
+        c["phase"].append(self.codes["phase"].get(ai.phase or "", 0))
+        c["latency"].append(latency)
+
+    # <summary>
+    # Write the ticks recorded so far (if any) and clear the buffers
+    # </summary>
+    def Flush(self, path=None):
+        if not len(self):
+            return None
+        if path is None:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, time.strftime("match-%Y%m%d-%H%M%S.ticks"))
+        labels = json.dumps(LABELS).encode()
+        out = [HEADER.pack(MAGIC, FORMAT_VERSION, len(COLUMNS), len(self), len(labels)), labels]
+        out += [COLUMN.pack(name.encode(), code.encode()) for name, code in COLUMNS]
+        offset = sum(len(part) for part in out)
+        for name, _ in COLUMNS:
+            out.append(bytes(_Padding(offset)))
+            offset += _Padding(offset)
+            data = self.columns[name].tobytes()
+            out.append(data)
+            offset += len(data)
+
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(b"".join(out))
+        os.replace(tmp, path)
+        self.Clear()
+        return path
+
+
+class TickLog:
+    """
+    One recorded match, memory-mapped: columns are zero-copy memoryviews.
+
+    Iterating a column, sum() over it or bytes.count() on a code column runs
+    over the mapped file without parsing rows, so scanning hundreds of
+    matches takes seconds.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self.map)
+        magic, version, count, self.rows, labels_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            view.release()
+            self.map.close()
+            raise ValueError("not a tick log file")
+        offset = HEADER.size
+        self.labels = {name: tuple(labels) for name, labels in json.loads(bytes(view[offset:offset + labels_size])).items()}
+        offset += labels_size
+
+        layout = []
+        for _ in range(count):
+            name, code = COLUMN.unpack_from(view, offset)
+            layout.append((name.rstrip(b"\0").decode(), code.decode()))
+            offset += COLUMN.size
+        self.columns = {}
+        for name, code in layout:
+            offset += _Padding(offset)
+            size = array(code).itemsize * self.rows
+            self.columns[name] = view[offset:offset + size].cast(code)
+            offset += size
+        view.release()
+
+    @staticmethod
+    def Scan(directory):
+        """Every tick log in a directory, in name (time) order."""
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".ticks"):
+                yield TickLog(os.path.join(directory, name))
+
+    def __len__(self):
+        return self.rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.Close()
+
+    def Close(self):
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self.map.close()
+
+    def Column(self, name):
+        return self.columns[name]
+
+    def Counts(self, name):
+        """Rows per label of a one-byte code column."""
+        data = self.columns[name].tobytes()
+        return {label: data.count(i) for i, label in enumerate(self.labels[name])}
+
+
+def Summarize(directory):
+    """Totals over every match in a directory (the module's command line)."""
+    matches = rows = 0
+    actions, phases = {}, {}
+    latencies = array("f")
+    for log in TickLog.Scan(directory):
+        with log:
+            matches += 1
+            rows += len(log)
+            for totals, name in ((actions, "action"), (phases, "phase")):
+                for label, n in log.Counts(name).items():
+                    totals[label] = totals.get(label, 0) + n
+            latencies.extend(log.Column("latency"))
+    return matches, rows, actions, phases, sorted(latencies)
+
+
+def Main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else "telemetry"
+    start = time.perf_counter()
+    matches, rows, actions, phases, latencies = Summarize(directory)
+    print(f"TELEMETRY: {matches} matches, {rows} ticks read in {time.perf_counter() - start:.2f}s")
+    if not rows:
+        return
+    for title, totals in (("Actions", actions), ("Phases", phases)):
+        print(f"{title}: " + ", ".join(f"{label or '-'} {n * 100 / rows:.1f}%"
+                                       for label, n in sorted(totals.items(), key=lambda item: -item[1]) if n))
+    p50, p99 = latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+    print(f"Decision latency: p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    Main()
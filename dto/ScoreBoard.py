@@ -1,8 +1,9 @@
+from typing import NamedTuple, Tuple
 
-class ScoreBoard:
-    def __init__(self, name, connected, energy, score, color):
-        self.name = name
-        self.connected = connected
-        self.energy = energy
-        self.score = score
-        self.color = color
+
+class ScoreBoard(NamedTuple):
+    name: str
+    connected: bool
+    energy: int
+    score: int
+    color: Tuple[int, int, int]
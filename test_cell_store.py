@@ -0,0 +1,43 @@
+import unittest
+from Map.CellStore import CellSet, CellMap
+
+class TestCellStore(unittest.TestCase):
+    def test_fork_shares_until_write(self):
+        a = CellSet([(x, y) for x in range(20) for y in range(20)])
+        b = a.Fork()
+        a.discard((0, 0))
+        b.add((30, 30))
+
+        self.assertEqual(len(a), 399)
+        self.assertEqual(len(b), 401)
+        self.assertIn((0, 0), b)
+        self.assertNotIn((30, 30), a)
+        # Untouched tiles are still the same objects on both sides
+        self.assertIs(a._Lookup((19, 19)), b._Lookup((19, 19)))
+
+    def test_tile_stamps(self):
+        a = CellSet([(1, 1), (9, 1)])
+        before = {key: stamp for key, stamp, _ in a.Tiles()}
+        b = a.Fork(frozen=True)
+        a.add((2, 2))
+        after = {key: stamp for key, stamp, _ in a.Tiles()}
+
+        # Only the written tile has a new stamp; the fork still has the old one
+        self.assertNotEqual(after[(0, 0)], before[(0, 0)])
+        self.assertEqual(after[(1, 0)], before[(1, 0)])
+        self.assertEqual({key: stamp for key, stamp, _ in b.Tiles()}, before)
+
+    def test_cell_map(self):
+        m = CellMap({(1, 1): "Safe"})
+        snap = m.Fork(frozen=True)
+        m[(1, 1)] = "Wall"
+        m[(2, 2)] = "Safe"
+
+        self.assertEqual(snap.get((1, 1)), "Safe")
+        self.assertIsNone(snap.get((2, 2)))
+        self.assertEqual(m[(1, 1)], "Wall")
+        self.assertEqual(len(m), 2)
+        self.assertEqual(len(snap), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,19 @@
 import unittest
 from GameAI import GameAI
 from Map.Position import Position
+from Planning.Deadline import Deadline
+from Planning.PlannerWorker import PlannerWorker
+import time
+import tempfile
+import os
+from Map.MapCache import MapCache
+from Map.PositionHistory import PositionHistory
+from Planning.RolloutPlanner import RolloutPlanner
+from Planning.DecisionCache import DecisionCache
+from Planning.HierarchicalPlanner import HierarchicalPlanner
+from dto.ScoreBoard import ScoreBoard
+from dto.PlayerInfo import PlayerInfo
+import random
 
 class TestGameAI(unittest.TestCase):
     def setUp(self):
@@ -30,6 +43,15 @@ class TestGameAI(unittest.TestCase):
         cmd = self.ai.GetDecision()
         self.assertEqual(cmd, "atacar")
 
+    def test_enemy_tracking_pruned(self):
+        # Sightings from an earlier match or too long ago are dropped
+        self.ai.SetStatus(5, 5, "north", "game", 0, 100)
+        self.ai.game_time = 300
+        self.ai.UpdateEnemyTracking("enemy#2")
+        self.ai.game_time = 5
+        self.ai.UpdateEnemyTracking("enemy#3")
+        self.assertEqual(list(self.ai.enemy_last_positions), ["enemy_north_3"])
+
     def test_avoid_breeze(self):
         # Logic test: if breeze, don't move forward carelessly?
         # This is harder to test without map state, but let's see if it runs.
@@ -38,5 +60,643 @@ class TestGameAI(unittest.TestCase):
         cmd = self.ai.GetDecision()
         print(f"Decision with breeze: {cmd}")
 
+    def test_zero_budget_still_decides(self):
+        # A large explored area with no frontier nearby must not stall the tick
+        for x in range(60):
+            for y in range(60):
+                self.ai.visited.add((x, y))
+        cmd = self.ai.GetDecision(budget=0)
+        self.assertIn(cmd, ["virar_direita", "virar_esquerda", "andar"])
+
+    def test_frontier_search_resumes(self):
+        for x in range(60):
+            for y in range(60):
+                self.ai.visited.add((x, y))
+        self.ai.SetPlayerPosition(0, 0)
+
+        self.assertIsNone(self.ai.FindBestFrontier(Deadline(0)))
+        search = self.ai.distance_field
+        self.assertFalse(search.done)
+
+        # Same map version: the interrupted search is continued, not restarted
+        target = self.ai.FindBestFrontier()
+        self.assertIs(self.ai.distance_field, search)
+        self.assertTrue(search.done)
+        self.assertNotIn(target, self.ai.visited)
+        self.assertEqual(search.Distance(target), 60)
+
+        # Visiting the target changes the map, so a new search is started
+        self.ai.SetPlayerPosition(*target)
+        self.ai.FindBestFrontier()
+        self.assertIsNot(self.ai.distance_field, search)
+
+    def test_distance_field_serves_every_query(self):
+        # An L-shaped corridor: (0..4, 0) then (4, 1..4), gold at the far end
+        for x in range(5):
+            self.ai.visited.add((x, 0))
+        for y in range(1, 5):
+            self.ai.visited.add((4, y))
+        self.ai.gold_locations.add((4, 4))
+        self.ai.powerup_locations.add((2, 0))
+        self.ai.SetStatus(0, 0, "east", "game", 0, 100)
+
+        field = self.ai.GetDistanceField()
+        self.assertEqual(field.Distance((4, 4)), 8)
+        self.assertEqual(field.FirstStep((4, 4)), (1, 0))
+        self.assertEqual(self.ai.FindNearestItem(self.ai.gold_locations), (4, 4))
+        self.assertEqual(self.ai.FindNearestItem(self.ai.powerup_locations), (2, 0))
+        self.assertEqual(self.ai.GetNextStepTowards((4, 4)), "andar")
+        self.assertEqual(self.ai.FindEscapeStep(), (1, 0))
+        self.assertIsNone(self.ai.path_search)
+
+        # Same map, new position: the layer masks are reused, rings rebuilt
+        self.ai.SetStatus(1, 0, "east", "game", 0, 100)
+        moved = self.ai.GetDistanceField()
+        self.assertIsNot(moved, field)
+        self.assertIs(moved.passable, field.passable)
+        self.assertEqual(moved.Distance((4, 4)), 7)
+
+    def test_frontier_regions_rank_by_cost_then_gain(self):
+        # Walled corridor (10..16, 5): frontier at (9, 5), a dead end, and (17, 5), open to the east
+        for x in range(10, 17):
+            self.ai.visited.add((x, 5))
+            self.ai.safe_cells.add((x, 5))
+        for x in range(8, 18):
+            self.ai.hazards.add((x, 4))
+            self.ai.hazards.add((x, 6))
+        self.ai.hazards.add((8, 5))
+
+        # Same distance both ways: the turns decide, nearest-first would pick by cell order
+        self.ai.SetStatus(13, 5, "east", "game", 0, 100)
+        field = self.ai.GetDistanceField()
+        self.assertEqual(field.NearestFrontier(), (9, 5))
+        self.assertEqual(field.BestFrontier("east"), (17, 5))
+        self.assertEqual(field.BestFrontier("west"), (9, 5))
+        self.assertEqual(self.ai.FindBestFrontier(), (17, 5))
+
+        # Same cost: the region revealing more wins over the dead end
+        self.assertEqual(field.BestFrontier("north"), (17, 5))
+        gains = {field.grid.Cell(region.bit_length() - 1): gain for region, gain in field.regions.regions}
+        self.assertEqual(gains, {(9, 5): 1, (17, 5): 2})
+
+        # Moving on the same map reuses the valued regions
+        self.ai.SetStatus(14, 5, "east", "game", 0, 100)
+        moved = self.ai.GetDistanceField()
+        self.assertIsNot(moved, field)
+        self.assertIs(moved.regions, field.regions)
+
+    def test_planner_worker_plan_used_by_tick(self):
+        for x in range(5):
+            self.ai.visited.add((x, 0))
+        self.ai.gold_locations.add((4, 0))
+        self.ai.SetStatus(0, 0, "north", "game", 0, 100)
+
+        worker = PlannerWorker(self.ai, interval=0.01)
+        self.ai.planner = worker
+        self.ai.Publish()  # attached after the last status: publish what is known so far
+        worker.start()
+        try:
+            for _ in range(100):
+                if self.ai.FreshPlan():
+                    break
+                time.sleep(0.01)
+            plan = self.ai.FreshPlan()
+            self.assertIsNotNone(plan)
+            self.assertEqual(plan.gold_step, (1, 0))
+            self.assertEqual(self.ai.FindBestFrontier(), plan.frontier)
+        finally:
+            worker.Stop()
+            worker.join(1)
+
+        # Moving invalidates the plan until the worker catches up
+        self.ai.SetPlayerPosition(1, 0)
+        self.assertIsNone(self.ai.FreshPlan())
+
+    def test_snapshot_is_isolated_from_writer(self):
+        self.ai.GetObservations(["breeze"])
+        self.assertIsNone(self.ai.published)  # no planner thread: nothing is published
+        snap = self.ai.Snapshot(frozen=True)
+        version = snap.map_version
+
+        self.ai.SetStatus(0, 1, "south", "game", 0, 100)
+        self.ai.GetObservations(["flash"])
+
+        self.assertNotIn((0, 1), snap.visited)
+        self.assertNotIn((0, 1), snap.flash_sources)
+        self.assertIn((0, 0), snap.breeze_sources)
+        self.assertEqual(snap.map_version, version)
+        self.assertIn((0, 1), self.ai.flash_sources)
+        self.ai.LearnTeleport((0, 2), (9, 9))
+        self.assertEqual(snap.teleports, {})
+        with self.assertRaises(TypeError):
+            snap.visited.add((5, 5))
+
+        # A private fork of a frozen snapshot is writable and isolated
+        work = snap.Snapshot()
+        work.visited.add((5, 5))
+        self.assertNotIn((5, 5), snap.visited)
+        self.assertNotIn((5, 5), self.ai.visited)
+
+    def test_map_cache_warm_start(self):
+        with tempfile.TemporaryDirectory() as directory:
+            percepts = {2: ["flash"], 4: ["breeze"], 7: ["breeze"]}
+            first = GameAI()
+            first.map_cache = MapCache(directory)
+            for x in range(10):
+                first.SetStatus(x, 3, "east", "game", 0, 100)
+                first.GetObservations(percepts.get(x, []))
+            first.last_action = "andar"
+            first.GetObservations(["blocked"])  # (10, 3) is a wall
+            self.assertIsNotNone(first.map_cache.Save(first))
+
+            # A match cut short before the arena was confirmed merges into it instead of copying it
+            early = GameAI()
+            early.map_cache = MapCache(directory)
+            for x in range(3, 9):
+                early.SetStatus(x, 3, "east", "game", 0, 100)
+                early.GetObservations(percepts.get(x, []))
+            self.assertIsNone(early.map_cache.matched)
+            self.assertIsNotNone(early.map_cache.Save(early))
+            self.assertEqual(len([n for n in os.listdir(directory) if n.endswith(".map")]), 1)
+
+            # Calm cells agreeing prove nothing: most cells of any arena are calm
+            calm = GameAI()
+            calm.map_cache = MapCache(directory)
+            for y in range(10):
+                calm.SetStatus(8, y, "south", "game", 0, 100)
+                calm.GetObservations([])
+            self.assertIsNone(calm.map_cache.matched)
+
+            # A new match on the same arena, starting somewhere else
+            second = GameAI()
+            second.map_cache = MapCache(directory)
+            second.StartMatch()
+            for x in range(9, 1, -1):
+                second.SetStatus(x, 3, "west", "game", 0, 100)
+                second.GetObservations(percepts.get(x, []))
+
+            self.assertIn((0, 3), second.visited)
+            self.assertEqual(second.hierarchy.known, len(second.visited))  # loaded cells touched, no full resync
+            self.assertIn((10, 3), second.hazards)
+            self.assertEqual(second.map_state.get((10, 3)), "Wall")
+
+            # A later contradiction undoes the warm start but keeps what was seen
+            second.SetStatus(1, 3, "west", "game", 0, 100)
+            second.GetObservations(["breeze"])
+            self.assertIsNone(second.map_cache.matched)
+            self.assertNotIn((0, 3), second.visited)
+            self.assertNotIn((10, 3), second.hazards)
+            self.assertIn((5, 3), second.visited)
+            self.assertEqual(set(second.breeze_sources), {(1, 3), (4, 3), (7, 3)})
+            second.map_cache.Save(second)
+            self.assertEqual(len([n for n in os.listdir(directory) if n.endswith(".map")]), 2)
+
+            # Both arenas agree with a walk that avoids (1, 3): the better-known one is loaded
+            third = GameAI()
+            third.map_cache = MapCache(directory)
+            for x in range(9, 1, -1):
+                third.SetStatus(x, 3, "west", "game", 0, 100)
+                third.GetObservations(percepts.get(x, []))
+            self.assertIn((0, 3), third.visited)
+
+            # A different arena (breeze in another place) is not matched
+            other = GameAI()
+            other.map_cache = MapCache(directory)
+            for x in range(9, 1, -1):
+                other.SetStatus(x, 3, "west", "game", 0, 100)
+                other.GetObservations(["breeze"] if x == 6 else [])
+            self.assertNotIn((0, 3), other.visited)
+
+    def test_layer_masks_follow_written_tiles(self):
+        for x in range(120):
+            for y in range(60):
+                self.ai.visited.add((x, y))
+        self.ai.MapChanged()
+
+        # Packing every tile does not fit an expired deadline: nothing is reached yet
+        expired = Deadline(0)
+        field = self.ai.GetDistanceField(expired)
+        self.assertFalse(field.done)
+        self.assertIsNone(field.FirstStep((5, 5)))
+        self.assertFalse(self.ai.layers.synced)
+        field = self.ai.GetDistanceField()
+        self.assertEqual(field.Distance((5, 5)), 10)
+        g = self.ai.layers.grid
+        self.assertGreaterEqual(g.width, 121)
+        self.assertEqual(self.ai.layers.Masks()[0], g.Mask(self.ai.visited))
+
+        # One new cell re-packs one tile, even under an expired deadline
+        self.ai.visited.add((0, 60))
+        self.ai.hazards.add((1, 60))
+        self.ai.MapChanged()
+        self.assertTrue(self.ai.layers.Sync(self.ai, expired))
+        visited, hazards = self.ai.layers.Masks()[:2]
+        self.assertEqual(visited, g.Mask(self.ai.visited))
+        self.assertEqual(hazards, g.Bit(1, 60))
+        self.assertEqual(self.ai.GetDistanceField().Distance((0, 60)), 60)
+
+        # A new match's empty stores clear what was packed
+        self.ai.StartMatch()
+        self.ai.layers.Sync(self.ai)
+        self.assertEqual(self.ai.layers.Masks(), [0] * 5)
+
+    def test_teleport_becomes_shortcut(self):
+        # Walk east along row 0, then step into a teleport at (3, 0) that lands at (20, 0)
+        for x in range(3):
+            self.ai.SetStatus(x, 0, "east", "game", 0, 100)
+        self.ai.combat_state = "strafe_moving"
+        self.ai.last_action = "andar"
+        self.ai.SetStatus(20, 0, "east", "game", 0, 100)
+
+        self.assertEqual(self.ai.teleports, {(3, 0): (20, 0)})
+        self.assertIsNone(self.ai.combat_state)
+        self.assertIn((0, 0), self.ai.visited)
+
+        # Back at the start, a route to (21, 0) goes through the teleport
+        self.ai.visited.add((21, 0))
+        self.ai.SetStatus(2, 0, "east", "game", 0, 100)
+        self.assertEqual(self.ai.GetNextStepTowards((21, 0)), "andar")
+        self.assertEqual(self.ai.GetDistanceField().Distance((21, 0)), 2)
+
+    def test_new_match_forgets_teleports(self):
+        self.ai.SetStatus(31, 5, "east", "game", 0, 100)
+        self.ai.teleports[(3, 0)] = (20, 0)
+        self.ai.last_action = "andar"
+        self.ai.combat_state = "strafe_moving"
+        self.ai.StartMatch()
+        self.assertEqual(self.ai.teleports, {})
+        self.assertIsNone(self.ai.combat_state)
+        self.ai.SetStatus(10, 20, "east", "game", 0, 100)
+        self.assertEqual(self.ai.teleports, {})
+        self.assertIsNone(self.ai.map_state.get((32, 5)))
+
+    def test_every_decision_is_remembered(self):
+        # The strafe "andar" (like the fallback moves) used to leave last_action stale
+        self.ai.SetStatus(2, 5, "east", "game", 0, 100)
+        self.ai.last_action = "virar_direita"
+        self.ai.combat_state = "strafe_turning"
+        self.assertEqual(self.ai.GetDecision(), "andar")
+        self.assertEqual(self.ai.last_action, "andar")
+        self.ai.SetStatus(20, 5, "east", "game", 0, 100)
+        self.assertEqual(self.ai.teleports, {(3, 5): (20, 5)})
+
+    def test_death_marks_pit_and_keeps_map(self):
+        self.ai.SetStatus(1, 0, "east", "game", 0, 100)
+        self.ai.last_action = "andar"
+        self.ai.position_history.append((0, 0))
+        self.ai.position_history.append((1, 0))
+        self.ai.SetStatus(2, 0, "east", "dead", 0, 0)
+
+        self.assertIn((2, 0), self.ai.hazards)
+        self.assertNotIn((2, 0), self.ai.visited)
+        self.assertIn((1, 0), self.ai.visited)
+        self.assertEqual(len(self.ai.position_history), 0)
+
+        # Later dead statuses and percepts (q is polled while dead) learn nothing either
+        self.ai.SetStatus(2, 0, "east", "dead", 0, 0)
+        self.ai.GetObservations(["breeze"])
+        self.ai.GetObservationsClean()
+        self.assertNotIn((2, 0), self.ai.visited)
+        self.assertNotIn((2, 0), self.ai.safe_cells)
+        self.assertNotIn((2, 0), self.ai.breeze_sources)
+        self.assertFalse(self.ai.IsSafe(2, 0))
+        self.assertEqual(self.ai.map_state[(2, 0)], "Pit")
+
+    def test_shot_dead_is_not_a_pit(self):
+        self.ai.SetStatus(1, 0, "east", "game", 0, 100)
+        self.ai.GetDecision()
+        self.ai.last_action = "andar"
+        self.ai.GetObservations(["damage"])
+        self.ai.SetStatus(1, 0, "east", "dead", 0, 0)
+        self.assertNotIn((2, 0), self.ai.hazards)
+        self.assertNotEqual(self.ai.map_state.get((2, 0)), "Pit")
+
+        # No damage lately: standing still after "andar" and dying means the cell ahead
+        self.ai.SetStatus(1, 0, "east", "game", 0, 100)
+        for _ in range(3):
+            self.ai.GetDecision()
+        self.ai.last_action = "andar"
+        self.ai.SetStatus(1, 0, "east", "dead", 0, 0)
+        self.assertIn((2, 0), self.ai.hazards)
+
+    def test_position_history_loop_signals(self):
+        history = PositionHistory(10)
+        for pos in [(0, 0), (0, 0), (1, 0), (1, 1)]:
+            history.append(pos)
+        self.assertFalse(history.StraightLine(4))
+        self.assertTrue(history.IsRecent((0, 0)))
+
+        # A-B-A-B between two cells in different rows and columns
+        history.clear()
+        for pos in [(1, 1), (2, 1), (2, 2), (2, 1), (2, 2)]:
+            history.append(pos)
+        self.assertTrue(history.Oscillating())
+
+        # Going round a 2x2 block: every cell is entered again and again
+        history.clear()
+        for pos in [(0, 0), (1, 0), (1, 1), (0, 1)] * 3:
+            history.append(pos)
+        self.assertFalse(history.Oscillating())
+        self.assertTrue(history.Cycling())
+
+        # Old entries expire from the ring buffer
+        for pos in [(5, y) for y in range(10)]:
+            history.append(pos)
+        self.assertFalse(history.Cycling())
+        self.assertFalse(history.IsRecent((0, 0)))
+        self.assertEqual(len(history), 10)
+
+    def test_positions_are_shared_values(self):
+        pos = self.ai.GetPlayerPosition()
+        with self.assertRaises(AttributeError):
+            pos.x = 5
+        self.assertIs(self.ai.NextPositionAhead(1), Position.At(0, -1))
+        self.assertEqual(str(Position(2, 3)), "(2, 3)")
+        self.assertEqual(len(self.ai.GetAllAdjacentPositions()), 8)
+        self.assertFalse(hasattr(pos, "__dict__"))
+
+    def test_retreat_uses_rollouts(self):
+        # Low energy in a corridor with side exits, enemy two cells ahead
+        for x in range(10):
+            self.ai.visited.add((x, 5))
+        self.ai.visited.add((3, 4))
+        self.ai.visited.add((3, 6))
+        self.ai.SetStatus(3, 5, "east", "game", 0, 25)
+        self.ai.rollout_planner = RolloutPlanner(seed=1)
+        self.ai.GetObservations(["enemy#2"])
+
+        cmd = self.ai.GetDecision()
+        self.assertNotIn(cmd, ["atacar", "andar"])
+        played = self.ai.rollout_planner.rollouts
+        self.assertGreater(played, 0)
+
+        # Same standoff next tick: the statistics are reused, not replayed
+        self.ai.position_history.clear()
+        self.assertEqual(self.ai.GetDecision(), cmd)
+        self.assertEqual(self.ai.rollout_planner.rollouts, played)
+
+    def test_safety_map_invalidation(self):
+        rng = random.Random(3)
+        x, y = 0, 0
+        for _ in range(300):
+            dx, dy = rng.choice([(1, 0), (-1, 0), (0, 1), (0, -1)])
+            x, y = max(0, x + dx), max(0, y + dy)
+            self.ai.last_action = "andar"
+            self.ai.SetStatus(x, y, "north", "game", 0, 100)
+            self.ai.GetObservations(rng.choice([[], ["breeze"], ["flash"], ["blocked"]]))
+            for cx in range(x - 2, x + 3):
+                for cy in range(y - 2, y + 3):
+                    self.ai.IsSafe(cx, cy)
+
+        # Memoized verdicts agree with the rule, and the rule has no side effects
+        safe_cells = len(self.ai.safe_cells)
+        for (cx, cy), verdict in list(self.ai.safety.items()):
+            self.assertEqual(verdict, self.ai.ClassifySafety(cx, cy))
+        self.assertEqual(len(self.ai.safe_cells), safe_cells)
+
+        # A new percept only drops the verdicts around the changed cell
+        far = next(c for c in self.ai.safety if abs(c[0] - x) + abs(c[1] - y) > 1)
+        self.ai.GetObservations(["breeze"])
+        self.assertIn(far, self.ai.safety)
+
+        # Frozen snapshots answer but never write
+        snap = self.ai.Snapshot(frozen=True)
+        self.assertFalse(snap.IsSafe(x + 40, y + 40))
+        self.assertNotIn((x + 40, y + 40), snap.safety)
+
+    def test_score_tracker(self):
+        def board(**scores):
+            return [ScoreBoard(name, True, 100, score, (0, 0, 0)) for name, score in scores.items()]
+
+        me = self.ai.my_name
+        self.ai.UpdateGameState(board(**{me: 100, "a": 300, "b": 100, "c": 0}), 0, "Game")
+        self.assertEqual((self.ai.my_rank, self.ai.total_players), (2, 4))  # tied with b
+        text = self.ai.scores.Text()
+        self.assertTrue(text.startswith("a\n"))
+
+        # Records are updated in place; a departed player is dropped
+        record = self.ai.scores.records["a"]
+        self.ai.UpdateGameState(board(**{me: 400, "a": 300, "b": 100}), 60, "Game")
+        self.assertIs(self.ai.scores.records["a"], record)
+        self.assertEqual((self.ai.my_rank, self.ai.total_players), (1, 3))
+        self.assertNotIn("c", self.ai.scores)
+        self.assertIsNot(self.ai.scores.Text(), text)
+        self.assertEqual(self.ai.scores.rates.Rate(me), 5.0)
+
+    def test_score_rate_projection(self):
+        me = self.ai.my_name
+
+        def update(game_time, mine, a=500, b=150):
+            board = [ScoreBoard(name, True, 100, score, (0, 0, 0)) for name, score in ((me, mine), ("a", a), ("b", b))]
+            self.ai.UpdateGameState(board, game_time, "Game")
+
+        # Last place but scoring fast: the projection says we finish first
+        update(0, 0)
+        update(10, 30)
+        self.assertIsNone(self.ai.ProjectStandings(590))  # rates not trusted yet
+        self.assertEqual(self.ai.GetStrategicMode(), "AGGRESSIVE")
+        update(30, 90)
+        self.assertEqual(self.ai.my_rank, 3)
+        self.assertAlmostEqual(self.ai.scores.rates.Rate(me), 3.0)
+        self.assertEqual(self.ai.GetStrategicMode(), "BALANCED")
+
+        # Stalled: the rate fades and the projected finish is last again
+        for game_time in (60, 90, 300):
+            update(game_time, 90)
+        self.assertEqual(self.ai.ProjectStandings(300)[0], 3)
+        self.assertEqual(self.ai.GetStrategicMode(), "AGGRESSIVE")
+
+        # New match (clock back to 0): a lead nobody can catch is defended early
+        update(0, 0, 100, 150)
+        update(40, 2000, 100, 150)
+        self.assertEqual(self.ai.ProjectStandings(560), (1, True))
+        self.assertEqual(self.ai.GetStrategicMode(), "DEFENSIVE")
+
+    def test_hierarchical_planner(self):
+        # Random open map: routes follow first steps to the target, never much
+        # longer than the shortest one, and cross-map queries stay local
+        rng = random.Random(5)
+        cells = [(x, y) for x in range(59) for y in range(34) if rng.random() < 0.8]
+        for cell in cells:
+            self.ai.visited.add(cell)
+        planner = HierarchicalPlanner()
+
+        def Bfs(start):
+            dist, queue = {start: 0}, [start]
+            for cell in queue:
+                for n in planner.Around(cell):
+                    if n in self.ai.visited and n not in dist:
+                        dist[n] = dist[cell] + 1
+                        queue.append(n)
+            return dist
+
+        for _ in range(20):
+            start, target = rng.choice(cells), rng.choice(cells)
+            dist = Bfs(start)
+            step = planner.FirstStep(self.ai, start, target)
+            if target not in dist or start == target:
+                self.assertIsNone(step)
+                continue
+            self.assertLess(planner.expanded, len(dist))
+            length, cell = 0, start
+            while cell != target and length < 200:
+                cell = planner.FirstStep(self.ai, cell, target)
+                length += 1
+            self.assertEqual(cell, target)
+            self.assertLessEqual(length, dist[target] + 6)
+
+        # Walking into new cells only rebuilds their blocks, same graph as from scratch
+        for cell in [(x, 17) for x in range(59)]:
+            if cell not in self.ai.visited:
+                planner.Touch(cell)
+                self.ai.visited.add(cell)
+        planner.Sync(self.ai)
+        fresh = HierarchicalPlanner()
+        fresh.Sync(self.ai)
+        self.assertEqual(planner.intra, fresh.intra)
+
+        # With no time left the graph is rebuilt a block per call, and only used once complete
+        self.ai.SetStatus(0, 17, "east", "game", 0, 100)
+        hierarchy = self.ai.hierarchy
+        self.assertIsNone(hierarchy.FirstStep(self.ai, (0, 17), (58, 17), Deadline(0)))
+        self.assertTrue(hierarchy.dirty or hierarchy.stale)
+        calls = 1
+        while not hierarchy.Sync(self.ai, Deadline(0)):
+            calls += 1
+        self.assertGreater(calls, 1)
+        self.assertEqual(hierarchy.intra, fresh.intra)
+
+        # ...then, with no time for the distance field, the tick routes on the cluster graph
+        self.assertEqual(self.ai.GetNextStepTowards((58, 17), Deadline(0)), "andar")
+        self.assertIsNone(self.ai.path_search)
+
+    def test_player_index(self):
+        def player(pid, x, y, name=None):
+            return PlayerInfo(pid, name or f"p{pid}", x, y, 0, 0, (0, 0, 0))
+
+        self.ai.UpdatePlayer(player(1, 5, 0))
+        self.ai.UpdatePlayer(player(2, 3, 3))
+        self.ai.UpdatePlayer(player(3, 0, 0, self.ai.my_name))  # ourselves
+        self.assertEqual(len(self.ai.players), 2)
+        self.assertEqual([p.id for p in self.ai.players.Near((4, 1), 2)], [1])
+        self.assertEqual([(d, n, p.id) for d, n, p in self.ai.players.InLine((5, 3))],
+                         [("west", 2, 2), ("north", 3, 1)])
+
+        # Moving re-files the record in place
+        self.ai.UpdatePlayer(player(2, 30, 20))
+        self.assertEqual([p.id for p in self.ai.players.Near((29, 20), 1)], [2])
+        self.assertEqual(self.ai.players.Get(2).x, 30)
+        self.assertNotIn(3, self.ai.players.rows)
+
+        # Shot from the east: face the known shooter instead of spinning
+        self.ai.GetObservations(["damage"])
+        self.assertEqual(self.ai.GetDecision(), "virar_direita")
+        self.ai.SetStatus(0, 0, "east", "game", 0, 100)
+        self.ai.GetObservations(["damage"])
+        self.assertEqual(self.ai.GetDecision(), "atacar")
+
+        # Stale positions are not trusted
+        self.ai.players.Update(player(1, 5, 0), stamp=time.monotonic() - 10)
+        self.assertIsNone(self.ai.EnemyInLine())
+
+    def test_decision_cache(self):
+        cache = DecisionCache(capacity=2)
+        cache.Put(1, "a", 0)
+        cache.Put(2, "b", 0)
+        self.assertEqual(cache.Get(1, 0), "a")
+        cache.Put(3, "c", 0)  # evicts 2, the least recently used
+        self.assertIsNone(cache.Get(2, 0))
+        self.assertEqual(cache.evictions, 1)
+        self.assertIsNone(cache.Get(1, 1))  # map version bump drops everything
+        self.assertEqual(cache.HitRate(), 1 / 3)
+
+        # The same fallback situation one cell further down a corridor is a cache hit
+        for x in range(10):
+            for y in (4, 5, 6):
+                self.ai.visited.add((x, y))
+        self.ai.SetStatus(3, 5, "east", "game", 0, 25)
+        first = self.ai.FallbackMove()
+        self.ai.SetStatus(4, 5, "east", "game", 0, 25)
+        self.ai.position_history.clear()
+        self.assertEqual(self.ai.FallbackMove(), first)
+        self.assertEqual(self.ai.decision_cache.hits, 1)
+        self.ai.SetStatus(9, 5, "east", "game", 0, 25)  # unknown cells ahead: another situation
+        self.assertEqual(self.ai.FallbackMove(), self.ai.RandomSafeMove())
+        self.assertEqual(self.ai.decision_cache.hits, 1)
+
+        # Retreats are sampled by the rollouts every time, never cached
+        self.ai.SetStatus(3, 5, "east", "game", 0, 25)
+        self.ai.GetObservations(["enemy#3"])
+        self.ai.GetDecision()
+        self.ai.GetDecision()
+        self.assertEqual(self.ai.decision_cache.hits, 1)
+
+    def test_energy_planner(self):
+        ai, planner = self.ai, self.ai.energy_planner
+        for x in range(31):
+            ai.visited.add((x, 0))
+        ai.visited.update({(5, 1), (30, 1)})
+        ai.powerup_locations.add((30, 1))
+        ai.MapChanged()
+
+        # Nobody shooting at us: energy is no constraint, nothing is searched
+        self.assertEqual(planner.Route(ai, (30, 0), 20), (None, None))
+        self.assertEqual(planner.expanded, 0)
+
+        for energy in (100, 99, 97, 96):
+            planner.Observe(energy)
+        self.assertGreater(planner.drain, 0)
+
+        # 30 steps at 1/tick leave 20; walking on to the power-up needs 22
+        planner.drain = 1.0
+        ai.SetStatus(0, 0, "east", "game", 0, 50)
+        self.assertEqual(planner.Route(ai, (30, 0), 20), (False, None))
+        # ...unless a power-up on the way tops the tank up
+        ai.powerup_locations.add((5, 1))
+        self.assertEqual(planner.Route(ai, (30, 0), 20), (True, (1, 0)))
+
+        # A target that would strand us: refuel first
+        planner.drain = 2.0
+        ai.powerup_locations.discard((30, 1))
+        ai.powerup_locations.discard((5, 1))
+        ai.powerup_locations.add((0, 0))
+        ai.SetStatus(5, 0, "east", "game", 0, 40)
+        self.assertEqual(planner.Route(ai, (15, 0), 20)[0], False)
+        self.assertEqual(ai.GetEnergySafeStep((15, 0)), ai.GetNextStepTowards((0, 0)))
+        self.assertEqual(ai.GetEnergySafeStep((6, 0)), "andar")  # 38 left there, 14 to get back
+
+        # Cells in a known enemy's line of fire cost energy even without drain
+        planner.drain = 0.0
+        ai.UpdatePlayer(PlayerInfo(7, "p7", 12, 3, 0, 0, (0, 0, 0)))
+        self.assertIn((12, 0), planner.Exposed(ai))
+        self.assertEqual(planner.Route(ai, (15, 0), 46)[0], False)  # 50 after refueling, 45 past it
+        self.assertEqual(planner.Route(ai, (15, 0), 20)[0], True)
+
+    def test_energy_planner_teleports_and_reset(self):
+        # Corridors (0..5, 0) and (20..25, 0) joined by teleports both ways, power-up at the start
+        ai, planner = self.ai, self.ai.energy_planner
+        for x in list(range(6)) + list(range(20, 26)):
+            ai.visited.add((x, 0))
+        ai.powerup_locations.add((0, 0))
+        ai.LearnTeleport((6, 0), (20, 0))
+        ai.LearnTeleport((19, 0), (5, 0))
+        ai.SetStatus(5, 0, "east", "game", 0, 90)
+        planner.drain = 0.05
+
+        # Routed through the teleport like the distance field, not sent back to refuel
+        self.assertEqual(planner.Route(ai, (25, 0), 20), (True, (6, 0)))
+        self.assertEqual(ai.GetEnergySafeStep((25, 0)), "andar")
+
+        # No known route at all is not a refuel order
+        self.assertEqual(planner.Route(ai, (40, 0), 20), (planner.UNREACHABLE, None))
+        self.assertEqual(ai.GetEnergySafeStep((40, 0)), ai.GetNextStepTowards((40, 0)))
+
+        # A drain decayed to almost nothing, or a new match, skips the search
+        planner.drain = planner.MIN_DRAIN / 2
+        self.assertEqual(planner.Route(ai, (25, 0), 20), (None, None))
+        planner.drain = 0.5
+        ai.StartMatch()
+        self.assertEqual(planner.drain, 0.0)
+
 if __name__ == '__main__':
     unittest.main()
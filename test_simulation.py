@@ -0,0 +1,65 @@
+import unittest
+import os
+import tempfile
+from unittest import mock
+from Simulation.Arena import Arena
+from Simulation.Match import Match
+from Simulation.Tuner import Tuner, Sample
+from Simulation.Soak import Soak, SoakSample
+from Strategy.StrategyParams import StrategyParams
+import random
+from GameAI import GameAI
+
+class TestSimulation(unittest.TestCase):
+    def test_match_is_reproducible(self):
+        arena = Arena.Generate(3)
+        self.assertNotIn(arena.free[0], arena.walls)
+        first = Match(arena, [StrategyParams()] * 3, seed=3, ticks=200).Run()
+        again = Match(Arena.Generate(3), [StrategyParams()] * 3, seed=3, ticks=200).Run()
+        self.assertEqual(first, again)
+        self.assertEqual(len(first), 3)
+
+    def test_params_round_trip_and_tuner(self):
+        params = Sample(random.Random(1))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "params.json")
+            params.Save(path)
+            self.assertEqual(StrategyParams.Load(path), params)
+
+        tuner = Tuner(configs=4, eta=2, min_matches=1, players=2, ticks=50, processes=1)
+        best = tuner.Run(log=lambda line: None)
+        # Survivors of the first round got twice as many matches
+        self.assertEqual(len(tuner.scores[best]), 2)
+        self.assertEqual(sum(len(s) == 1 for s in tuner.scores.values()), 2)
+
+    def test_soak_stays_flat(self):
+        soak = Soak(matches=4, ticks=40, warmup=1, memory_growth=0.5)
+        problems = soak.Run(log=lambda line: None)
+        self.assertEqual(len(soak.samples), 4)
+        self.assertLess(soak.samples[-1].threads, 10)
+        self.assertEqual(problems, [])
+
+    def test_soak_check(self):
+        def Samples(traced, threads):
+            return [SoakSample(i, i, t, None, n, {}) for i, (t, n) in enumerate(zip(traced, threads))]
+        soak = Soak(warmup=1)
+        soak.samples = Samples([9, 100, 104, 99, 103, 101, 100], [9, 5, 6, 5, 6, 5, 6])
+        self.assertEqual(soak.Check(), [])
+        soak.samples = Samples([9, 100, 110, 120, 130, 140, 150], [9, 5, 5, 6, 6, 7, 7])
+        self.assertEqual(len(soak.Check()), 2)
+
+    def test_soak_flags_injected_leak(self):
+        # Every decision keeps 200 bytes alive for the rest of the run
+        leaked = []
+        decide = GameAI.GetDecision
+        def Leaky(ai, *args, **kwargs):
+            leaked.append(bytes(200))
+            return decide(ai, *args, **kwargs)
+        soak = Soak(matches=7, ticks=40, warmup=1, memory_growth=0.1)
+        with mock.patch.object(GameAI, "GetDecision", Leaky):
+            problems = soak.Run(log=lambda line: None)
+        self.assertGreater(len(leaked), 0)
+        self.assertTrue(any(p.startswith("traced memory grew") for p in problems), problems)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import threading
+from Socket.MessageQueue import MessageQueue
+from Socket.RequestScheduler import RequestScheduler
+from Socket.ReconnectManager import ReconnectManager
+from GameAI import GameAI
+
+class TestMessageQueue(unittest.TestCase):
+    def test_coalesces_superseded_updates(self):
+        queue = MessageQueue()
+        for cmd in (["g", "Ready", "0"], ["s", "1"], ["s", "2"], ["o", "breeze"], ["player", "7", "a"],
+                    ["h", "bob"], ["s", "3"], ["o", ""], ["o", "flash"], ["g", "Game", "1"],
+                    ["player", "7", "b"], ["u", "x"], ["u", "y"]):
+            queue.Put(cmd)
+
+        kept = queue.Drain()
+        # Paired s/o kept in order (the observation of s2 is not lost), runs collapsed
+        self.assertEqual(kept, [["s", "2"], ["o", "breeze"], ["h", "bob"], ["s", "3"], ["o", "flash"],
+                                ["g", "Game", "1"], ["player", "7", "b"], ["u", "y"]])
+        self.assertEqual(queue.coalesced, 5)
+        self.assertEqual(queue.Drain(), [])
+
+    def test_bounded_and_ordered_across_threads(self):
+        queue = MessageQueue(capacity=8)
+        for i in range(10):
+            queue.Put(["h", str(i)])
+        self.assertEqual(queue.dropped, 2)
+        self.assertEqual([cmd[1] for cmd in queue.Drain()], [str(i) for i in range(2, 10)])
+
+        queue = MessageQueue(capacity=100000)
+        producer = threading.Thread(target=lambda: [queue.Put(["h", i]) for i in range(20000)])
+        producer.start()
+        received = []
+        while producer.is_alive() or len(queue):
+            received += [cmd[1] for cmd in queue.Drain()]
+        producer.join()
+        received += [cmd[1] for cmd in queue.Drain()]
+        self.assertEqual(received, list(range(20000)))
+
+class TestRequestScheduler(unittest.TestCase):
+    def test_actions_request_only_what_they_change(self):
+        scheduler = RequestScheduler()
+        scheduler.Tick("Game", 300)
+        self.assertEqual(scheduler.AfterAction("andar"), ["q", "o"])
+        scheduler.Tick("Game", 300)
+        self.assertEqual(scheduler.AfterAction("virar_direita"), ["o"])
+        scheduler.Tick("Game", 300)
+        self.assertEqual(scheduler.AfterAction("atacar", combat=True), ["q", "o"])
+        for _ in range(RequestScheduler.STATUS_REFRESH):
+            scheduler.Tick("Game", 300)
+        self.assertEqual(scheduler.AfterAction("virar_esquerda"), ["q", "o"])  # periodic refresh
+
+        # Without a status request the turn is applied locally
+        ai = GameAI()
+        ai.SetStatus(0, 0, "north", "game", 0, 100)
+        ai.PredictTurn("virar_esquerda")
+        self.assertEqual(ai.dir, "west")
+        ai.PredictTurn("andar")
+        self.assertEqual(ai.dir, "west")
+
+    def test_polling_follows_phase_and_changes(self):
+        scheduler = RequestScheduler()
+        polls = []
+        for _ in range(40):
+            polls.append(scheduler.Tick("Ready"))
+            if "g" in polls[-1]:
+                scheduler.Answered("g", False)
+        ready_polls = sum("g" in r for r in polls)
+        self.assertLess(ready_polls, 10)  # backed off while nothing changes
+
+        scheduler.Answered("g", True)
+        game = [scheduler.Tick("Game", 300) for _ in range(100)]
+        self.assertEqual(sum("g" in r for r in game), 10)
+        self.assertGreaterEqual(sum("u" in r for r in game), 1)
+
+        # Near the end the scoreboard is polled at the fast rate
+        scheduler = RequestScheduler()
+        late = [scheduler.Tick("Game", 30) for _ in range(100)]
+        self.assertEqual(sum("u" in r for r in late), 10)
+
+class FlakyClient:
+    """Stands in for HandleClient: refuses the first `failures` connects."""
+    def __init__(self, failures):
+        self.failures = failures
+        self.connected = False
+        self.calls = 0
+        self.done = threading.Event()
+
+    def connect(self, host, port):
+        self.calls += 1
+        self.connected = self.calls > self.failures
+        if self.connected:
+            self.done.set()
+        return self.connected
+
+class TestReconnectManager(unittest.TestCase):
+    def test_backoff_grows_and_is_bounded(self):
+        manager = ReconnectManager(None, "", 0, seed=1)
+        for attempt in range(20):
+            ceiling = min(ReconnectManager.MAX_DELAY, ReconnectManager.BASE_DELAY * 2 ** attempt)
+            delays = [manager.Delay(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= d <= ceiling for d in delays))
+        self.assertLess(max(manager.Delay(0) for _ in range(50)), 0.1)  # milliseconds at first
+
+    def test_reconnects_in_background(self):
+        client = FlakyClient(failures=3)
+        manager = ReconnectManager(client, "", 0, seed=1, log=lambda line: None)
+        manager.BASE_DELAY = 0.001
+        manager.start()
+        manager.Request()
+        self.assertTrue(client.done.wait(2))
+        self.assertEqual((client.calls, manager.connections), (4, 1))
+
+        # Dropped again: a new request reconnects at once (backoff was reset)
+        client.connected, client.failures, client.calls = False, 0, 0
+        client.done.clear()
+        manager.Request()
+        self.assertTrue(client.done.wait(2))
+        self.assertEqual(client.calls, 1)
+        manager.Stop()
+        manager.join(2)
+        self.assertFalse(manager.is_alive())
+
+if __name__ == '__main__':
+    unittest.main()
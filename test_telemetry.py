@@ -0,0 +1,96 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from Telemetry.SamplingProfiler import SamplingProfiler
+from Telemetry.TickLog import TickRecorder, TickLog, Summarize
+from GameAI import GameAI
+
+def Spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+class PhasedAI:
+    """Stands in for GameAI: a GetDecision that alternates between two phases."""
+    phase = None
+
+    def GetDecision(self, stop):
+        while not stop.is_set():
+            self.phase = "gold"
+            Spin(0.002)
+            self.phase = "exploration"
+            Spin(0.002)
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_by_phase_only_while_enabled(self):
+        ai = PhasedAI()
+        stop = threading.Event()
+        worker = threading.Thread(target=ai.GetDecision, args=(stop,))
+        worker.start()
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            profiler = SamplingProfiler(ai, out_dir, interval=0.001, log=lambda line: None)
+            profiler.Watch(worker.ident)
+            profiler.start()
+            time.sleep(0.05)
+            self.assertEqual(profiler.samples, 0)  # disabled: nothing sampled
+
+            profiler.Enable()
+            time.sleep(0.2)
+            path = profiler.Disable()
+            samples = profiler.samples
+            time.sleep(0.05)
+            stop.set()
+            worker.join()
+            profiler.Stop()
+
+            self.assertGreater(samples, 20)
+            self.assertEqual(profiler.samples, samples)  # disabled again
+            self.assertEqual(set(profiler.PhaseTotals()), {"gold", "exploration"})
+            with open(path) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines, profiler.Collapsed())
+            stack, count = lines[0].rsplit(" ", 1)
+            frames = stack.split(";")
+            self.assertIn(frames[0], ("gold", "exploration"))
+            self.assertIn("test_telemetry.py:GetDecision", frames)
+            self.assertEqual(sum(int(line.rsplit(" ", 1)[1]) for line in lines), samples)
+            self.assertEqual(os.path.dirname(path), out_dir)
+
+class TestTickLog(unittest.TestCase):
+    def test_columns_round_trip_through_mapped_file(self):
+        ai = GameAI()
+        recorder = TickRecorder()
+        ticks = [(1, 1, "north", 100, 0, ["breeze"], "andar"),
+                 (1, 2, "east", 90, 0, ["enemy#3", "steps"], "atacar"),
+                 (1, 2, "east", 80, 1000, [], "virar_direita")]
+        for x, y, direction, energy, score, observations, action in ticks:
+            ai.SetStatus(x, y, direction, "game", score, energy)
+            ai.GetObservations(observations)
+            ai.phase = "combat" if action == "atacar" else "exploration"
+            recorder.Record(ai, action, 0.001)
+        self.assertEqual(len(recorder), 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = recorder.Flush(os.path.join(directory, "a.ticks"))
+            self.assertEqual(len(recorder), 0)
+            self.assertIsNone(recorder.Flush())  # nothing recorded: no file
+            with TickLog(path) as log:
+                self.assertEqual(len(log), 3)
+                self.assertEqual(list(log.Column("y")), [1, 2, 2])
+                self.assertEqual(list(log.Column("energy")), [100, 90, 80])
+                self.assertEqual(list(log.Column("score")), [0, 0, 1000])
+                self.assertEqual(list(log.Column("enemy")), [0, 3, 0])
+                self.assertEqual(log.Column("percepts")[0], 4)  # breeze
+                self.assertEqual([log.labels["dir"][d] for d in log.Column("dir")], ["north", "east", "east"])
+                self.assertEqual(log.Counts("phase")["exploration"], 2)
+                self.assertAlmostEqual(log.Column("latency")[1], 0.001, places=6)
+
+            matches, rows, actions, phases, latencies = Summarize(directory)
+            self.assertEqual((matches, rows), (1, 3))
+            self.assertEqual(actions["atacar"], 1)
+
+if __name__ == '__main__':
+    unittest.main()